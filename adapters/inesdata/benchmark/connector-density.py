@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+connector-density.py
+
+BENCHMARK – Densidad de connectors por nodo
+
+Cada connector añade un pod JVM, una base y un rol PostgreSQL, un cliente
+Keycloak y secretos Vault. Este benchmark añade connectors sintéticos
+(bench-conn-NN) en escalones de BENCH_STEP hasta alcanzar un umbral:
+- memoria de algún nodo ≥ BENCH_MAX_MEMORY_PCT
+- algún connector no alcanza Ready en BENCH_READY_TIMEOUT
+- BENCH_MAX_CONNECTORS connectors creados
+
+Por escalón registra: memoria / CPU de los pods (connectors y common-srvs),
+uso de los nodos, conexiones PostgreSQL, latencia de token Keycloak y
+tiempo hasta Ready. Curva de capacidad en runtime/benchmarks/connector-density-<run>.{json,csv}
+
+Principios:
+- Mismo flujo de creación que el nivel 7 (connector-create.py con CONNECTOR_NAME)
+- Limpieza al terminar (releases, bases, roles, participantes EDC) salvo BENCH_CLEANUP=0;
+  clientes Keycloak y secretos Vault generados por el deployer se conservan
+"""
+
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import bench, helm, postgres, runner
+from lib.kubectl import kubectl
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+WORKDIR = ROOT / "runtime" / "workdir" / "inesdata-deployment"
+CONNECTOR_DIR = WORKDIR / "connector"
+AUTH_RUNTIME_FILE = ROOT / "runtime" / ".auth_runtime.json"
+
+CONNECTOR_CREATE = "adapters/inesdata/connector/connector-create.py"
+
+NAMESPACE = "demo"
+REALM = "demo"
+PREFIX = "bench-conn"
+
+STEP = 2
+MAX_CONNECTORS = 20
+MAX_MEMORY_PCT = 85.0
+READY_TIMEOUT = 300
+TOKEN_SAMPLES = 20
+CLEANUP = True
+
+def configure(config=None):
+    global STEP, MAX_CONNECTORS, MAX_MEMORY_PCT, READY_TIMEOUT, TOKEN_SAMPLES, CLEANUP
+
+    env = runner.settings(config)
+    STEP = int(env.get("BENCH_STEP", STEP))
+    MAX_CONNECTORS = int(env.get("BENCH_MAX_CONNECTORS", MAX_CONNECTORS))
+    MAX_MEMORY_PCT = float(env.get("BENCH_MAX_MEMORY_PCT", MAX_MEMORY_PCT))
+    READY_TIMEOUT = int(env.get("BENCH_READY_TIMEOUT", READY_TIMEOUT))
+    TOKEN_SAMPLES = int(env.get("BENCH_TOKEN_SAMPLES", TOKEN_SAMPLES))
+    CLEANUP = env.get("BENCH_CLEANUP", "1") != "0"
+
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+def header(title):
+    print("\n" + "=" * 80)
+    print(title)
+    print("=" * 80)
+
+def connector_name(index: int) -> str:
+    return f"{PREFIX}-{index:02d}"
+
+# =============================================================================
+# CONNECTORS SINTÉTICOS
+# =============================================================================
+
+def create_connector(name: str):
+    # Flujo completo del nivel 7: DB + rol, cliente Keycloak, Vault, values
+    runner.run_script(CONNECTOR_CREATE, {"CONNECTOR_NAME": name})
+
+def deploy_and_wait(name: str):
+    """
+    helm upgrade --install + rollout status. Devuelve segundos hasta Ready
+    o None si no se alcanza en READY_TIMEOUT.
+    """
+    start = time.monotonic()
+    try:
+        helm.upgrade_install(
+            name, NAMESPACE, CONNECTOR_DIR / f"values-{name}.yaml", cwd=CONNECTOR_DIR,
+            component="connector",
+        )
+    except subprocess.CalledProcessError:
+        return None
+    result = kubectl(
+        "rollout", "status", f"deployment/{name}", "-n", NAMESPACE,
+        f"--timeout={READY_TIMEOUT}s", check=False,
+    )
+    return time.monotonic() - start if result.returncode == 0 else None
+
+def cleanup(names):
+    header("BENCHMARK – Limpieza de connectors sintéticos")
+    for name in names:
+        helm.helm("uninstall", name, "-n", NAMESPACE, check=False)
+
+        db = name.replace("-", "_")
+        postgres.psql(postgres.drop_statements(db, db), check=False)
+
+        for values in (CONNECTOR_DIR / f"values-{name}.yaml", CONNECTOR_DIR / f"values.yaml.{name}"):
+            values.unlink(missing_ok=True)
+
+    postgres.psql(
+        f"DELETE FROM public.edc_participant WHERE participant_id LIKE {postgres.literal(PREFIX + '-%')};",
+        db=postgres.RS_DB, check=False,
+    )
+    print(f"✓ {len(names)} connectors sintéticos eliminados")
+
+# =============================================================================
+# MEDIDAS POR ESCALÓN
+# =============================================================================
+
+def token_latency(keycloak_url: str) -> dict:
+    """
+    client_credentials del connector de la demo (.auth_runtime.json).
+    """
+    auth = json.loads(AUTH_RUNTIME_FILE.read_text())
+    url = f"{keycloak_url}/realms/{REALM}/protocol/openid-connect/token"
+    payload = {
+        "grant_type": "client_credentials",
+        "client_id": auth["client_id"],
+        "client_secret": auth["client_secret"],
+    }
+
+    session = requests.Session()
+
+    def call(_):
+        return session.post(url, data=payload, timeout=10).status_code == 200
+
+    samples, elapsed = bench.run_load(call, concurrency=1, duration=60, total=TOKEN_SAMPLES)
+    return bench.summarize(samples, elapsed)["latency_ms"]
+
+def pg_connections() -> int:
+    return int(postgres.psql("SELECT count(*) FROM pg_stat_activity;") or 0)
+
+def measure(names, ready_times, keycloak_url: str) -> dict:
+    pods = bench.top_pods()
+    connector_pods = [
+        u for (ns, pod), u in pods.items()
+        if ns == NAMESPACE and pod.startswith(PREFIX + "-")
+    ]
+    common = [u for (ns, _), u in pods.items() if ns == "common-srvs"]
+    nodes = bench.top_nodes()
+    ready = [t for t in ready_times if t is not None]
+    tokens = token_latency(keycloak_url)
+
+    return {
+        "connectors": len(names),
+        "ready": len(ready) == len(ready_times),
+        "time_to_ready_p50_s": round(bench.percentile(sorted(ready), 50), 1) if ready else None,
+        "time_to_ready_max_s": round(max(ready), 1) if ready else None,
+        "connector_memory_mi": round(sum(u["memory_mi"] for u in connector_pods), 1),
+        "connector_memory_avg_mi": round(
+            sum(u["memory_mi"] for u in connector_pods) / len(connector_pods), 1
+        ) if connector_pods else None,
+        "connector_cpu_m": round(sum(u["cpu_m"] for u in connector_pods), 1),
+        "common_srvs_memory_mi": round(sum(u["memory_mi"] for u in common), 1),
+        "common_srvs_cpu_m": round(sum(u["cpu_m"] for u in common), 1),
+        "node_memory_pct_max": max((n["memory_pct"] for n in nodes.values()), default=None),
+        "node_cpu_pct_max": max((n["cpu_pct"] for n in nodes.values()), default=None),
+        "pg_connections": pg_connections(),
+        "token_p50_ms": tokens.get("p50"),
+        "token_p95_ms": tokens.get("p95"),
+    }
+
+# =============================================================================
+# ESCALONES
+# =============================================================================
+
+def run_steps(keycloak_url: str, created: list):
+    curve = []
+    stop_reason = "max_connectors"
+
+    while len(created) < MAX_CONNECTORS:
+        batch = [
+            connector_name(i)
+            for i in range(len(created) + 1, min(len(created) + STEP, MAX_CONNECTORS) + 1)
+        ]
+        header(f"BENCHMARK – Escalón {len(curve) + 1}: {', '.join(batch)}")
+
+        # Creación secuencial (deployer + Vault CLI comparten estado);
+        # despliegue y espera de Ready en paralelo
+        for name in batch:
+            create_connector(name)
+            created.append(name)
+        with ThreadPoolExecutor(max_workers=len(batch)) as pool:
+            ready_times = list(pool.map(deploy_and_wait, batch))
+
+        point = measure(created, ready_times, keycloak_url)
+        curve.append(point)
+        print(
+            f"📈 {point['connectors']} connectors | Ready: {point['ready']} | "
+            f"memoria nodo máx: {point['node_memory_pct_max']}% | "
+            f"PG conexiones: {point['pg_connections']} | token p50: {point['token_p50_ms']} ms"
+        )
+
+        if not point["ready"]:
+            stop_reason = "readiness"
+            break
+        if (point["node_memory_pct_max"] or 0) >= MAX_MEMORY_PCT:
+            stop_reason = "memory"
+            break
+
+    return curve, stop_reason
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main(config=None):
+    configure(config)
+    header("BENCHMARK – Densidad de connectors")
+
+    bench.ensure_metrics_server()
+    created = []
+
+    with bench.port_forward("pod/common-srvs-vault-0", "common-srvs", 8200, 8200), \
+         bench.port_forward("pod/common-srvs-keycloak-0", "common-srvs", 8080, 8080) as keycloak_url:
+        try:
+            curve, stop_reason = run_steps(keycloak_url, created)
+        finally:
+            if CLEANUP:
+                cleanup(created)
+
+    summary = {
+        "step": STEP,
+        "max_connectors": MAX_CONNECTORS,
+        "max_memory_pct": MAX_MEMORY_PCT,
+        "stop_reason": stop_reason,
+        "capacity": max((p["connectors"] for p in curve if p["ready"]), default=0),
+        "curve": curve,
+    }
+    path = bench.write_results("connector-density", summary, rows=curve)
+
+    header("BENCHMARK COMPLETADO")
+    print(f"✔ Capacidad: {summary['capacity']} connectors (parada: {stop_reason})")
+    print(f"✔ Curva de capacidad en {path}")
+
+if __name__ == "__main__":
+    main()
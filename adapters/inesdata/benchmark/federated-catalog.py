@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+federated-catalog.py
+
+BENCHMARK – Latencia del catálogo federado del portal público
+
+PortalSetup.configure_public_permissions publica getFederatedCatalog, que
+agrega los catálogos de los connectors. Este benchmark siembra assets
+sintéticos (bench-asset-*) en los connectors desplegados a través de su API
+de gestión y mide la latencia del catálogo federado en el backend del
+portal (port-forward 18080 → 1337) a medida que crecen los assets.
+
+Escalones: BENCH_ASSET_STEPS = assets por connector en cada medida (acumulativos).
+
+Parámetros (entorno o config):
+- BENCH_ASSET_STEPS        "10,50,100"
+- BENCH_CONNECTORS         connectors a sembrar (vacío = todos los del namespace demo)
+- BENCH_REQUESTS           peticiones al catálogo por escalón        [30]
+- BENCH_CONCURRENCY        hilos por escalón                          [1]
+- BENCH_CATALOG_PATH       ruta del backend   [/api/get-federated-catalog]
+- BENCH_CATALOG_METHOD     GET | POST                                 [POST]
+- BENCH_CATALOG_BODY       cuerpo JSON (POST)                         [{}]
+- BENCH_MANAGEMENT_PORT    puerto de la API de gestión del connector [19193]
+- BENCH_MANAGEMENT_PATH    prefijo de la API de gestión         [/management]
+- BENCH_CATALOG_TIMEOUT    segundos de espera a que el catálogo
+                           refleje los assets sembrados               [300]
+- BENCH_CLEANUP            0 = conservar assets / políticas sintéticos [1]
+
+Salida: runtime/benchmarks/federated-catalog-<run>.{json,csv}
+(una fila por escalón: connectors, assets, percentiles, tamaño de respuesta)
+
+Principios:
+- Cada connector recibe UNA política y UNA definición de contrato sintéticas
+  que seleccionan solo los assets marcados con la propiedad bench=true
+- Token de gestión: client_credentials del cliente Keycloak de cada connector,
+  renovado antes de la limpieza
+- Cada escalón se mide solo cuando el catálogo ya contiene todos sus assets
+"""
+
+import contextlib
+import json
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import bench, helm, runner
+from lib.kubectl import secret_value
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+AUTH_BOOTSTRAP = "adapters/inesdata/integration/auth/auth-bootstrap.py"
+
+NAMESPACE = "demo"
+REALM = "demo"
+PORTAL_SERVICE = "svc/demo-public-portal-backend"
+PORTAL_PORT = 18080
+PORTAL_REMOTE_PORT = 1337
+
+KC_NAMESPACE = "common-srvs"
+KC_POD = "common-srvs-keycloak-0"
+KC_PORT = 8080
+
+MANAGEMENT_LOCAL_PORT = 19300
+
+PREFIX = "bench-asset"
+POLICY_ID = "bench-policy"
+CONTRACT_ID = "bench-contract"
+
+ASSET_PATTERN = re.compile(rf"{PREFIX}-[\w.-]+?-\d{{5}}")
+CATALOG_POLL = 5
+
+EDC_NS = "https://w3id.org/edc/v0.0.1/ns/"
+CONTEXT = {"@vocab": EDC_NS, "odrl": "http://www.w3.org/ns/odrl/2/"}
+
+def configure(config=None) -> dict:
+    env = runner.settings(config)
+    return {
+        "asset_steps": [int(n) for n in env.get("BENCH_ASSET_STEPS", "10,50,100").split(",")],
+        "connectors": [c for c in env.get("BENCH_CONNECTORS", "").split(",") if c],
+        "requests": int(env.get("BENCH_REQUESTS", 30)),
+        "concurrency": int(env.get("BENCH_CONCURRENCY", 1)),
+        "catalog_path": env.get("BENCH_CATALOG_PATH", "/api/get-federated-catalog"),
+        "catalog_method": env.get("BENCH_CATALOG_METHOD", "POST").upper(),
+        "catalog_body": json.loads(env.get("BENCH_CATALOG_BODY", "{}")),
+        "catalog_timeout": float(env.get("BENCH_CATALOG_TIMEOUT", 300)),
+        "management_port": int(env.get("BENCH_MANAGEMENT_PORT", 19193)),
+        "management_path": env.get("BENCH_MANAGEMENT_PATH", "/management"),
+        "cleanup": env.get("BENCH_CLEANUP", "1") != "0",
+    }
+
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+def header(title):
+    print("\n" + "=" * 80)
+    print(title)
+    print("=" * 80)
+
+def deployed_connectors():
+    """
+    Releases Helm del namespace demo que no son del dataspace (step-1 / step-2).
+    """
+    return sorted(
+        r["name"] for r in helm.list_releases()
+        if r["namespace"] == NAMESPACE and not r["name"].startswith(f"{NAMESPACE}-dataspace")
+    )
+
+def asset_id(connector: str, i: int) -> str:
+    return f"{PREFIX}-{connector}-{i:05d}"
+
+# =============================================================================
+# API DE GESTIÓN DEL CONNECTOR
+# =============================================================================
+
+class Management:
+    """
+    Cliente mínimo de la API de gestión EDC (v3) de un connector.
+    """
+
+    def __init__(self, base_url: str, token: str):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.set_token(token)
+
+    def set_token(self, token: str):
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def _post(self, path: str, body: dict):
+        r = self.session.post(f"{self.base_url}/v3/{path}", json={"@context": CONTEXT, **body},
+                              timeout=30)
+        # 409: ya existe (re-ejecución tras un benchmark interrumpido)
+        if r.status_code != 409:
+            r.raise_for_status()
+
+    def _delete(self, path: str) -> bool:
+        """
+        True si el recurso ya no existe (borrado ahora o 404).
+        """
+        try:
+            r = self.session.delete(f"{self.base_url}/v3/{path}", timeout=30)
+        except requests.RequestException as e:
+            print(f"   ⚠️ DELETE {path}: {e}")
+            return False
+        if r.ok or r.status_code == 404:
+            return True
+        print(f"   ⚠️ DELETE {path}: HTTP {r.status_code} {r.text[:200]}")
+        return False
+
+    def ensure_offer(self):
+        self._post("policydefinitions", {
+            "@id": POLICY_ID,
+            "policy": {"@type": "odrl:Set", "odrl:permission": []},
+        })
+        self._post("contractdefinitions", {
+            "@id": CONTRACT_ID,
+            "accessPolicyId": POLICY_ID,
+            "contractPolicyId": POLICY_ID,
+            "assetsSelector": [{
+                "operandLeft": f"{EDC_NS}bench",
+                "operator": "=",
+                "operandRight": "true",
+            }],
+        })
+
+    def create_asset(self, asset: str):
+        self._post("assets", {
+            "@id": asset,
+            "properties": {"name": asset, "bench": "true", "contenttype": "application/json"},
+            "dataAddress": {"type": "HttpData", "baseUrl": "https://example.org/bench"},
+        })
+
+    def cleanup(self, assets) -> list:
+        """
+        Borra la oferta y los assets sintéticos. Devuelve los que no se pudieron borrar.
+        """
+        # La definición de contrato referencia la política: se borra antes
+        self._delete(f"contractdefinitions/{CONTRACT_ID}")
+        self._delete(f"policydefinitions/{POLICY_ID}")
+        return [asset for asset in assets if not self._delete(f"assets/{asset}")]
+
+# =============================================================================
+# CREDENCIALES
+# =============================================================================
+
+def management_tokens(connectors) -> dict:
+    """
+    client_credentials de cada connector (su cliente Keycloak homónimo),
+    con la lógica de administración de auth-bootstrap.
+    """
+    with bench.port_forward(f"pod/{KC_POD}", KC_NAMESPACE, KC_PORT, KC_PORT) as keycloak_url:
+        auth = runner.load(AUTH_BOOTSTRAP)
+        auth.configure({
+            "KC_URL": keycloak_url,
+            "KEYCLOAK_ADMIN_PASSWORD": secret_value("common-srvs-keycloak", KC_NAMESPACE, "admin-password"),
+            "DATASPACE_REALM": REALM,
+        })
+        auth.get_admin_token()
+
+        tokens = {}
+        for name in connectors:
+            # Solo lectura: un release ajeno o una errata en BENCH_CONNECTORS
+            # no debe crear clientes confidenciales en el realm
+            client_id = auth.find_client(name)
+            if client_id is None:
+                sys.exit(f"❌ Cliente Keycloak '{name}' inexistente en el realm {REALM}")
+            secret = auth.get_client_secret(client_id)
+            r = requests.post(
+                f"{keycloak_url}/realms/{REALM}/protocol/openid-connect/token",
+                data={"grant_type": "client_credentials", "client_id": name, "client_secret": secret},
+                timeout=10,
+            )
+            r.raise_for_status()
+            tokens[name] = r.json()["access_token"]
+        return tokens
+
+# =============================================================================
+# MEDIDA
+# =============================================================================
+
+def fetch_catalog(session, settings: dict, portal_url: str):
+    url = portal_url + settings["catalog_path"]
+    if settings["catalog_method"] == "GET":
+        return session.get(url, timeout=120)
+    return session.post(url, json=settings["catalog_body"], timeout=120)
+
+def wait_for_catalog(settings: dict, portal_url: str, expected: set):
+    """
+    Espera a que el catálogo federado contenga todos los assets `expected`:
+    el crawler del portal los recoge con retraso y medir antes compararía
+    escalones con menos assets de los declarados.
+    """
+    session = requests.Session()
+    deadline = time.monotonic() + settings["catalog_timeout"]
+    found = set()
+    while True:
+        try:
+            r = fetch_catalog(session, settings, portal_url)
+            if r.status_code == 200:
+                found = set(ASSET_PATTERN.findall(r.text)) & expected
+        except requests.RequestException:
+            pass
+        if len(found) == len(expected):
+            print(f"✓ Catálogo con {len(found)} assets sintéticos")
+            return
+        if time.monotonic() >= deadline:
+            sys.exit(
+                f"❌ El catálogo solo refleja {len(found)}/{len(expected)} assets "
+                f"tras {settings['catalog_timeout']:.0f}s"
+            )
+        print(f"   Catálogo: {len(found)}/{len(expected)} assets...", end="\r")
+        time.sleep(CATALOG_POLL)
+
+def measure(settings: dict, portal_url: str) -> dict:
+    sizes = []
+    local = threading.local()
+
+    def call(_):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        r = fetch_catalog(local.session, settings, portal_url)
+        sizes.append(len(r.content))
+        return r.status_code == 200
+
+    samples, elapsed = bench.run_load(
+        call,
+        concurrency=settings["concurrency"],
+        duration=3600,
+        total=settings["requests"],
+    )
+    summary = bench.summarize(samples, elapsed)
+    summary["response_bytes_avg"] = round(sum(sizes) / len(sizes)) if sizes else 0
+    return summary
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main(config=None):
+    settings = configure(config)
+    header("BENCHMARK – Catálogo federado (portal público)")
+
+    connectors = settings["connectors"] or deployed_connectors()
+    if not connectors:
+        sys.exit(f"❌ Sin connectors desplegados en {NAMESPACE}")
+    print(f"▶ Connectors: {', '.join(connectors)}")
+    print(f"▶ Escalones (assets por connector): {settings['asset_steps']}")
+
+    tokens = management_tokens(connectors)
+    rows = []
+    seeded = {name: [] for name in connectors}
+
+    with contextlib.ExitStack() as stack:
+        apis = {}
+        for index, name in enumerate(connectors):
+            base_url = stack.enter_context(bench.port_forward(
+                f"svc/{name}", NAMESPACE, MANAGEMENT_LOCAL_PORT + index, settings["management_port"]
+            ))
+            apis[name] = Management(base_url + settings["management_path"], tokens[name])
+        portal_url = stack.enter_context(
+            bench.port_forward(PORTAL_SERVICE, NAMESPACE, PORTAL_PORT, PORTAL_REMOTE_PORT)
+        )
+
+        try:
+            for api in apis.values():
+                api.ensure_offer()
+
+            for target in sorted(settings["asset_steps"]):
+                header(f"BENCHMARK – {target} assets por connector")
+                for name, api in apis.items():
+                    for i in range(len(seeded[name]), target):
+                        api.create_asset(asset_id(name, i))
+                        seeded[name].append(asset_id(name, i))
+
+                wait_for_catalog(
+                    settings, portal_url, {a for assets in seeded.values() for a in assets}
+                )
+                summary = measure(settings, portal_url)
+                bench.print_summary(f"getFederatedCatalog · {target} assets/connector", summary)
+                rows.append({
+                    "connectors": len(connectors),
+                    "assets_per_connector": target,
+                    "total_assets": target * len(connectors),
+                    "requests": summary["requests"],
+                    "errors": summary["errors"],
+                    **{f"{k}_ms": v for k, v in summary["latency_ms"].items()},
+                    "response_bytes_avg": summary["response_bytes_avg"],
+                })
+        finally:
+            if settings["cleanup"]:
+                header("BENCHMARK – Limpieza de assets sintéticos")
+                # Los tokens de gestión pueden haber caducado durante la medida
+                for name, token in management_tokens(list(apis)).items():
+                    apis[name].set_token(token)
+
+                failed = []
+                for name, api in apis.items():
+                    failed += api.cleanup(seeded[name])
+                total = sum(map(len, seeded.values()))
+                print(f"✓ {total - len(failed)}/{total} assets sintéticos eliminados")
+                if failed:
+                    print(f"⚠️ Sin eliminar ({len(failed)}): {', '.join(failed[:10])}"
+                          + (" ..." if len(failed) > 10 else ""))
+
+    summary = {"settings": settings, "connectors": connectors, "steps": rows}
+    path = bench.write_results("federated-catalog", summary, rows=rows)
+
+    header("BENCHMARK COMPLETADO")
+    print(f"✔ Resultados en {path} (+ CSV)")
+
+if __name__ == "__main__":
+    main()
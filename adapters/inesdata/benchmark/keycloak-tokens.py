@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+keycloak-tokens.py
+
+BENCHMARK – Emisión de tokens client_credentials en Keycloak (realm demo)
+
+Cada connector obtiene sus tokens con el mismo flujo que valida
+auth-bootstrap.py:get_token. Este benchmark provisiona K clientes sintéticos
+(bench-kc-NN) con la lógica de auth-bootstrap (service account, rol
+connector-admin, mapper de roles) y lanza peticiones al endpoint
+/realms/demo/protocol/openid-connect/token a una tasa objetivo, repartidas
+entre los K clientes.
+
+Parámetros (entorno o config):
+- BENCH_CLIENTS         clientes sintéticos K                      [10]
+- BENCH_RATE            req/s objetivo (0 = sin límite)            [50]
+- BENCH_CONCURRENCY     hilos                                      [16]
+- BENCH_DURATION        segundos                                   [60]
+- BENCH_SAMPLE_INTERVAL segundos entre muestras de kubectl top     [5]
+- BENCH_CLEANUP         0 = conservar los clientes sintéticos      [1]
+
+Salida: runtime/benchmarks/keycloak-tokens-<run>.{json,csv}
+(percentiles de latencia + CPU / memoria del pod Keycloak durante la carga)
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import bench, runner
+from lib.kubectl import secret_value
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+AUTH_BOOTSTRAP = "adapters/inesdata/integration/auth/auth-bootstrap.py"
+
+KC_NAMESPACE = "common-srvs"
+KC_POD = "common-srvs-keycloak-0"
+KC_SECRET = "common-srvs-keycloak"
+KC_PORT = 8080
+REALM = "demo"
+
+PREFIX = "bench-kc"
+
+def configure(config=None) -> dict:
+    env = runner.settings(config)
+    return {
+        "clients": int(env.get("BENCH_CLIENTS", 10)),
+        "rate": float(env.get("BENCH_RATE", 50)),
+        "concurrency": int(env.get("BENCH_CONCURRENCY", 16)),
+        "duration": float(env.get("BENCH_DURATION", 60)),
+        "sample_interval": float(env.get("BENCH_SAMPLE_INTERVAL", 5)),
+        "cleanup": env.get("BENCH_CLEANUP", "1") != "0",
+    }
+
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+def header(title):
+    print("\n" + "=" * 80)
+    print(title)
+    print("=" * 80)
+
+def client_name(index: int) -> str:
+    return f"{PREFIX}-{index:02d}"
+
+# =============================================================================
+# CLIENTES SINTÉTICOS (lógica de auth-bootstrap)
+# =============================================================================
+
+def bootstrap(keycloak_url: str):
+    auth = runner.load(AUTH_BOOTSTRAP)
+    auth.configure({
+        "KC_URL": keycloak_url,
+        "KEYCLOAK_ADMIN_PASSWORD": secret_value(KC_SECRET, KC_NAMESPACE, "admin-password"),
+        "DATASPACE_REALM": REALM,
+    })
+    auth.get_admin_token()
+    return auth
+
+def provision_clients(auth, count: int, clients: dict) -> dict:
+    """
+    Rellena `clients` a medida que se crean: ante un fallo parcial,
+    la limpieza del llamador ve los ya provisionados.
+    """
+    header(f"BENCHMARK – Provisión de {count} clientes sintéticos")
+    for i in range(1, count + 1):
+        name = client_name(i)
+        clients[name] = auth.provision_client(name)
+    print(f"✓ {len(clients)} clientes con service account y rol {auth.REQUIRED_ROLE}")
+    return clients
+
+def cleanup(auth, clients: dict):
+    header("BENCHMARK – Limpieza de clientes sintéticos")
+    # El token admin puede haber caducado durante la carga
+    auth.get_admin_token()
+    for client_id, _ in clients.values():
+        auth.delete_client(client_id)
+    print(f"✓ {len(clients)} clientes eliminados")
+
+# =============================================================================
+# CARGA
+# =============================================================================
+
+def run(settings: dict, keycloak_url: str, clients: dict):
+    url = f"{keycloak_url}/realms/{REALM}/protocol/openid-connect/token"
+    credentials = [(name, secret) for name, (_, secret) in clients.items()]
+    local = threading.local()
+
+    def call(i):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        name, secret = credentials[i % len(credentials)]
+        r = local.session.post(url, data={
+            "grant_type": "client_credentials",
+            "client_id": name,
+            "client_secret": secret,
+        }, timeout=30)
+        return r.status_code == 200
+
+    with bench.sample_pods(KC_NAMESPACE, KC_POD, settings["sample_interval"]) as usage:
+        samples, elapsed = bench.run_load(
+            call,
+            rate=settings["rate"],
+            concurrency=settings["concurrency"],
+            duration=settings["duration"],
+        )
+    return samples, elapsed, usage
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main(config=None):
+    settings = configure(config)
+    header("BENCHMARK – Keycloak client_credentials")
+
+    bench.ensure_metrics_server()
+
+    with bench.port_forward(f"pod/{KC_POD}", KC_NAMESPACE, KC_PORT, KC_PORT) as keycloak_url:
+        auth = bootstrap(keycloak_url)
+        clients = {}
+        try:
+            provision_clients(auth, settings["clients"], clients)
+            print(
+                f"▶ {settings['rate'] or '∞'} req/s, {settings['concurrency']} hilos, "
+                f"{settings['duration']:.0f}s sobre {len(clients)} clientes"
+            )
+            samples, elapsed, usage = run(settings, keycloak_url, clients)
+        finally:
+            if settings["cleanup"] and clients:
+                cleanup(auth, clients)
+
+    summary = {
+        "settings": settings,
+        "tokens": bench.summarize(samples, elapsed),
+        "keycloak_pod": bench.usage_stats(usage),
+    }
+    path = bench.write_results("keycloak-tokens", summary, rows=usage)
+
+    bench.print_summary("Keycloak · token client_credentials", summary["tokens"])
+    for field, stats in summary["keycloak_pod"].items():
+        print(f"   {KC_POD} {field}: media {stats['avg']}  pico {stats['max']}")
+
+    header("BENCHMARK COMPLETADO")
+    print(f"✔ Resultados en {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+registration-load.py
+
+BENCHMARK – Carga sobre el registration-service del dataspace
+
+demo-registration-service (step-1, base demo_rs, tabla edc_participant) es
+el punto central al que se registran todos los connectors. Este benchmark
+registra y consulta participantes sintéticos (bench-rs-NNNNNN) de forma
+concurrente a través de un port-forward gestionado.
+
+Parámetros (entorno o config):
+- BENCH_RATE            req/s objetivo (0 = sin límite)            [20]
+- BENCH_CONCURRENCY     hilos                                      [8]
+- BENCH_DURATION        segundos                                   [60]
+- BENCH_QUERY_RATIO     fracción de consultas frente a registros    [0.5]
+- BENCH_RS_REGISTER_PATH / BENCH_RS_QUERY_PATH   endpoints del API
+- BENCH_RS_BODY         plantilla JSON del registro ({id} = participante)
+- BENCH_RS_PORT         puerto del Service                         [8080]
+- BENCH_RS_AUTH         bearer client_credentials (.auth_runtime.json) [1]
+                        renovado antes de caducar y tras un 401
+
+Salida: runtime/benchmarks/registration-load-<run>.{json,csv}
+(throughput, tasa de error y percentiles por operación; CSV por petición)
+
+Principios:
+- Los endpoints son configurables: el API depende de la versión del chart
+- Los participantes sintéticos se eliminan de edc_participant al terminar
+"""
+
+import contextlib
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import bench, postgres, runner
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+AUTH_RUNTIME_FILE = ROOT / "runtime" / ".auth_runtime.json"
+
+NAMESPACE = "demo"
+SERVICE = "svc/demo-registration-service"
+LOCAL_PORT = 18081
+KEYCLOAK_PORT = 8080
+REALM = "demo"
+# Segundos antes de `expires_in` en los que el token ya se renueva
+TOKEN_MARGIN = 30
+
+PREFIX = "bench-rs"
+
+DEFAULT_BODY = json.dumps({
+    "participantId": "{id}",
+    "url": "http://{id}.demo.svc:19194/protocol",
+    "createdAt": 0,
+})
+
+def configure(config=None) -> dict:
+    env = runner.settings(config)
+    return {
+        "rate": float(env.get("BENCH_RATE", 20)),
+        "concurrency": int(env.get("BENCH_CONCURRENCY", 8)),
+        "duration": float(env.get("BENCH_DURATION", 60)),
+        "query_ratio": float(env.get("BENCH_QUERY_RATIO", 0.5)),
+        "register_path": env.get("BENCH_RS_REGISTER_PATH", "/api/participants"),
+        "query_path": env.get("BENCH_RS_QUERY_PATH", "/api/participants"),
+        "body": env.get("BENCH_RS_BODY", DEFAULT_BODY),
+        "port": int(env.get("BENCH_RS_PORT", 8080)),
+        "auth": env.get("BENCH_RS_AUTH", "1") != "0",
+    }
+
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+def header(title):
+    print("\n" + "=" * 80)
+    print(title)
+    print("=" * 80)
+
+def participant_id(i: int) -> str:
+    return f"{PREFIX}-{i:06d}"
+
+def render_body(template: str, pid: str) -> dict:
+    # Sustitución literal: las llaves del propio JSON no se interpretan
+    return json.loads(template.replace("{id}", pid))
+
+def is_query(i: int, ratio: float) -> bool:
+    return bench.picked(i, ratio)
+
+class BearerToken:
+    """
+    Token client_credentials compartido por los hilos de carga.
+    Se renueva TOKEN_MARGIN segundos antes de caducar, o al recibir un 401.
+    """
+
+    def __init__(self, keycloak_url: str):
+        self.url = f"{keycloak_url}/realms/{REALM}/protocol/openid-connect/token"
+        self.auth = json.loads(AUTH_RUNTIME_FILE.read_text())
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires = 0.0
+
+    def _fetch(self):
+        r = requests.post(
+            self.url,
+            data={
+                "grant_type": "client_credentials",
+                "client_id": self.auth["client_id"],
+                "client_secret": self.auth["client_secret"],
+            },
+            timeout=10,
+        )
+        r.raise_for_status()
+        data = r.json()
+        self._token = data["access_token"]
+        self._expires = time.monotonic() + data.get("expires_in", 60) - TOKEN_MARGIN
+
+    def get(self, rejected: str = None) -> str:
+        """
+        Token vigente. `rejected` = token que recibió un 401: se renueva
+        salvo que otro hilo ya lo haya hecho.
+        """
+        with self._lock:
+            if self._token in (None, rejected) or time.monotonic() >= self._expires:
+                self._fetch()
+            return self._token
+
+# =============================================================================
+# LIMPIEZA
+# =============================================================================
+
+def cleanup():
+    header("BENCHMARK – Limpieza de participantes sintéticos")
+    deleted = postgres.psql(
+        "WITH d AS (DELETE FROM public.edc_participant "
+        f"WHERE participant_id LIKE {postgres.literal(PREFIX + '-%')} RETURNING 1) "
+        "SELECT count(*) FROM d;",
+        db=postgres.RS_DB,
+    )
+    print(f"✓ {deleted or 0} participantes sintéticos eliminados")
+
+# =============================================================================
+# CARGA
+# =============================================================================
+
+def run(settings: dict, base_url: str, token: BearerToken = None):
+    session = requests.Session()
+    register_url = base_url + settings["register_path"]
+    query_url = base_url + settings["query_path"]
+
+    def send(method, url, **kwargs):
+        if token is None:
+            return session.request(method, url, timeout=30, **kwargs)
+        bearer = token.get()
+        r = session.request(method, url, timeout=30,
+                            headers={"Authorization": f"Bearer {bearer}"}, **kwargs)
+        if r.status_code == 401:
+            # Token caducado o revocado: se renueva y se reintenta una vez
+            bearer = token.get(rejected=bearer)
+            r = session.request(method, url, timeout=30,
+                                headers={"Authorization": f"Bearer {bearer}"}, **kwargs)
+        return r
+
+    def call(i):
+        if is_query(i, settings["query_ratio"]):
+            r = send("GET", query_url)
+        else:
+            r = send("POST", register_url,
+                     json=render_body(settings["body"], participant_id(i)))
+        return r.status_code < 400
+
+    return bench.run_load(
+        call,
+        rate=settings["rate"],
+        concurrency=settings["concurrency"],
+        duration=settings["duration"],
+    )
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main(config=None):
+    settings = configure(config)
+    header("BENCHMARK – registration-service")
+    print(
+        f"▶ {settings['rate'] or '∞'} req/s, {settings['concurrency']} hilos, "
+        f"{settings['duration']:.0f}s, consultas {settings['query_ratio']:.0%}"
+    )
+
+    try:
+        with contextlib.ExitStack() as stack:
+            token = None
+            if settings["auth"]:
+                # Keycloak sigue accesible durante la carga para renovar el token
+                keycloak_url = stack.enter_context(bench.port_forward(
+                    "pod/common-srvs-keycloak-0", "common-srvs", KEYCLOAK_PORT, KEYCLOAK_PORT,
+                ))
+                token = BearerToken(keycloak_url)
+                token.get()
+            base_url = stack.enter_context(
+                bench.port_forward(SERVICE, NAMESPACE, LOCAL_PORT, settings["port"])
+            )
+            samples, elapsed = run(settings, base_url, token)
+    finally:
+        cleanup()
+
+    ratio = settings["query_ratio"]
+    operations = {
+        "register": [s for s in samples if not is_query(s["i"], ratio)],
+        "query": [s for s in samples if is_query(s["i"], ratio)],
+    }
+    summary = {
+        "settings": {k: v for k, v in settings.items() if k != "body"},
+        "total": bench.summarize(samples, elapsed),
+        "operations": {op: bench.summarize(s, elapsed) for op, s in operations.items() if s},
+    }
+    rows = [
+        {
+            "operation": "query" if is_query(s["i"], ratio) else "register",
+            "t_s": round(s["t"], 3),
+            "latency_ms": round(s["latency"] * 1000, 2),
+            "ok": s["ok"],
+            "error": s["error"] or "",
+        }
+        for s in samples
+    ]
+    path = bench.write_results("registration-load", summary, rows=rows)
+
+    for op, op_summary in summary["operations"].items():
+        bench.print_summary(f"registration-service · {op}", op_summary)
+
+    header("BENCHMARK COMPLETADO")
+    print(f"✔ Resultados en {path}")
+
+if __name__ == "__main__":
+    main()
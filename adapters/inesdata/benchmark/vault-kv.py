@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+vault-kv.py
+
+BENCHMARK – Throughput de Vault KV con el layout de secretos del connector
+
+connector-setup.py apunta cada connector a Vault KV (mount secret/, clave
+"content", alias demo/<release>/public-key y demo/<release>/private-key) y
+connector-create.py:ensure_kv_v2 gestiona el mount. Este benchmark precarga
+K releases sintéticas (bench-vault-NN) y lanza lecturas y escrituras
+concurrentes con hvac contra la única réplica common-srvs-vault-0, como
+cuando muchos connectors resuelven sus claves al arrancar.
+
+Parámetros (entorno o config):
+- BENCH_RELEASES        releases sintéticas K                       [20]
+- BENCH_RATE            operaciones/s objetivo (0 = sin límite)     [0]
+- BENCH_CONCURRENCY     hilos                                       [16]
+- BENCH_DURATION        segundos                                    [60]
+- BENCH_WRITE_RATIO     fracción de escrituras                      [0.1]
+- BENCH_SAMPLE_INTERVAL segundos entre muestras de kubectl top      [5]
+- BENCH_CLEANUP         0 = conservar los secretos sintéticos       [1]
+
+Salida: runtime/benchmarks/vault-kv-<run>.{json,csv}
+(latencia y throughput por operación + CPU / memoria del pod Vault)
+"""
+
+import json
+import secrets
+import sys
+import threading
+from pathlib import Path
+
+import hvac
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import bench, runner, vault
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+NAMESPACE = "demo"
+MOUNT = "secret"
+VALUE_KEY = "content"
+KEYS = ("public-key", "private-key")
+
+VAULT_PORT = 8200
+PREFIX = "bench-vault"
+
+def configure(config=None) -> dict:
+    env = runner.settings(config)
+    return {
+        "releases": int(env.get("BENCH_RELEASES", 20)),
+        "rate": float(env.get("BENCH_RATE", 0)),
+        "concurrency": int(env.get("BENCH_CONCURRENCY", 16)),
+        "duration": float(env.get("BENCH_DURATION", 60)),
+        "write_ratio": float(env.get("BENCH_WRITE_RATIO", 0.1)),
+        "sample_interval": float(env.get("BENCH_SAMPLE_INTERVAL", 5)),
+        "cleanup": env.get("BENCH_CLEANUP", "1") != "0",
+    }
+
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+def header(title):
+    print("\n" + "=" * 80)
+    print(title)
+    print("=" * 80)
+
+def secret_paths(count: int):
+    """
+    demo/<release>/public-key y demo/<release>/private-key (alias del connector).
+    """
+    return [
+        f"{NAMESPACE}/{PREFIX}-{i:02d}/{key}"
+        for i in range(1, count + 1)
+        for key in KEYS
+    ]
+
+def synthetic_key() -> str:
+    # Tamaño comparable a un PEM RSA 2048
+    body = secrets.token_urlsafe(1200)
+    return f"-----BEGIN BENCH KEY-----\n{body}\n-----END BENCH KEY-----\n"
+
+def is_write(i: int, ratio: float) -> bool:
+    return bench.picked(i, ratio)
+
+def root_token() -> str:
+    return json.loads(vault.INIT_KEYS_FILE.read_text())["root_token"]
+
+# =============================================================================
+# OPERACIONES KV v2
+# =============================================================================
+
+def write(client, path: str):
+    client.secrets.kv.v2.create_or_update_secret(
+        path=path, secret={VALUE_KEY: synthetic_key()}, mount_point=MOUNT
+    )
+
+def read(client, path: str):
+    data = client.secrets.kv.v2.read_secret_version(
+        path=path, mount_point=MOUNT, raise_on_deleted_version=True
+    )
+    return VALUE_KEY in data["data"]["data"]
+
+def preload(client, paths):
+    header(f"BENCHMARK – Precarga de {len(paths)} secretos")
+    for path in paths:
+        write(client, path)
+    print(f"✓ {len(paths)} secretos en {MOUNT}/{NAMESPACE}/{PREFIX}-*")
+
+def cleanup(client, paths):
+    header("BENCHMARK – Limpieza de secretos sintéticos")
+    for path in paths:
+        client.secrets.kv.v2.delete_metadata_and_all_versions(path=path, mount_point=MOUNT)
+    print(f"✓ {len(paths)} secretos eliminados")
+
+# =============================================================================
+# CARGA
+# =============================================================================
+
+def run(settings: dict, vault_url: str, token: str, paths):
+    local = threading.local()
+    ratio = settings["write_ratio"]
+
+    def call(i):
+        if not hasattr(local, "client"):
+            local.client = hvac.Client(url=vault_url, token=token)
+        path = paths[i % len(paths)]
+        if is_write(i, ratio):
+            write(local.client, path)
+            return True
+        return read(local.client, path)
+
+    with bench.sample_pods(vault.VAULT_NAMESPACE, vault.VAULT_POD, settings["sample_interval"]) as usage:
+        samples, elapsed = bench.run_load(
+            call,
+            rate=settings["rate"],
+            concurrency=settings["concurrency"],
+            duration=settings["duration"],
+        )
+    return samples, elapsed, usage
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main(config=None):
+    settings = configure(config)
+    header("BENCHMARK – Vault KV (layout de secretos del connector)")
+
+    bench.ensure_metrics_server()
+    token = root_token()
+    paths = secret_paths(settings["releases"])
+
+    with bench.port_forward(f"pod/{vault.VAULT_POD}", vault.VAULT_NAMESPACE,
+                            VAULT_PORT, VAULT_PORT) as vault_url:
+        client = hvac.Client(url=vault_url, token=token)
+        if client.sys.is_sealed():
+            sys.exit("❌ Vault sellado (python deploy.py nivel_3 lo desella)")
+
+        try:
+            preload(client, paths)
+            print(
+                f"▶ {settings['rate'] or '∞'} op/s, {settings['concurrency']} hilos, "
+                f"{settings['duration']:.0f}s, escrituras {settings['write_ratio']:.0%}"
+            )
+            samples, elapsed, usage = run(settings, vault_url, token, paths)
+        finally:
+            if settings["cleanup"]:
+                cleanup(client, paths)
+
+    ratio = settings["write_ratio"]
+    operations = {
+        "read": [s for s in samples if not is_write(s["i"], ratio)],
+        "write": [s for s in samples if is_write(s["i"], ratio)],
+    }
+    summary = {
+        "settings": settings,
+        "total": bench.summarize(samples, elapsed),
+        "operations": {op: bench.summarize(s, elapsed) for op, s in operations.items() if s},
+        "vault_pod": bench.usage_stats(usage),
+    }
+    path = bench.write_results("vault-kv", summary, rows=usage)
+
+    for op, op_summary in summary["operations"].items():
+        bench.print_summary(f"Vault KV · {op}", op_summary)
+    for field, stats in summary["vault_pod"].items():
+        print(f"   {vault.VAULT_POD} {field}: media {stats['avg']}  pico {stats['max']}")
+
+    header("BENCHMARK COMPLETADO")
+    print(f"✔ Resultados en {path}")
+
+if __name__ == "__main__":
+    main()
@@ -116,7 +116,7 @@ def ensure_inesdata_repo():
 # MAIN
 # =============================================================================
 
-def main():
+def main(config=None):
     preflight()
     prepare_directories()
     ensure_inesdata_repo()
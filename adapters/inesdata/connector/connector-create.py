@@ -10,13 +10,16 @@ import subprocess
 import sys
 import base64
 from pathlib import Path
-from datetime import datetime
 import json
 import os
 import re
-import time
 import requests
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import deployer, postgres, runner, yaml_utils
+from lib.backups import backup
+
 # =============================================================================
 # CONFIGURACIÓN
 # =============================================================================
@@ -41,6 +44,20 @@ CONNECTOR_DIR = WORKDIR / "connector"
 RAW_VALUES = CONNECTOR_DIR / f"values.yaml.{CONNECTOR}"
 FINAL_VALUES = CONNECTOR_DIR / f"values-{CONNECTOR}.yaml"
 
+def configure(config=None):
+    """
+    CONNECTOR_NAME (entorno o config) permite crear connectors adicionales
+    (benchmarks de densidad) con el mismo flujo que el connector de la demo.
+    """
+    global CONNECTOR, CONNECTOR_DB, CONNECTOR_ROLE, RAW_VALUES, FINAL_VALUES
+
+    env = runner.settings(config)
+    CONNECTOR = env.get("CONNECTOR_NAME", "conn-oeg-demo")
+    CONNECTOR_DB = CONNECTOR.replace("-", "_")
+    CONNECTOR_ROLE = CONNECTOR_DB
+    RAW_VALUES = CONNECTOR_DIR / f"values.yaml.{CONNECTOR}"
+    FINAL_VALUES = CONNECTOR_DIR / f"values-{CONNECTOR}.yaml"
+
 # =============================================================================
 # UTILIDADES
 # =============================================================================
@@ -68,14 +85,21 @@ def require_file(path: Path, desc: str):
     if not path.exists():
         sys.exit(f"❌ Falta {desc}: {path}")
 
-def backup(path: Path):
-    if not path.exists():
-        return
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    bkp = path.with_suffix(path.suffix + f".backup.{ts}")
-    bkp.write_text(path.read_text())
+VAULT_ADDR = "http://127.0.0.1:8200"
+
+# Entorno del CLI vault (root token) solo para sus propios subprocesos:
+# el orquestador ejecuta este script en proceso y no debe heredarlo
+_vault_token = None
+
+def vault_env():
+    env = dict(os.environ)
+    env["VAULT_ADDR"] = VAULT_ADDR
+    if _vault_token:
+        env["VAULT_TOKEN"] = _vault_token
+    return env
 
 def sync_vault_token():
+    global _vault_token
     header("NIVEL 7 – Sincronización automática de VT_TOKEN")
 
     init_file = WORKDIR / "common" / "init-keys-vault.json"
@@ -107,17 +131,17 @@ def sync_vault_token():
         print("✓ VT_TOKEN ya sincronizado")
 
     # ------------------------------------------------------------------
-    # Exportar entorno para CLI Vault
+    # Entorno para CLI Vault (solo en las llamadas a `vault`)
     # ------------------------------------------------------------------
-    os.environ["VAULT_ADDR"] = "http://127.0.0.1:8200"
-    os.environ["VAULT_TOKEN"] = root_token
+    _vault_token = root_token
 
     print("🔐 Autenticando CLI contra Vault...")
 
     login = subprocess.run(
         ["vault", "login", root_token],
         capture_output=True,
-        text=True
+        text=True,
+        env=vault_env(),
     )
 
     if login.returncode != 0:
@@ -151,7 +175,8 @@ def ensure_kv_v2():
     result = subprocess.run(
         ["vault", "secrets", "list", "-format=json"],
         capture_output=True,
-        text=True
+        text=True,
+        env=vault_env(),
     )
 
     if result.returncode != 0:
@@ -168,7 +193,8 @@ def ensure_kv_v2():
         print("→ secret/ no existe. Habilitando KV v2...")
         subprocess.run(
             ["vault", "secrets", "enable", "-path=secret", "-version=2", "kv"],
-            check=True
+            check=True,
+            env=vault_env(),
         )
         print("✓ KV v2 habilitado correctamente")
         return
@@ -179,12 +205,14 @@ def ensure_kv_v2():
 
         subprocess.run(
             ["vault", "secrets", "disable", "secret/"],
-            check=True
+            check=True,
+            env=vault_env(),
         )
 
         subprocess.run(
             ["vault", "secrets", "enable", "-path=secret", "-version=2", "kv"],
-            check=True
+            check=True,
+            env=vault_env(),
         )
 
         print("✓ KV v2 habilitado correctamente")
@@ -218,23 +246,23 @@ def fix_database_hostname():
 
     require_file(FINAL_VALUES, "values.yaml final")
 
-    content = FINAL_VALUES.read_text()
+    # FQDN del service PostgreSQL (multi-namespace)
+    service_fqdn = f"common-srvs-postgresql.{PG_NAMESPACE}.svc.cluster.local"
 
-    # Construir FQDN correcto
-    fqdn = f"{PG_POD.replace('-0','')}.{PG_NAMESPACE}.svc.cluster.local"
+    def fix(value, key):
+        if key == "hostname" and value == "common-srvs-postgresql":
+            return service_fqdn
+        return value
 
-    # Alternativa más directa (service name)
-    service_fqdn = f"common-srvs-postgresql.{PG_NAMESPACE}.svc.cluster.local"
+    backup(FINAL_VALUES)
 
-    # Reemplazar hostname corto si existe
-    if "common-srvs-postgresql" in content:
-        backup(FINAL_VALUES)
-        content = re.sub(
-            r"hostname:\s*common-srvs-postgresql",
-            f"hostname: {service_fqdn}",
-            content
-        )
-        FINAL_VALUES.write_text(content)
+    with yaml_utils.edit(FINAL_VALUES) as values:
+        fixed = yaml_utils.map_strings(values, fix)
+        changed = fixed != values
+        values.clear()
+        values.update(fixed)
+
+    if changed:
         print(f"✓ Hostname actualizado a {service_fqdn}")
     else:
         print("✓ Hostname ya en formato FQDN correcto")
@@ -285,60 +313,13 @@ def require_edc_schema(pg_password: str):
 # =============================================================================
 
 def cleanup_connector_db(pg_password: str):
-    import time
-
     header("NIVEL 7 – Limpieza DB del connector")
 
-    # --------------------------------------------------
-    # 1️⃣ Terminar conexiones activas
-    # --------------------------------------------------
-    run_shell(
-        f"kubectl exec -n {PG_NAMESPACE} {PG_POD} -- "
-        f"sh -c \"PGPASSWORD={pg_password} "
-        f"psql -U {PG_ADMIN_USER} -d postgres "
-        f"-c \\\"SELECT pg_terminate_backend(pid) "
-        f"FROM pg_stat_activity "
-        f"WHERE datname = '{CONNECTOR_DB}' "
-        f"AND pid <> pg_backend_pid();\\\"\""
-    )
-
-    # --------------------------------------------------
-    # 2️⃣ Drop database con retry (máx 30s)
-    # --------------------------------------------------
-    retries = 6
-    delay = 5
-
-    for attempt in range(1, retries + 1):
-        try:
-            run_shell(
-                f"kubectl exec -n {PG_NAMESPACE} {PG_POD} -- "
-                f"sh -c \"PGPASSWORD={pg_password} "
-                f"psql -U {PG_ADMIN_USER} -d postgres "
-                f"-c \\\"DROP DATABASE IF EXISTS {CONNECTOR_DB};\\\"\""
-            )
-            print("✓ Database eliminada correctamente")
-            break
-
-        except subprocess.CalledProcessError:
-            if attempt == retries:
-                sys.exit("❌ No se pudo eliminar la base tras múltiples intentos")
-
-            print(f"⚠️ Base en uso. Reintentando en {delay}s... ({attempt}/{retries})")
-            time.sleep(delay)
-
-    # --------------------------------------------------
-    # 3️⃣ Drop role
-    # --------------------------------------------------
-    run_shell(
-        f"kubectl exec -n {PG_NAMESPACE} {PG_POD} -- "
-        f"sh -c \"PGPASSWORD={pg_password} "
-        f"psql -U {PG_ADMIN_USER} -d postgres "
-        f"-c \\\"DROP ROLE IF EXISTS {CONNECTOR_ROLE};\\\"\""
-    )
+    # DROP ... WITH (FORCE) termina las sesiones activas: sin bucle de reintentos
+    postgres.psql(postgres.drop_statements(CONNECTOR_DB, CONNECTOR_ROLE))
 
     print("✓ DB y roles del connector limpiados correctamente")
 
-
 def cleanup_edc_registration(pg_password: str):
     header("NIVEL 7 – Limpieza registro EDC")
 
@@ -360,10 +341,16 @@ def cleanup_edc_registration(pg_password: str):
 
 def create_connector():
     header(f"NIVEL 7 – Creación lógica del connector '{CONNECTOR}'")
-    run(
-        ["python3", "deployer.py", "connector", "create", CONNECTOR, DATASPACE],
-        cwd=WORKDIR
-    )
+    # Deployer en proceso (lib/deployer.py): misma sesión, sin intérprete nuevo
+    deployer.create_connector(CONNECTOR, DATASPACE)
+
+def clone_connector_db():
+    """
+    Con PIONERA_DB_TEMPLATES activo y plantilla disponible, la base vacía
+    creada por el deployer se sustituye por una copia ya migrada.
+    """
+    if postgres.clone_from_template(CONNECTOR_DB, CONNECTOR_ROLE):
+        print(f"✓ DB del connector clonada desde {postgres.template_name(CONNECTOR_DB)}")
 
 # =============================================================================
 # NORMALIZACIÓN
@@ -423,7 +410,8 @@ def verify_outputs():
 # MAIN
 # =============================================================================
 
-def main():
+def main(config=None):
+    configure(config)
     pg_password = get_pg_admin_password()
 
     # --------------------------------------------------
@@ -445,6 +433,7 @@ def main():
     # 3. Creación del connector
     # --------------------------------------------------
     create_connector()
+    clone_connector_db()
 
     # --------------------------------------------------
     # 4. Normalización y ajustes
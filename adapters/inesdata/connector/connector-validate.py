@@ -1,6 +1,12 @@
 #!/usr/bin/env python3
 import subprocess
 import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import logs, metrics
+from lib.kubectl import cache as cluster_cache, pod_status
 
 CONNECTOR = "conn-oeg-demo"
 NAMESPACE = "demo"
@@ -11,7 +17,20 @@ PG_USER = "postgres"
 PG_DB = "demo_rs"
 PG_PASSWORD = "xxxxCHANGEMExxxx"  # coherente con entorno QA
 
-def run(cmd, error, expect=None):
+def check(name):
+    """
+    Duración y resultado de cada comprobación (lib/metrics.py).
+    """
+    return metrics.track(
+        "pionera_validation_check_duration_seconds", "pionera_validation_checks_total",
+        component="connector", connector=CONNECTOR, check=name,
+    )
+
+def run(cmd, error, expect=None, name="command"):
+    with check(name):
+        _run(cmd, error, expect)
+
+def _run(cmd, error, expect=None):
     print(f"▶ {cmd}")
     r = subprocess.run(
         cmd,
@@ -34,40 +53,49 @@ def run(cmd, error, expect=None):
             print(f"   Real: {out}")
             sys.exit(1)
 
+metrics.start("validate-connector")
+
 print("\n=== FASE 1 – VALIDACIÓN BÁSICA DEL CONECTOR (POST-DEPLOY) ===\n")
 
+# Un único listado de pods (cache de la ejecución) para las comprobaciones 1 y 2
+connector_pods = [
+    p for p in cluster_cache().list("pods", NAMESPACE)
+    if CONNECTOR in p["metadata"]["name"]
+]
+
 # -------------------------------------------------------------------
 # 1. Pod del conector en estado Running
 # -------------------------------------------------------------------
-run(
-    f"kubectl get pods -n {NAMESPACE} | grep {CONNECTOR} | grep Running",
-    "Pod del conector no está en estado Running"
-)
+print(f"▶ Pods '{CONNECTOR}' en {NAMESPACE}")
+with check("pod_running"):
+    if not any(pod_status(p) == "Running" for p in connector_pods):
+        print("❌ Pod del conector no está en estado Running")
+        sys.exit(1)
 
 # -------------------------------------------------------------------
 # 2. Verificación de InitContainers (si existen)
 # -------------------------------------------------------------------
 print("▶ Verificando initContainers (si existen)...")
 
-cmd = f"""
-kubectl get pod -n {NAMESPACE} \
-$(kubectl get pods -n {NAMESPACE} | grep {CONNECTOR} | awk '{{print $1}}') \
--o jsonpath="{{.status.initContainerStatuses[*].state}}"
-"""
-
-r = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-
-# Si no hay initContainers, es OK
-if r.stdout.strip() == "":
-    print("✓ No se detectan initContainers (OK)")
-else:
-    # Si existen, verificamos que no haya errores
-    if "Error" in r.stdout or "CrashLoopBackOff" in r.stdout:
-        print("❌ InitContainer con error detectado")
-        print(r.stdout)
-        sys.exit(1)
+init_states = [
+    cs.get("state", {})
+    for p in connector_pods
+    for cs in p.get("status", {}).get("initContainerStatuses", [])
+]
+
+with check("init_containers"):
+    # Si no hay initContainers, es OK
+    if not init_states:
+        print("✓ No se detectan initContainers (OK)")
     else:
-        print("✓ InitContainers ejecutados correctamente")
+        # Si existen, verificamos que no haya errores
+        rendered = str(init_states)
+        if "Error" in rendered or "CrashLoopBackOff" in rendered:
+            print("❌ InitContainer con error detectado")
+            print(rendered)
+            sys.exit(1)
+        else:
+            print("✓ InitContainers ejecutados correctamente")
 
 # -------------------------------------------------------------------
 # 3. Registro EDC del conector (tabla edc_participant)
@@ -86,7 +114,8 @@ psql -t -A \
       );"
 """,
     "El conector no está registrado en EDC",
-    expect="t"
+    expect="t",
+    name="edc_registration",
 )
 
 # -------------------------------------------------------------------
@@ -99,7 +128,8 @@ kubectl exec -n {NAMESPACE} deployment/{CONNECTOR} -- \
 curl -s -o /dev/null -w "%{{http_code}}" \
 http://localhost:19193/management
 """,
-    "La Management API no responde"
+    "La Management API no responde",
+    name="management_api",
 )
 
 # -------------------------------------------------------------------
@@ -107,19 +137,17 @@ http://localhost:19193/management
 # -------------------------------------------------------------------
 print("▶ Verificando estabilidad del conector vía logs (errores críticos reales)...")
 
-cmd = f"""
-kubectl logs deployment/{CONNECTOR} -n {NAMESPACE} --tail=100 | \
-grep -E "FATAL|OutOfMemory|NullPointerException|CrashLoopBackOff|BindException|Cannot start"
-"""
-
-r = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+with check("logs"):
+    # Todos los pods de demo y common-srvs, contenedores anteriores incluidos
+    log_result = logs.analyze()
+    logs.print_findings(log_result)
 
-if r.stdout.strip():
-    print("❌ Errores críticos detectados en logs:")
-    print(r.stdout)
-    sys.exit(1)
-else:
-    print("✓ Sin errores críticos. 401/403 esperables ignorados (OK)")
+    connector_critical = [f for f in logs.critical(log_result) if CONNECTOR in f["pod"]]
+    if connector_critical:
+        print(f"❌ {len(connector_critical)} errores críticos en el conector")
+        sys.exit(1)
+    else:
+        print("✓ Sin errores críticos en el conector. 401/403 esperables ignorados (OK)")
 
 print("\n✔ Conector operativo (FASE 1 – Infraestructura y Registro)\n")
 print("➡ Listo para FASE 2: autenticación, CRUD y flujos funcionales\n")
@@ -20,7 +20,10 @@ REGLAS CRÍTICAS (ANTI-REGRESIÓN):
 import subprocess
 import sys
 from pathlib import Path
-from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import backups, deployer
 
 # =============================================================================
 # CONFIGURACIÓN
@@ -82,14 +85,6 @@ def require_file(path: Path, description: str):
         print(f"❌ Falta {description}: {path}")
         sys.exit(1)
 
-def backup(path: Path):
-    if not path.exists():
-        return None
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    bkp = path.with_suffix(path.suffix + f".backup.{ts}")
-    bkp.write_text(path.read_text())
-    return bkp
-
 # =============================================================================
 # FASE 4 – PRECONDICIONES
 # =============================================================================
@@ -113,11 +108,8 @@ def create_dataspace():
     # Esperar Keycloak antes de crear realm
     wait_for_keycloak_ready()
 
-    result = run(
-        ["python3", "deployer.py", "dataspace", "create", DATASPACE],
-        cwd=WORKDIR,
-        check=False
-    )
+    # Deployer en proceso (lib/deployer.py): misma sesión, sin intérprete nuevo
+    deployer.create_dataspace(DATASPACE, check=False)
 
 # =============================================================================
 # FASE 5 – NORMALIZACIÓN DE ARTEFACTOS (SOLO VALUES)
@@ -137,7 +129,7 @@ def normalize_values():
             print(f"✓ {dst.name} ya existe (idempotente)")
             continue
 
-        backup(src)
+        backups.backup(src)
         src.rename(dst)
         print(f"✓ {src.name} → {dst.name}")
 
@@ -158,7 +150,7 @@ def verify_outputs():
 # MAIN
 # =============================================================================
 
-def main():
+def main(config=None):
     check_preconditions()
     create_dataspace()
     normalize_values()
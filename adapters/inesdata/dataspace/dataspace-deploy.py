@@ -7,7 +7,7 @@ NIVEL 6 – Despliegue del Dataspace INESData (Step-1)
 VERSIÓN CANÓNICA DEFINITIVA:
 - Credenciales leídas desde values-demo.yaml (fuente lógica)
 - PostgreSQL admin password leído desde Secret Kubernetes
-- DB recreada con password REAL generado por deployer
+- DB reconciliada con password REAL generado por deployer (solo diferencias)
 - 100% determinista
 """
 
@@ -16,9 +16,13 @@ import sys
 import time
 import json
 import base64
-import yaml
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import evidence, helm, postgres, yaml_utils
+from lib.kubectl import Manifest
+
 # =============================================================================
 # CONFIGURACIÓN
 # =============================================================================
@@ -73,8 +77,7 @@ def get_registration_db_credentials():
     Fuente de verdad para Step-1:
     dataspace/step-1/values-demo.yaml
     """
-    with open(VALUES_FILE, "r") as f:
-        values = yaml.safe_load(f)
+    values = yaml_utils.load(VALUES_FILE)
 
     db = values["services"]["db"]["registration"]
 
@@ -119,49 +122,67 @@ def wait_for_postgres():
     sys.exit("❌ PostgreSQL no accesible")
 
 # =============================================================================
-# RESET DB (SIN HARDCODE)
+# RECONCILIACIÓN DB (SIN HARDCODE)
 # =============================================================================
 
-def recreate_db():
-    header("NIVEL 6 – Reset controlado DB (credenciales reales)")
+def reconcile_db():
+    """
+    Aplica solo las diferencias (rol, password, owner, base) respecto a
+    values-demo.yaml. PIONERA_DB_RESET=1 fuerza drop + create.
+    """
+    header("NIVEL 6 – Reconciliación DB registro (credenciales reales)")
 
-    admin_pwd = get_pg_admin_password()
     db_name, db_user, db_pass = get_registration_db_credentials()
 
-    sql_cmds = [
-        f"DROP DATABASE IF EXISTS {db_name};",
-        f"DROP ROLE IF EXISTS {db_user};",
-        f"CREATE ROLE {db_user} LOGIN PASSWORD '{db_pass}';",
-        f"CREATE DATABASE {db_name} OWNER {db_user};"
-    ]
+    stmts = postgres.reconcile([
+        {"name": db_name, "owner": db_user, "password": db_pass}
+    ])
 
-    for sql in sql_cmds:
-        run([
-            "kubectl", "exec",
-            "-n", PG_NAMESPACE,
-            PG_POD,
-            "--", "sh", "-c",
-            f"PGPASSWORD={admin_pwd} "
-            f"psql -U {PG_ADMIN_USER} -d postgres -c \"{sql}\""
-        ])
+    if stmts:
+        print(postgres.describe(stmts))
+        print("✓ DB alineada con credenciales del deployer")
+    else:
+        print("✓ DB ya alineada con credenciales del deployer (sin cambios)")
 
-    print("✓ DB recreada con credenciales del deployer")
+    return stmts
 
 # =============================================================================
 # HELM
 # =============================================================================
 
-def deploy_helm():
+def registration_config():
+    """
+    Contenido efectivo del ConfigMap y Secret del registration-service.
+    """
+    db_name, db_user, db_pass = get_registration_db_credentials()
+    jdbc = f"jdbc:postgresql://common-srvs-postgresql.common-srvs.svc:5432/{db_name}"
+    configmap = {
+        "SPRING_DATASOURCE_URL": jdbc,
+        "SPRING_DATASOURCE_USERNAME": db_user,
+    }
+    secret = {
+        "SPRING_DATASOURCE_PASSWORD": db_pass,
+    }
+    return configmap, secret
+
+def deploy_helm(db_changed=False):
+    """
+    El hash (values + ConfigMap + Secret) viaja en el pod template:
+    Helm solo rota el deployment si la configuración cambió.
+    Una base recreada en esta ejecución también fuerza la rotación.
+    """
     header("NIVEL 6 – Helm Step-1")
-    run(
-        [
-            "helm", "upgrade", "--install", RELEASE,
-            "-n", NAMESPACE,
-            "--create-namespace",
-            "-f", f"values-{DATASPACE}.yaml",
-            "."
-        ],
-        cwd=STEP1_DIR
+
+    configmap, secret = registration_config()
+    parts = [VALUES_FILE, configmap, secret]
+    if db_changed:
+        parts.append(evidence.current_run_id())
+
+    helm.upgrade_install(
+        RELEASE, NAMESPACE, f"values-{DATASPACE}.yaml", cwd=STEP1_DIR,
+        config_hash=helm.config_hash(*parts),
+        targets=[DEPLOYMENT],
+        component="dataspace",
     )
 
 # =============================================================================
@@ -169,52 +190,44 @@ def deploy_helm():
 # =============================================================================
 
 def ensure_configmap_and_secret():
-    header("NIVEL 6 – Garantía ConfigMap / Secret")
-
-    db_name, db_user, db_pass = get_registration_db_credentials()
-    jdbc = f"jdbc:postgresql://common-srvs-postgresql.common-srvs.svc:5432/{db_name}"
+    """
+    Namespace + ConfigMap + Secret en UN server-side apply (field manager pionera).
+    """
+    header("NIVEL 6 – Garantía Namespace / ConfigMap / Secret")
 
-    run([
-        "sh", "-c",
-        f"""
-kubectl create configmap {CONFIGMAP} -n {NAMESPACE} \
-  --from-literal=SPRING_DATASOURCE_URL={jdbc} \
-  --from-literal=SPRING_DATASOURCE_USERNAME={db_user} \
-  --dry-run=client -o yaml | kubectl apply -f -
-"""
-    ])
+    configmap, secret = registration_config()
 
-    run([
-        "sh", "-c",
-        f"""
-kubectl create secret generic {SECRET} -n {NAMESPACE} \
-  --from-literal=SPRING_DATASOURCE_PASSWORD={db_pass} \
-  --dry-run=client -o yaml | kubectl apply -f -
-"""
-    ])
+    (
+        Manifest()
+        .namespace(NAMESPACE)
+        .configmap(CONFIGMAP, NAMESPACE, configmap)
+        .secret(SECRET, NAMESPACE, secret)
+        .apply()
+    )
 
     print("✓ ConfigMap y Secret alineados con values.yaml")
 
 # =============================================================================
-# RESTART
+# ROLLOUT
 # =============================================================================
 
-def restart_deployment():
-    header("NIVEL 6 – Reinicio controlado")
-    run(["kubectl", "rollout", "restart", f"deployment/{DEPLOYMENT}", "-n", NAMESPACE])
+def wait_rollout():
+    # Sin restart incondicional: el rollout (si hubo) lo dispara el config-hash
+    header("NIVEL 6 – Rollout por hash de configuración")
     run(["kubectl", "rollout", "status", f"deployment/{DEPLOYMENT}", "-n", NAMESPACE])
 
 # =============================================================================
 # MAIN
 # =============================================================================
 
-def main():
+def main(config=None):
     check_preconditions()
     wait_for_postgres()
-    recreate_db()
-    deploy_helm()
+    db_stmts = reconcile_db()
+    # Namespace / ConfigMap / Secret antes de Helm: el pod nuevo arranca ya con ellos
     ensure_configmap_and_secret()
-    restart_deployment()
+    deploy_helm(db_changed=bool(db_stmts))
+    wait_rollout()
 
     header("NIVEL 6 COMPLETADO (DETERMINISTA)")
     print("✔ DB alineada con deployer")
@@ -1,6 +1,12 @@
 #!/usr/bin/env python3
 import subprocess
 import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import metrics
+from lib.kubectl import cache as cluster_cache, pod_status
 
 DATASPACE = "demo"
 NAMESPACE = "demo"
@@ -13,7 +19,20 @@ PG_USER = "postgres"
 PG_DB = "demo_rs"
 PG_PASSWORD = "xxxxCHANGEMExxxx"   # se encuentra en runtime/workdir/inesdata-deployment/common/values.yaml
 
-def run(cmd, error, expect=None):
+def check(name):
+    """
+    Duración y resultado de cada comprobación (lib/metrics.py).
+    """
+    return metrics.track(
+        "pionera_validation_check_duration_seconds", "pionera_validation_checks_total",
+        component="dataspace", dataspace=DATASPACE, check=name,
+    )
+
+def run(cmd, error, expect=None, name="command"):
+    with check(name):
+        _run(cmd, error, expect)
+
+def _run(cmd, error, expect=None):
     print(f"▶ {cmd}")
     r = subprocess.run(
         cmd,
@@ -36,6 +55,8 @@ def run(cmd, error, expect=None):
             print(f"   Resultado real: {out}")
             sys.exit(1)
 
+metrics.start("validate-dataspace")
+
 print("\n=== FASE 1 – VALIDACIÓN DATASPACE (POST-DEPLOY) ===\n")
 
 # -------------------------------------------------------------------
@@ -43,16 +64,21 @@ print("\n=== FASE 1 – VALIDACIÓN DATASPACE (POST-DEPLOY) ===\n")
 # -------------------------------------------------------------------
 run(
     f"kubectl get ns {NAMESPACE}",
-    "Namespace del dataspace no existe"
+    "Namespace del dataspace no existe",
+    name="namespace",
 )
 
 # -------------------------------------------------------------------
 # 2. Registration Service operativo
 # -------------------------------------------------------------------
-run(
-    f"kubectl get pods -n {NAMESPACE} | grep registration-service | grep Running",
-    "registration-service no está en estado Running"
-)
+print(f"▶ Pods 'registration-service' en {NAMESPACE}")
+with check("registration_service_running"):
+    if not any(
+        "registration-service" in p["metadata"]["name"] and pod_status(p) == "Running"
+        for p in cluster_cache().list("pods", NAMESPACE)
+    ):
+        print("❌ registration-service no está en estado Running")
+        sys.exit(1)
 
 # -------------------------------------------------------------------
 # 3. Conectividad PostgreSQL (DB REAL del registration service)
@@ -63,7 +89,8 @@ kubectl exec -n {PG_NAMESPACE} {PG_HOST_POD} -- \
 env PGPASSWORD={PG_PASSWORD} \
 psql -U {PG_USER} -d {PG_DB} -c "SELECT 1;"
 """,
-    "DB del dataspace no accesible"
+    "DB del dataspace no accesible",
+    name="database",
 )
 
 # -------------------------------------------------------------------
@@ -85,7 +112,8 @@ psql -t -A \
       );"
 """,
     "Esquema EDC no inicializado (tabla edc_participant no encontrada)",
-    expect="t"
+    expect="t",
+    name="edc_schema",
 )
 
 print("\n✔ Dataspace operativo y EDC inicializado (POST-DEPLOY)\n")
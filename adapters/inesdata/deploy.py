@@ -5,9 +5,12 @@ import os
 import signal
 import sys
 from pathlib import Path
-import requests
 import time
 
+from lib import aio, evidence, metrics, postgres, vault
+from lib.runner import run_script
+from lib.kubectl import cache as cluster_cache, pod_ready
+
 # ==========================================================
 # UTILIDADES Y CONFIGURACIÓN GLOBAL
 # ==========================================================
@@ -28,22 +31,9 @@ def wait_for_file(path: Path, timeout=30):
 
     raise RuntimeError(f"❌ El fichero {path} no se generó en el tiempo esperado")
 
-def wait_for_keycloak(timeout=120):
-    print("⏳ Esperando a que Keycloak esté listo (localhost:8080)...")
-    start = time.time()
-
-    while time.time() - start < timeout:
-        try:
-            r = requests.get("http://127.0.0.1:8080/realms/master", timeout=3)
-            if r.status_code == 200:
-                print("✓ Keycloak listo")
-                return
-        except requests.exceptions.RequestException:
-            pass
-
-        time.sleep(3)
-
-    raise RuntimeError("❌ Keycloak no estuvo listo en el tiempo esperado")
+KEYCLOAK_PROBE = "http://127.0.0.1:8080/realms/master"
+VAULT_PROBE = "http://127.0.0.1:8200/v1/sys/health"
+VAULT_READY = (200, 429)   # activo / standby (unsealed)
 
 # Definimos ROOT aquí para que sea accesible desde cualquier nivel
 # Suponiendo que deploy.py está en adapters/inesdata/
@@ -71,6 +61,7 @@ def retry(func, retries=30, delay=5):
             print(f"\n❌ Intento {intento}/{retries} fallido: {e}")
             if intento == retries:
                 raise
+            metrics.inc("pionera_retries_total", component=getattr(func, "__name__", "retry"))
             time.sleep(delay)
 
 def run(cmd, background=False):
@@ -80,23 +71,23 @@ def run(cmd, background=False):
     else:
         subprocess.run(cmd, shell=True, check=True)
 
-def wait_for_pod_running(pod_name, namespace):
-    def check():
-        cmd = (
-            f"kubectl get pod {pod_name} -n {namespace} "
-            "-o jsonpath='{.status.phase}'"
-        )
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        if "Running" not in result.stdout:
-            raise RuntimeError(f"{pod_name} no está en Running aún")
-        print(f"✓ {pod_name} está en estado Running")
-    retry(check)
+def wait_for_pod_running(pod_name, namespace, timeout=150):
+    # Cache list+watch compartida: sin kubectl por iteración
+    pod = cluster_cache().wait_for(
+        "pods", namespace,
+        lambda p: p["metadata"]["name"] == pod_name
+        and p.get("status", {}).get("phase") == "Running",
+        timeout=timeout
+    )
+    if pod is None:
+        raise RuntimeError(f"{pod_name} no está en Running tras {timeout}s")
+    print(f"✓ {pod_name} está en estado Running")
 
 # ==========================================================
 # NIVEL 1
 # ==========================================================
 
-def nivel_1():
+def nivel_1(resource_profile=None, nodes=None):
     print("\n==============================")
     print("== NIVEL 1: Minikube ==")
     print("==============================")
@@ -105,6 +96,20 @@ def nivel_1():
     import time
     import sys
 
+    from lib import minikube, placement
+
+    # Perfil de recursos: argumento > PIONERA_RESOURCE_PROFILE > default
+    # Nodos: argumento > PIONERA_NODES > 1
+    # (python deploy.py nivel_1 auto | lean | default | perf [nodos])
+    node_count = minikube.resolve_nodes(nodes)
+    resources = minikube.resolve_resources(resource_profile, node_count)
+    print(
+        f"📐 Perfil de recursos '{resources['profile']}': "
+        f"{node_count} nodo(s) x {resources['cpus']} CPUs, {resources['memory']} MB "
+        f"(host: {resources['host_cpus']} CPUs, {resources['host_memory']} MB)"
+    )
+    evidence.fingerprint(minikube_resources=resources)
+
     # ------------------------------------------------------
     # 0. Cerrar túneles previos (evita procesos zombie)
     # ------------------------------------------------------
@@ -127,8 +132,7 @@ def nivel_1():
     print("🚀 Creando nuevo cluster Minikube...")
 
     result = subprocess.run(
-        "minikube start --driver=docker --cpus=4 --memory=4400",
-        shell=True
+        ["minikube", "start", "--driver=docker", *minikube.start_args(resources)]
     )
 
     if result.returncode != 0:
@@ -155,6 +159,24 @@ def nivel_1():
     else:
         sys.exit("❌ API server no responde")
 
+    # ------------------------------------------------------
+    # 3b. Nodos Ready + colocación por componente (multinodo)
+    # ------------------------------------------------------
+    if node_count > 1:
+        print(f"⏳ Esperando {node_count} nodos Ready...")
+        subprocess.run(
+            ["kubectl", "wait", "--for=condition=Ready", "nodes", "--all", "--timeout=180s"],
+            check=True
+        )
+
+    try:
+        assigned = placement.apply(node_count, minikube.PROFILE)
+    except ValueError as e:
+        sys.exit(f"❌ Colocación inválida: {e}")
+    for component, node_names in assigned.items():
+        print(f"📍 {component} → {', '.join(node_names)}")
+    evidence.fingerprint(placement=assigned)
+
     # ------------------------------------------------------
     # 4. Activar Ingress
     # ------------------------------------------------------
@@ -213,9 +235,10 @@ def nivel_2():
 
     run("pip install PyYAML")
 
-    run("python3 adapters/inesdata/bootstrap.py")
-    run("python3 adapters/inesdata/normalize/normalize-base.py")
-    run("python3 adapters/inesdata/install.py")
+    # Scripts en proceso (main(config)): sin intérprete nuevo por script
+    run_script("adapters/inesdata/bootstrap.py")
+    run_script("adapters/inesdata/normalize/normalize-base.py")
+    run_script("adapters/inesdata/install.py")
 
     run("kubectl get pods -n common-srvs")
 
@@ -316,38 +339,12 @@ def nivel_3():
             )
 
     # ------------------------------------------------------
-    # 4. Unseal si está sellado
+    # 4-5. Unseal si está sellado + verificación final
+    #      (lib/vault.py, compartido con la restauración de checkpoints)
     # ------------------------------------------------------
     if sealed:
         print("🔓 Ejecutando unseal...")
-
-        key = subprocess.check_output(
-            "jq -r '.unseal_keys_hex[0]' "
-            "runtime/workdir/inesdata-deployment/common/init-keys-vault.json",
-            shell=True
-        ).decode().strip()
-
-        subprocess.run(
-            f"kubectl exec common-srvs-vault-0 -n common-srvs -- "
-            f"vault operator unseal {key}",
-            shell=True,
-            check=True
-        )
-
-    # ------------------------------------------------------
-    # 5. Verificación final Vault
-    # ------------------------------------------------------
-    final = subprocess.run(
-        "kubectl exec common-srvs-vault-0 -n common-srvs -- vault status -format=json",
-        shell=True,
-        capture_output=True,
-        text=True
-    )
-
-    final_status = json.loads(final.stdout)
-
-    if final_status.get("sealed", True):
-        raise RuntimeError("❌ Vault sigue sellado tras unseal")
+    vault.unseal(init_file)
 
     print("✔ Vault inicializado y operativo (unsealed)")
 
@@ -367,11 +364,7 @@ def nivel_3():
 
     try:
         print("⚙ Ejecutando post-common.py...")
-        subprocess.run(
-            "python3 adapters/inesdata/normalize/post-common.py",
-            shell=True,
-            check=True
-        )
+        run_script("adapters/inesdata/normalize/post-common.py")
         print("✔ post-common.py ejecutado correctamente")
     finally:
         print("🔒 Cerrando port-forward de Vault")
@@ -397,12 +390,11 @@ def port_is_open(port):
 
 
 def wait_for_port(port, timeout=15):
-    start = time.time()
-    while time.time() - start < timeout:
-        if port_is_open(port):
-            return True
-        time.sleep(1)
-    return False
+    try:
+        aio.run(aio.wait_port(port, timeout=timeout))
+        return True
+    except TimeoutError:
+        return False
 
 
 def start_port_forward(name, cmd, port):
@@ -436,23 +428,36 @@ def nivel_4():
 
     print("🔌 Iniciando port-forwards modo local (PT5 determinista)")
 
-    pf_processes["postgres"] = start_port_forward(
-        "PostgreSQL",
-        "kubectl port-forward common-srvs-postgresql-0 -n common-srvs 5432:5432",
-        5432
-    )
-
-    pf_processes["vault"] = start_port_forward(
-        "Vault",
-        "kubectl port-forward common-srvs-vault-0 -n common-srvs 8200:8200",
-        8200
-    )
+    forwards = {
+        "postgres": ("common-srvs-postgresql-0", 5432),
+        "vault": ("common-srvs-vault-0", 8200),
+        "keycloak": ("common-srvs-keycloak-0", 8080),
+    }
+    for name, (pod, port) in forwards.items():
+        pf_processes[name] = subprocess.Popen(
+            f"kubectl port-forward {pod} -n common-srvs {port}:{port}", shell=True
+        )
 
-    pf_processes["keycloak"] = start_port_forward(
-        "Keycloak",
-        "kubectl port-forward common-srvs-keycloak-0 -n common-srvs 8080:8080",
-        8080
-    )
+    # Esperas concurrentes: la latencia es la del servicio más lento
+    print("⏳ Esperando Vault, PostgreSQL y Keycloak en paralelo...")
+    try:
+        elapsed = aio.run(aio.wait_all(
+            postgres=aio.wait_all(
+                port=aio.wait_port(5432, timeout=15),
+                ready=aio.wait_postgres(timeout=60),
+            ),
+            vault=aio.wait_http(VAULT_PROBE, timeout=60, ok=VAULT_READY, name="Vault"),
+            keycloak=aio.wait_http(KEYCLOAK_PROBE, timeout=120, name="Keycloak"),
+        ))
+    except TimeoutError as e:
+        for name in forwards:
+            pf_processes.pop(name).terminate()
+        raise RuntimeError(f"❌ {e}")
+
+    for name, seconds in elapsed.items():
+        if isinstance(seconds, dict):
+            seconds = max(seconds.values())
+        print(f"✓ {name} disponible ({seconds:.1f}s)")
 
     print("✔ Port-forwards activos y verificados")
 
@@ -464,7 +469,7 @@ def nivel_5():
     print("\n== NIVEL 5: Dataspace Create ==")
 
     os.environ["VAULT_ADDR"] = "http://127.0.0.1:8200"
-    run("python3 adapters/inesdata/dataspace/dataspace-create.py")
+    run_script("adapters/inesdata/dataspace/dataspace-create.py")
 
 # =============================================================================
 # NIVEL 6 – Dataspace Deploy (Clean Mode)
@@ -474,45 +479,15 @@ import subprocess
 import sys
 
 
-def ensure_namespace(name):
-    """
-    Crea el namespace si no existe.
-    No usa '|| true'.
-    """
-    check = subprocess.run(
-        ["kubectl", "get", "namespace", name],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL
-    )
-
-    if check.returncode != 0:
-        print(f"🆕 Namespace '{name}' no existe. Creándolo...")
-        subprocess.run(
-            ["kubectl", "create", "namespace", name],
-            check=True
-        )
-        print("✔ Namespace creado")
-    else:
-        print(f"✔ Namespace '{name}' ya existe")
-
-
 def nivel_6():
     print("\n== NIVEL 6: Dataspace Deploy ==")
 
     # --------------------------------------------------
-    # 1️⃣ Asegurar namespace
-    # --------------------------------------------------
-    ensure_namespace("demo")
-
-    # --------------------------------------------------
-    # 2️⃣ Ejecutar despliegue lógico
+    # Despliegue lógico (el namespace va en el server-side apply del nivel)
     # --------------------------------------------------
     print("🚀 Ejecutando dataspace-deploy.py...")
 
-    run([
-        "venv/bin/python",
-        "adapters/inesdata/dataspace/dataspace-deploy.py"
-    ])
+    run_script("adapters/inesdata/dataspace/dataspace-deploy.py")
 
     print("✔ Dataspace desplegado correctamente")
 
@@ -524,7 +499,6 @@ def nivel_7():
 
     header("NIVEL 7 – Despliegue y Verificación de Esquema EDC")
 
-    venv_python = PROJECT_ROOT / "venv" / "bin" / "python"
     script_creacion = PROJECT_ROOT / "adapters" / "inesdata" / "connector" / "connector-create.py"
 
     started_here = []
@@ -571,16 +545,9 @@ def nivel_7():
         # 3️⃣ Ejecutar creación del conector
         # --------------------------------------------------
         print("▶ Ejecutando script de creación...")
-        result = subprocess.run(
-            [str(venv_python), str(script_creacion)],
-            cwd=str(PROJECT_ROOT),
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            print(result.stdout)
-            print(result.stderr)
+        try:
+            run_script(script_creacion)
+        except subprocess.CalledProcessError:
             sys.exit("❌ ERROR EN CREACIÓN DEL CONNECTOR")
 
         print("✓ Script de creación finalizado correctamente.")
@@ -600,16 +567,12 @@ def nivel_7():
     # ------------------------------------------------------
     print("🔍 Detectando recurso desplegado en namespace 'demo'...")
 
-    check_deploy = subprocess.run(
-        ["kubectl", "get", "deployments", "-n", "demo", "-o", "name"],
-        capture_output=True,
-        text=True
-    )
+    deployments = cluster_cache().names("deployments", "demo")
 
-    if not check_deploy.stdout.strip():
+    if not deployments:
         sys.exit("❌ ERROR: No se creó ningún deployment en el namespace 'demo'.")
 
-    deploy_name = check_deploy.stdout.splitlines()[0]
+    deploy_name = f"deployment/{deployments[0]}"
     print(f"✓ Recurso detectado: {deploy_name}")
 
     print(f"⏳ Esperando a que {deploy_name} esté Running...")
@@ -623,20 +586,18 @@ def nivel_7():
     # ------------------------------------------------------
     print("⏳ Verificando esquema EDC en Postgres...")
 
+    # Si demo_rs se clonó de su plantilla el esquema ya existe: sin espera
     for i in range(1, 21):
-        db_check = subprocess.run(
-            [
-                "kubectl", "exec", "-n", "common-srvs", "common-srvs-postgresql-0", "--",
-                "sh", "-c",
-                "PGPASSWORD=xxxxCHANGEMExxxx psql -t -A -U postgres -d demo_rs -c "
-                "\"SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'edc_participant');\""
-            ],
-            capture_output=True,
-            text=True
-        )
+        try:
+            ready = postgres.catalog(postgres.RS_DB)["edc_schema"]
+        except (subprocess.CalledProcessError, ValueError):
+            # PostgreSQL / pod aún arrancando: se reintenta como antes
+            ready = False
 
-        if db_check.stdout.strip() == "t":
+        if ready:
             print("\n✔ Esquema EDC detectado correctamente!")
+            if postgres.snapshot_template(postgres.RS_DB):
+                print(f"✓ Plantilla {postgres.template_name(postgres.RS_DB)} generada")
             break
 
         print(f"   [{i}/20] Esperando inicialización...", end="\r")
@@ -702,24 +663,14 @@ def get_keycloak_admin_password():
 
 
 def wait_for_keycloak(timeout=60):
-    import requests
-
     print("⏳ Verificando disponibilidad de Keycloak vía Ingress...")
 
-    start = time.time()
-
-    while time.time() - start < timeout:
-        try:
-            r = requests.get("http://127.0.0.1:8080/realms/master", timeout=3)
-            if r.status_code == 200:
-                print("✔ Keycloak accesible vía Ingress")
-                return
-        except:
-            pass
-
-        time.sleep(3)
+    try:
+        aio.run(aio.wait_http(KEYCLOAK_PROBE, timeout=timeout, name="Keycloak"))
+    except TimeoutError:
+        sys.exit(f"❌ Keycloak no accesible tras esperar {timeout}s")
 
-    sys.exit("❌ Keycloak no accesible tras esperar 60s")
+    print("✔ Keycloak accesible vía Ingress")
 
 
 def nivel_8():
@@ -744,46 +695,28 @@ def nivel_8():
         sys.exit(f"❌ Error obteniendo password de Keycloak: {e}")
 
     # --------------------------------------------------
-    # 3️⃣ Preparar entorno para subprocess
+    # 3️⃣ Configuración compartida (claves = variables de entorno)
     # --------------------------------------------------
-    env = os.environ.copy()
-    env["KEYCLOAK_ADMIN_PASSWORD"] = admin_password
-
-    # Opcional: garantizar coherencia de URLs
-    env["KEYCLOAK_ADMIN_USER"] = "admin"
-    env["KEYCLOAK_ADMIN_REALM"] = "master"
+    config = {
+        "KC_URL": "http://127.0.0.1:8080",
+        "KEYCLOAK_ADMIN_PASSWORD": admin_password,
+        "KEYCLOAK_ADMIN_USER": "admin",
+        "KEYCLOAK_ADMIN_REALM": "master",
+        "DATASPACE_REALM": "demo",
+        "CONNECTOR_CLIENT_ID": "conn-oeg-demo",
+    }
 
     # --------------------------------------------------
     # 4️⃣ Ejecutar auth-bootstrap
     # --------------------------------------------------
     print("🚀 Ejecutando auth-bootstrap.py...")
-
-    env = os.environ.copy()
-
-    env["KC_URL"] = "http://127.0.0.1:8080"
-    env["KEYCLOAK_ADMIN_PASSWORD"] = admin_password
-    env["KEYCLOAK_ADMIN_USER"] = "admin"
-    env["DATASPACE_REALM"] = "demo"
-    env["CONNECTOR_CLIENT_ID"] = "conn-oeg-demo"
-
-    subprocess.run(
-        ["venv/bin/python", "adapters/inesdata/integration/auth/auth-bootstrap.py"],
-        check=True,
-        env=env
-    )
+    run_script("adapters/inesdata/integration/auth/auth-bootstrap.py", config)
 
     # --------------------------------------------------
     # 5️⃣ Ejecutar connector-setup
     # --------------------------------------------------
     print("🚀 Ejecutando connector-setup.py...")
-
-    run(
-        [
-            "venv/bin/python",
-            "adapters/inesdata/integration/connector/connector-setup.py"
-        ],
-        env=env
-    )
+    run_script("adapters/inesdata/integration/connector/connector-setup.py", config)
 
     header("NIVEL 8 COMPLETADO")
     print("✔ Auth + Connector Setup ejecutados correctamente")
@@ -797,21 +730,11 @@ def nivel_9():
     print("== NIVEL 9: Portal Create + Deploy ==")
     print("==============================")
 
-    venv_python = os.path.abspath("venv/bin/python")
-
     print("🚀 Ejecutando portal-create.py...")
-
-    subprocess.run(
-        [venv_python, "adapters/inesdata/portal/portal-create.py"],
-        check=True
-    )
+    run_script("adapters/inesdata/portal/portal-create.py")
 
     print("🚀 Ejecutando portal-deploy.py...")
-
-    subprocess.run(
-        [venv_python, "adapters/inesdata/portal/portal-deploy.py"],
-        check=True
-    )
+    run_script("adapters/inesdata/portal/portal-deploy.py")
 
     print("✔ NIVEL 9 COMPLETADO CORRECTAMENTE")
 
@@ -839,33 +762,29 @@ def nivel_10():
 """
 def nivel_10():
     header("NIVEL 10: Portal Setup (Deterministic Mode)")
-    venv_python = os.path.abspath("venv/bin/python")
 
     # 1. Buscar el pod usando un filtro de nombre parcial (más robusto que labels)
+    #    La cache (list + watch) despierta con cada evento: sin sondeo de kubectl
     print("🔍 Buscando pod del backend en namespace 'demo'...")
-    pod_name = None
-    for i in range(20):
-        # Buscamos cualquier pod que contenga 'public-portal-backend' en su nombre
-        cmd = "kubectl get pods -n demo --no-headers -o custom-columns=':metadata.name' | grep public-portal-backend"
-        res = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        
-        names = res.stdout.strip().splitlines()
-        if names:
-            pod_name = names[0]
-            print(f"✔ Pod detectado: {pod_name}")
-            break
-        
-        print(f"  [{i+1}/20] Esperando a que el pod aparezca...", end="\r")
-        time.sleep(3)
-    else:
+    pod = cluster_cache().wait_for(
+        "pods", "demo",
+        lambda p: "public-portal-backend" in p["metadata"]["name"],
+        timeout=60
+    )
+    if pod is None:
         sys.exit("\n❌ ERROR: No se encontró ningún pod que contenga 'public-portal-backend' en 'demo'.")
 
+    pod_name = pod["metadata"]["name"]
+    print(f"✔ Pod detectado: {pod_name}")
+
     # 2. Esperar a que esté Ready
     print(f"⏳ Esperando a que {pod_name} esté Ready...")
-    subprocess.run(
-        ["kubectl", "wait", "--namespace", "demo", "--for=condition=ready", f"pod/{pod_name}", "--timeout=180s"],
-        check=True
-    )
+    if cluster_cache().wait_for(
+        "pods", "demo",
+        lambda p: p["metadata"]["name"] == pod_name and pod_ready(p),
+        timeout=180
+    ) is None:
+        sys.exit(f"❌ ERROR: {pod_name} no alcanzó Ready en 180s")
 
     # 3. Limpiar puertos
     subprocess.run("fuser -k 18080/tcp", shell=True, stderr=subprocess.DEVNULL)
@@ -883,39 +802,184 @@ def nivel_10():
 
         # 5. Ejecución del setup
         print("⚙ Ejecutando portal-setup.py...")
-        env = os.environ.copy()
-        env["PORTAL_BACKEND_URL"] = "http://localhost:18080"
-        env["PYTHONUNBUFFERED"] = "1"
-
-        subprocess.run([venv_python, "adapters/inesdata/portal/portal-setup.py"], check=True, env=env)
+        run_script(
+            "adapters/inesdata/portal/portal-setup.py",
+            {"PORTAL_BACKEND_URL": "http://localhost:18080", "PYTHONUNBUFFERED": "1"}
+        )
         print("✔ NIVEL 10 COMPLETADO EXITOSAMENTE")
 
     finally:
         print("🔒 Cerrando port-forward...")
         bypass_pf.terminate()
 
+# ==========================================================
+# PLAN / APPLY
+# ==========================================================
+
+def plan():
+    """
+    Compara un snapshot masivo del clúster con el estado deseado
+    (values files) e imprime el conjunto mínimo de acciones.
+    """
+    from lib import plan as planner
+
+    header("PLAN – Diferencias clúster ↔ estado deseado")
+    actions = planner.compute()
+    planner.print_plan(actions)
+    return actions
+
+
+def apply():
+    """
+    Ejecuta únicamente los niveles que requiere el plan.
+    """
+    from lib import plan as planner
+
+    actions = plan()
+    for level in planner.levels(actions):
+        run_level(level)
+
+    header("APPLY COMPLETADO")
+
+# ==========================================================
+# SNAPSHOT / RESTORE (PostgreSQL common-srvs)
+# ==========================================================
+
+def snapshot(level="manual"):
+    """
+    python deploy.py snapshot nivel_8
+    Captura todas las bases de common-srvs tras el nivel indicado.
+    """
+    from lib import snapshots
+
+    header(f"SNAPSHOT – PostgreSQL tras {level}")
+    start = time.time()
+    manifest = snapshots.snapshot(level)
+    print(f"✔ Snapshot '{level}' ({len(manifest['databases'])} bases) en {time.time() - start:.1f}s")
+
+
+def restore(level="manual"):
+    """
+    python deploy.py restore nivel_8
+    Rebobina las bases de common-srvs al snapshot del nivel indicado.
+    """
+    from lib import snapshots
+
+    header(f"RESTORE – PostgreSQL a {level}")
+    start = time.time()
+    manifest = snapshots.restore(level)
+    print(f"✔ Restaurado '{level}' ({len(manifest['databases'])} bases) en {time.time() - start:.1f}s")
+
+# ==========================================================
+# CHECKPOINT / RESTORE (clúster minikube completo)
+# ==========================================================
+
+def checkpoint(level="manual", profile=None):
+    """
+    python deploy.py checkpoint nivel_10 [perfil]
+    Congela el nodo minikube (contenedor + volumen) tras el nivel indicado.
+    """
+    from lib import minikube
+
+    header(f"CHECKPOINT – Clúster tras {level}")
+    start = time.time()
+    manifest = minikube.checkpoint(level, profile or minikube.PROFILE)
+    print(f"✔ Checkpoint '{level}' ({manifest['image']}) en {time.time() - start:.1f}s")
+
+
+def restore_checkpoint(level="manual", profile=None):
+    """
+    python deploy.py restore_checkpoint nivel_10 [perfil]
+    Recrea el clúster desde el checkpoint (Vault desellado incluido).
+    """
+    from lib import minikube
+
+    header(f"RESTORE – Clúster a {level}")
+    start = time.time()
+    minikube.restore(level, profile)
+    print(f"✔ Clúster restaurado a '{level}' en {time.time() - start:.1f}s")
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+def benchmark(name, *options):
+    """
+    python deploy.py benchmark connector-density BENCH_STEP=2 BENCH_MAX_CONNECTORS=10
+    Ejecuta adapters/inesdata/benchmark/<name>.py; las opciones KEY=VALUE
+    se pasan como config (mismas claves que sus variables de entorno).
+    """
+    script = Path(__file__).resolve().parent / "benchmark" / f"{name}.py"
+    if not script.exists():
+        available = sorted(p.stem for p in script.parent.glob("*.py"))
+        sys.exit(f"❌ Benchmark desconocido: {name} (disponibles: {', '.join(available)})")
+
+    config = dict(option.split("=", 1) for option in options)
+    run_script(script, config)
+
+def collect(output=None):
+    """
+    python deploy.py collect [fichero.tar.gz]
+    Paquete de diagnóstico tras un fallo: logs (anteriores incluidos), eventos,
+    helm values/manifest y estado de runtime/ en un único tar.gz con índice.
+    """
+    from lib import collect as bundle
+
+    header("COLLECT – Logs, eventos y estado en un paquete")
+    path = bundle.collect(Path(output) if output else None)
+    print(f"✔ Paquete de diagnóstico en {path}")
+
 # ==========================================================
 # MAIN Y EJECUCIÓN SELECTIVA
 # ==========================================================
 
+def run_level(name, *args):
+    """
+    Ejecuta un nivel midiendo duración y resultado (lib/metrics.py).
+    """
+    with metrics.track(
+        "pionera_level_duration_seconds", "pionera_level_runs_total",
+        level=name, dataspace="demo",
+    ):
+        return globals()[name](*args)
+
 if __name__ == "__main__":
+    # run_id compartido con los scripts hijos (evidencias de una misma ejecución)
+    evidence.current_run_id()
+
+    # PIONERA_SAMPLER=1: serie de CPU / memoria por pod durante toda la ejecución
+    # (runtime/samples/<run_id>.json.gz + resumen por componente al salir)
+    from lib import sampler
+    if sampler.enabled():
+        sampler.start()
+
+    # Métricas Prometheus: runtime/metrics/deploy.prom (+ /metrics con PIONERA_METRICS_PORT)
+    metrics.start("deploy")
+
     # Si pasas un argumento (ej: python deploy.py nivel_7), ejecuta solo ese nivel
+    # Modo plan/diff: python deploy.py plan | python deploy.py apply
+    # Snapshots: python deploy.py snapshot nivel_8 | python deploy.py restore nivel_8
+    # Checkpoints: python deploy.py checkpoint nivel_10 | python deploy.py restore_checkpoint nivel_10
+    # Benchmarks: python deploy.py benchmark connector-density BENCH_STEP=2
+    # Diagnóstico: python deploy.py collect
     if len(sys.argv) > 1:
         func_name = sys.argv[1]
-        if func_name in locals():
-            locals()[func_name]()
+        if func_name.startswith("nivel_") and func_name in locals():
+            run_level(func_name, *sys.argv[2:])
+        elif func_name in locals():
+            locals()[func_name](*sys.argv[2:])
         else:
             print(f"❌ La función '{func_name}' no existe en este script.")
     else:
         # Ejecución normal de todos los niveles
-        nivel_1()
-        nivel_2()
-        nivel_3()
-        nivel_4()
-        nivel_5()
-        nivel_6()
-        nivel_7()
-        nivel_8()
-        nivel_9()
-        nivel_10()
+        run_level("nivel_1")
+        run_level("nivel_2")
+        run_level("nivel_3")
+        run_level("nivel_4")
+        run_level("nivel_5")
+        run_level("nivel_6")
+        run_level("nivel_7")
+        run_level("nivel_8")
+        run_level("nivel_9")
+        run_level("nivel_10")
         print("\nORQUESTACIÓN COMPLETADA")
\ No newline at end of file
@@ -19,8 +19,13 @@ import subprocess
 import sys
 import json
 from pathlib import Path
+import time
 from time import sleep
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from lib import helm, metrics
+
 # =============================================================================
 # CONFIGURACIÓN GLOBAL
 # =============================================================================
@@ -38,12 +43,12 @@ MAX_RETRIES = 1
 # =============================================================================
 
 def resolve_root():
+    # Sin sys.exit al importar: si no hay workdir, check_environment() lo reporta
     p = Path(__file__).resolve()
     for parent in p.parents:
         if (parent / "runtime" / "workdir" / "inesdata-deployment").exists():
             return parent
-    print("❌ No se pudo resolver la raíz del proyecto")
-    sys.exit(1)
+    return p.parents[2]
 
 ROOT = resolve_root()
 WORKDIR = ROOT / "runtime" / "workdir" / "inesdata-deployment"
@@ -117,6 +122,8 @@ def apply_keycloak_db_secret():
 # =============================================================================
 
 def helm_install(extra_args=None, timeout="5m"):
+    # Multinodo: servicios comunes fijados a sus nodos (lib/placement.py)
+    render_args, env = helm.post_renderer(component="common")
     cmd = [
         "helm", "upgrade", "--install", RELEASE, ".",
         "-f", "values.yaml",
@@ -126,8 +133,17 @@ def helm_install(extra_args=None, timeout="5m"):
     ]
     if extra_args:
         cmd.extend(extra_args)
+    cmd.extend(render_args)
+
+    print(f"\n▶ Ejecutando: {' '.join(cmd)}")
+    start = time.monotonic()
+    result = subprocess.run(cmd, cwd=COMMON_DIR, check=False, text=True, env=env)
 
-    return run(cmd, cwd=COMMON_DIR, check=False)
+    labels = {"release": RELEASE, "dataspace": NAMESPACE, "component": "common"}
+    metrics.record("pionera_helm_upgrade_duration_seconds", time.monotonic() - start, **labels)
+    metrics.inc("pionera_helm_upgrades_total",
+                outcome="ok" if result.returncode == 0 else "error", **labels)
+    return result
 
 def helm_status_json():
     try:
@@ -156,7 +172,7 @@ def cleanup_namespace():
 # MAIN
 # =============================================================================
 
-def main():
+def main(config=None):
     check_environment()
     helm_dependencies()
 
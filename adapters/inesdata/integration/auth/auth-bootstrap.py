@@ -9,33 +9,51 @@ Versión estable para entorno PIONERA
 import requests
 import json
 from pathlib import Path
-from datetime import datetime
 import jwt
 import sys
 import socket
-import os
 
-# ==========================================================
-# CONFIGURACIÓN GLOBAL
-# ==========================================================
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from lib import evidence, runner
 
 # ==========================================================
 # CONFIGURACIÓN GLOBAL
 # ==========================================================
 
-KEYCLOAK_BASE = os.environ.get("KC_URL")
-REALM = os.environ.get("DATASPACE_REALM", "demo")
+# Valores efectivos fijados por configure() (entorno + config de main)
+KEYCLOAK_BASE = None
+REALM = "demo"
+
+ADMIN_REALM = "master"
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = None
+
+CONNECTOR_CLIENT_ID = "conn-oeg-demo"
+REQUIRED_ROLE = "connector-admin"
+
+def configure(config=None):
+    global KEYCLOAK_BASE, REALM, ADMIN_REALM, ADMIN_USERNAME, ADMIN_PASSWORD
+    global CONNECTOR_CLIENT_ID, REQUIRED_ROLE
 
-ADMIN_REALM = os.environ.get("KEYCLOAK_ADMIN_REALM", "master")
+    env = runner.settings(config)
 
-ADMIN_USERNAME = os.environ.get("KEYCLOAK_ADMIN_USER", "admin")
-ADMIN_PASSWORD = os.environ.get("KEYCLOAK_ADMIN_PASSWORD")
+    KEYCLOAK_BASE = env.get("KC_URL")
+    REALM = env.get("DATASPACE_REALM", "demo")
 
-CONNECTOR_CLIENT_ID = os.environ.get("CONNECTOR_CLIENT_ID", "conn-oeg-demo")
-REQUIRED_ROLE = os.environ.get("CONNECTOR_REQUIRED_ROLE", "connector-admin")
+    ADMIN_REALM = env.get("KEYCLOAK_ADMIN_REALM", "master")
 
-if not ADMIN_PASSWORD:
-    sys.exit("❌ KEYCLOAK_ADMIN_PASSWORD no configurado en entorno")
+    ADMIN_USERNAME = env.get("KEYCLOAK_ADMIN_USER", "admin")
+    ADMIN_PASSWORD = env.get("KEYCLOAK_ADMIN_PASSWORD")
+
+    CONNECTOR_CLIENT_ID = env.get("CONNECTOR_CLIENT_ID", "conn-oeg-demo")
+    REQUIRED_ROLE = env.get("CONNECTOR_REQUIRED_ROLE", "connector-admin")
+
+    if not ADMIN_PASSWORD:
+        sys.exit("❌ KEYCLOAK_ADMIN_PASSWORD no configurado en entorno")
+
+    RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
 
 # ==========================================================
 # RUTAS
@@ -43,13 +61,11 @@ if not ADMIN_PASSWORD:
 
 ROOT = Path(__file__).resolve().parents[4]
 RUNTIME_DIR = ROOT / "runtime"
-RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
 
-EVIDENCE_DIR = RUNTIME_DIR / "evidences"
-EVIDENCE_DIR.mkdir(parents=True, exist_ok=True)
+# Evidencias en el store deduplicado de la ejecución (runtime/evidences/)
+EVIDENCE_NAME = "auth_bootstrap_result.json"
+TOKEN_EVIDENCE_NAME = "auth_token_decoded.json"
 
-EVIDENCE_FILE = EVIDENCE_DIR / "auth_bootstrap_result.json"
-TOKEN_EVIDENCE_FILE = EVIDENCE_DIR / "auth_token_decoded.json"
 RUNTIME_SECRET_FILE = RUNTIME_DIR / ".auth_runtime.json"
 
 # ==========================================================
@@ -137,29 +153,61 @@ def ensure_realm_exists():
 # CLIENT
 # ==========================================================
 
-def ensure_client_exists():
+def ensure_client_exists(name=None):
+    name = name or CONNECTOR_CLIENT_ID
     url = f"{KEYCLOAK_BASE}/admin/realms/{REALM}/clients"
-    r = session.get(url, params={"clientId": CONNECTOR_CLIENT_ID})
+    r = session.get(url, params={"clientId": name})
     r.raise_for_status()
 
     clients = r.json()
 
     if not clients:
-        log(f"Cliente '{CONNECTOR_CLIENT_ID}' no existe. Creándolo...")
+        log(f"Cliente '{name}' no existe. Creándolo...")
         session.post(url, json={
-            "clientId": CONNECTOR_CLIENT_ID,
+            "clientId": name,
             "enabled": True,
             "publicClient": False,
             "serviceAccountsEnabled": True,
             "protocol": "openid-connect"
         }).raise_for_status()
 
-        r = session.get(url, params={"clientId": CONNECTOR_CLIENT_ID})
+        r = session.get(url, params={"clientId": name})
         r.raise_for_status()
         clients = r.json()
 
     return clients[0]["id"]
 
+def find_client(name):
+    """
+    id interno del cliente `name` o None. Solo consulta: nunca lo crea.
+    """
+    r = session.get(f"{KEYCLOAK_BASE}/admin/realms/{REALM}/clients", params={"clientId": name})
+    r.raise_for_status()
+    clients = r.json()
+    return clients[0]["id"] if clients else None
+
+def get_client_secret(client_id):
+    r = session.get(f"{KEYCLOAK_BASE}/admin/realms/{REALM}/clients/{client_id}/client-secret")
+    r.raise_for_status()
+    return r.json()["value"]
+
+def delete_client(client_id):
+    session.delete(f"{KEYCLOAK_BASE}/admin/realms/{REALM}/clients/{client_id}").raise_for_status()
+
+def provision_client(name=None):
+    """
+    Cliente confidencial con service account, rol requerido y mapper de roles.
+    Reutilizable para clientes adicionales (benchmarks). Devuelve (id, secret).
+    """
+    client_id = ensure_client_exists(name)
+    configure_client(client_id)
+
+    ensure_role()
+    assign_role_to_service_account(client_id)
+    ensure_role_mapper(client_id)
+
+    return client_id, get_client_secret(client_id)
+
 def configure_client(client_id):
     url = f"{KEYCLOAK_BASE}/admin/realms/{REALM}/clients/{client_id}"
     data = session.get(url).json()
@@ -230,11 +278,11 @@ def ensure_role_mapper(client_id):
 # TOKEN
 # ==========================================================
 
-def get_token(client_secret):
+def get_token(client_secret, name=None):
     token_url = f"{KEYCLOAK_BASE}/realms/{REALM}/protocol/openid-connect/token"
     payload = {
         "grant_type": "client_credentials",
-        "client_id": CONNECTOR_CLIENT_ID,
+        "client_id": name or CONNECTOR_CLIENT_ID,
         "client_secret": client_secret
     }
 
@@ -253,7 +301,8 @@ def decode_token(token):
 # MAIN
 # ==========================================================
 
-def main():
+def main(config=None):
+    configure(config)
     ensure_keycloak()
 
     if not port_open(8080):
@@ -262,29 +311,18 @@ def main():
     get_admin_token()
     ensure_realm_exists()
 
-    client_id = ensure_client_exists()
-    configure_client(client_id)
-
-    ensure_role()
-    assign_role_to_service_account(client_id)
-    ensure_role_mapper(client_id)
-
-    secret_resp = session.get(
-        f"{KEYCLOAK_BASE}/admin/realms/{REALM}/clients/{client_id}/client-secret"
-    )
-    secret_resp.raise_for_status()
-    secret = secret_resp.json()["value"]
+    client_id, secret = provision_client()
 
     token = get_token(secret)
     decoded = decode_token(token)
 
-    save_json(TOKEN_EVIDENCE_FILE, decoded)
+    evidence.put(TOKEN_EVIDENCE_NAME, decoded)
 
     if REQUIRED_ROLE not in decoded.get("roles", []):
         sys.exit("❌ Rol requerido no presente en token")
 
-    save_json(EVIDENCE_FILE, {
-        "timestamp": datetime.utcnow().isoformat(),
+    # Sin timestamp en el contenido: el manifest ya registra el instante
+    evidence.put(EVIDENCE_NAME, {
         "roles": decoded["roles"],
         "aud": decoded.get("aud")
     })
@@ -6,13 +6,15 @@ INTEGRATION – Configuración + Despliegue del Connector INESData
 """
 
 import json
-import shutil
 import subprocess
 from pathlib import Path
-from datetime import datetime
 import sys
 import os
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from lib import backups, helm, postgres
+
 
 # ==========================================================
 # RUTAS
@@ -24,49 +26,60 @@ ROOT = Path(__file__).resolve().parents[4]
 # 2. Runtime real (NO venv)
 RUNTIME_DIR = ROOT / "runtime"
 
-if not RUNTIME_DIR.exists():
-    raise RuntimeError(f"Runtime no encontrado: {RUNTIME_DIR}")
-
 # 3. Archivo de autenticación generado por auth-bootstrap
 AUTH_RUNTIME_FILE = RUNTIME_DIR / ".auth_runtime.json"
 
-if not AUTH_RUNTIME_FILE.exists():
-    raise RuntimeError(
-        f"No se encontró archivo de autenticación: {AUTH_RUNTIME_FILE}. "
-        "Ejecuta primero auth-bootstrap.py"
-    )
+# 4. Parámetros de despliegue
+NAMESPACE = "demo"
 
-# 4. Cargar datos de autenticación
-AUTH_DATA = json.loads(AUTH_RUNTIME_FILE.read_text())
+# 5. Directorio de trabajo de INESData
+WORKDIR = RUNTIME_DIR / "workdir" / "inesdata-deployment"
 
-CLIENT_ID = AUTH_DATA.get("client_id")
-CLIENT_SECRET = AUTH_DATA.get("client_secret")
+# 6. Directorio raíz del conector (Chart Helm)
+CONNECTOR_DIR = WORKDIR / "connector"
 
-if not CLIENT_ID or not CLIENT_SECRET:
-    raise RuntimeError("Archivo .auth_runtime.json inválido: faltan client_id o client_secret")
+# 7. Archivos de configuración
+PROPERTIES_FILE = CONNECTOR_DIR / "config" / "connector-configuration.properties"
 
-# 5. Parámetros de despliegue
-RELEASE = CLIENT_ID
-NAMESPACE = "demo"
+# Dependientes de .auth_runtime.json: se resuelven en load_context()
+# (el import del módulo no lee ficheros ni valida nada)
+CLIENT_ID = None
+CLIENT_SECRET = None
+RELEASE = None
+VALUES_FILE = None
 
-# 6. Directorio de trabajo de INESData
-WORKDIR = RUNTIME_DIR / "workdir" / "inesdata-deployment"
+def load_context():
+    global CLIENT_ID, CLIENT_SECRET, RELEASE, VALUES_FILE
 
-if not WORKDIR.exists():
-    raise RuntimeError(f"WORKDIR no encontrado: {WORKDIR}")
+    if not RUNTIME_DIR.exists():
+        raise RuntimeError(f"Runtime no encontrado: {RUNTIME_DIR}")
 
-# 7. Directorio raíz del conector (Chart Helm)
-CONNECTOR_DIR = WORKDIR / "connector"
+    if not AUTH_RUNTIME_FILE.exists():
+        raise RuntimeError(
+            f"No se encontró archivo de autenticación: {AUTH_RUNTIME_FILE}. "
+            "Ejecuta primero auth-bootstrap.py"
+        )
 
-if not CONNECTOR_DIR.exists():
-    raise RuntimeError(f"Directorio del conector no encontrado: {CONNECTOR_DIR}")
+    auth_data = json.loads(AUTH_RUNTIME_FILE.read_text())
 
-# 8. Archivos de configuración
-PROPERTIES_FILE = CONNECTOR_DIR / "config" / "connector-configuration.properties"
-VALUES_FILE = CONNECTOR_DIR / f"values-{CLIENT_ID}.yaml"
+    CLIENT_ID = auth_data.get("client_id")
+    CLIENT_SECRET = auth_data.get("client_secret")
+
+    if not CLIENT_ID or not CLIENT_SECRET:
+        raise RuntimeError("Archivo .auth_runtime.json inválido: faltan client_id o client_secret")
+
+    RELEASE = CLIENT_ID
+
+    if not WORKDIR.exists():
+        raise RuntimeError(f"WORKDIR no encontrado: {WORKDIR}")
 
-if not VALUES_FILE.exists():
-    raise RuntimeError(f"No se encontró archivo values para el conector: {VALUES_FILE}")
+    if not CONNECTOR_DIR.exists():
+        raise RuntimeError(f"Directorio del conector no encontrado: {CONNECTOR_DIR}")
+
+    VALUES_FILE = CONNECTOR_DIR / f"values-{CLIENT_ID}.yaml"
+
+    if not VALUES_FILE.exists():
+        raise RuntimeError(f"No se encontró archivo values para el conector: {VALUES_FILE}")
 
 # ==========================================================
 # UTILIDADES
@@ -82,10 +95,8 @@ def require_file(path: Path, description: str):
         sys.exit(f"❌ Falta {description}: {path}")
 
 def backup_file(path: Path):
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup = path.with_suffix(path.suffix + f".backup.{ts}")
-    shutil.copy(path, backup)
-    print(f"✓ Backup creado: {backup}")
+    sha = backups.backup(path)
+    print(f"✓ Backup registrado: {path.name} @ {sha[:12]}")
 
 def run(cmd, cwd=None):
     # Convertimos todos los elementos de Path a string para subprocess
@@ -218,32 +229,46 @@ def configure_connector():
 # FASE 2 – HELM DEPLOY
 # ==========================================================
 
+def connector_db() -> str:
+    return RELEASE.replace("-", "_")
+
 def deploy_connector():
     header("FASE 2 – Helm upgrade/install")
 
-    # Ejecutamos Helm desde CONNECTOR_DIR donde está el Chart.yaml
-    run(
-        [
-            "helm", "upgrade", "--install", CLIENT_ID,
-            "-n", NAMESPACE,
-            "--create-namespace",
-            "-f", VALUES_FILE,
-            "."
-        ],
-        cwd=CONNECTOR_DIR
+    # Ejecutamos Helm desde CONNECTOR_DIR donde está el Chart.yaml.
+    # El hash de properties + values va en el pod template: la JVM del
+    # connector se reinicia UNA vez y solo si la configuración cambió.
+    # El OID de su base entra en el hash: connector-create la recrea (y
+    # regenera las claves) en cada nivel 7 y la JVM debe reconectarse.
+    db_oid = postgres.database_oid(connector_db())
+    helm.upgrade_install(
+        CLIENT_ID, NAMESPACE, VALUES_FILE, cwd=CONNECTOR_DIR,
+        config_hash=helm.config_hash(PROPERTIES_FILE, VALUES_FILE, f"db:{db_oid}"),
+        targets=[RELEASE],
+        component="connector",
     )
 
-    run(["kubectl", "rollout", "restart", f"deployment/{RELEASE}", "-n", NAMESPACE])
     run(["kubectl", "rollout", "status", f"deployment/{RELEASE}", "-n", NAMESPACE])
 
+def snapshot_connector_db():
+    """
+    Tras el rollout el esquema del connector ya está migrado:
+    se congela como plantilla (solo con PIONERA_DB_TEMPLATES activo).
+    """
+    db_name = connector_db()
+    if postgres.snapshot_template(db_name):
+        print(f"✓ Plantilla {postgres.template_name(db_name)} generada")
+
 # ==========================================================
 # MAIN
 # ==========================================================
 
-def main():
+def main(config=None):
     try:
+        load_context()
         configure_connector()
         deploy_connector()
+        snapshot_connector_db()
 
         header("CONFIGURACIÓN DEL CONECTOR COMPLETADA")
         print("✔ OAuth alineado con .auth_runtime.json")
@@ -0,0 +1,9 @@
+"""
+lib/
+
+Utilidades comunes del instrumento de automatización A5.2
+(kubectl, helm, minikube, YAML, backups y evidencias).
+
+Los scripts de niveles añaden `adapters/inesdata/` a sys.path
+y usan `from lib import <módulo>`.
+"""
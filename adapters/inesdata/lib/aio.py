@@ -0,0 +1,166 @@
+"""
+aio.py
+
+Núcleo asyncio para esperas y comandos concurrentes
+
+Responsabilidades:
+- Comandos externos con asyncio.create_subprocess_exec (sin shell)
+- Sondas asíncronas: puerto TCP, HTTP (status), pod Running, PostgreSQL
+- Esperas concurrentes: la latencia total es la de la dependencia más lenta
+- Envoltorios síncronos para los helpers existentes del orquestador
+- Duración de cada espera y timeouts en lib/metrics.py
+
+Principios:
+- Solo biblioteca estándar (HTTP/1.1 mínimo sobre asyncio.open_connection)
+- Cada espera tiene timeout propio y un nombre legible en los errores
+"""
+
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from lib import metrics
+
+# =============================================================================
+# EJECUCIÓN
+# =============================================================================
+
+def run(coro):
+    """
+    Punto de entrada síncrono (deploy.py sigue siendo síncrono).
+    """
+    return asyncio.run(coro)
+
+async def run_cmd(*cmd, input: str = None, timeout: float = None, check: bool = True):
+    """
+    Ejecuta `cmd` y devuelve (returncode, stdout, stderr) como texto.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *[str(c) for c in cmd],
+        stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            proc.communicate(input.encode() if input is not None else None), timeout
+        )
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+
+    out, err = stdout.decode(errors="replace"), stderr.decode(errors="replace")
+    if check and proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(map(str, cmd))} → {proc.returncode}: {err.strip()}")
+    return proc.returncode, out, err
+
+# =============================================================================
+# SONDAS
+# =============================================================================
+
+async def port_open(port: int, host: str = "127.0.0.1", timeout: float = 2) -> bool:
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+async def http_status(url: str, timeout: float = 3):
+    """
+    GET mínimo (HTTP/1.1, solo http://). Devuelve el status o None si no responde.
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        return int(status_line.split()[1])
+    except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+        return None
+    finally:
+        writer.close()
+
+async def pod_phase(pod: str, namespace: str):
+    rc, out, _ = await run_cmd(
+        "kubectl", "get", "pod", pod, "-n", namespace, "-o", "json", check=False
+    )
+    if rc != 0:
+        return None
+    return json.loads(out).get("status", {}).get("phase")
+
+async def pg_ready(namespace: str = "common-srvs", pod: str = "common-srvs-postgresql-0") -> bool:
+    rc, _, _ = await run_cmd(
+        "kubectl", "exec", "-n", namespace, pod, "--", "pg_isready", "-q", check=False
+    )
+    return rc == 0
+
+# =============================================================================
+# ESPERAS
+# =============================================================================
+
+async def wait_until(probe, name: str, timeout: float = 60, interval: float = 2):
+    """
+    Reintenta `probe()` (corrutina → truthy) hasta `timeout`.
+    Devuelve el tiempo empleado; lanza TimeoutError con `name` si no se cumple.
+    """
+    start = time.monotonic()
+    while True:
+        if await probe():
+            elapsed = time.monotonic() - start
+            metrics.observe("pionera_wait_seconds", elapsed, component=name)
+            return elapsed
+        if time.monotonic() - start >= timeout:
+            metrics.inc("pionera_wait_timeouts_total", component=name)
+            raise TimeoutError(f"{name}: no disponible tras {timeout:.0f}s")
+        await asyncio.sleep(interval)
+
+def wait_port(port: int, timeout: float = 15, host: str = "127.0.0.1", name: str = None):
+    return wait_until(
+        lambda: port_open(port, host), name or f"puerto {port}", timeout, interval=0.5
+    )
+
+def wait_http(url: str, timeout: float = 60, ok=(200,), name: str = None):
+    async def probe():
+        return await http_status(url) in ok
+    return wait_until(probe, name or url, timeout, interval=2)
+
+def wait_pod_running(pod: str, namespace: str, timeout: float = 150):
+    async def probe():
+        return await pod_phase(pod, namespace) == "Running"
+    return wait_until(probe, f"pod {namespace}/{pod}", timeout, interval=2)
+
+def wait_postgres(timeout: float = 60, **kwargs):
+    return wait_until(lambda: pg_ready(**kwargs), "PostgreSQL", timeout, interval=2)
+
+async def wait_all(**waits):
+    """
+    Espera concurrente: {nombre: corrutina}. Devuelve {nombre: segundos}.
+    Si alguna falla, cancela el resto y propaga el primer error.
+    """
+    names = list(waits)
+    tasks = [asyncio.ensure_future(waits[n]) for n in names]
+    try:
+        elapsed = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return dict(zip(names, elapsed))
@@ -0,0 +1,223 @@
+"""
+backups.py
+
+Backups deduplicados de ficheros de configuración (runtime/backups/)
+
+Estructura:
+- blobs/<sha[:2]>/<sha>.<codec>   contenido deduplicado y comprimido
+- index.json                      historial por fichero (ruta relativa a ROOT)
+
+Principios:
+- Un contenido ya respaldado no se vuelve a copiar
+- Retención configurable por fichero y por antigüedad
+  (PIONERA_BACKUP_KEEP, PIONERA_BACKUP_MAX_AGE_DAYS)
+- Restauración directa por hash (o prefijo del hash)
+- Los backups legacy `<fichero>.backup.<ts>` se absorben y se eliminan
+- Lectura → modificación → escritura del índice bajo un lock de fichero
+  (index.lock): procesos concurrentes no pierden entradas
+"""
+
+import contextlib
+import fcntl
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+if not __package__:
+    # Ejecución directa: python3 adapters/inesdata/lib/backups.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib.blobstore import BlobStore
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+BACKUP_DIR = ROOT / "runtime" / "backups"
+INDEX_FILE = BACKUP_DIR / "index.json"
+LOCK_FILE = BACKUP_DIR / "index.lock"
+
+KEEP = int(os.environ.get("PIONERA_BACKUP_KEEP", "10"))
+MAX_AGE_DAYS = int(os.environ.get("PIONERA_BACKUP_MAX_AGE_DAYS", "30"))
+
+LEGACY_TS_FORMAT = "%Y%m%d_%H%M%S"
+
+_blobs = BlobStore(BACKUP_DIR / "blobs")
+
+# =============================================================================
+# ÍNDICE
+# =============================================================================
+
+def _key(path: Path) -> str:
+    path = Path(path).resolve()
+    try:
+        return str(path.relative_to(ROOT))
+    except ValueError:
+        return str(path)
+
+def _load_index() -> dict:
+    if not INDEX_FILE.exists():
+        return {}
+    return json.loads(INDEX_FILE.read_text())
+
+@contextlib.contextmanager
+def _locked():
+    """
+    Lock exclusivo entre procesos sobre el índice (y el GC de blobs).
+    """
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _save_index(index: dict):
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=BACKUP_DIR, prefix=".index-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(tmp, INDEX_FILE)
+
+def _record(index: dict, key: str, data: bytes, at: str) -> str:
+    sha, _, _ = _blobs.put(data)
+    entries = index.setdefault(key, [])
+    if not entries or entries[-1]["sha256"] != sha:
+        entries.append({"sha256": sha, "at": at, "size": len(data)})
+    return sha
+
+# =============================================================================
+# RETENCIÓN
+# =============================================================================
+
+def _evict(index: dict, keep: int, max_age_days: int):
+    cutoff = None
+    if max_age_days > 0:
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+
+    for key, entries in list(index.items()):
+        entries = entries[-keep:] if keep > 0 else entries[-1:]
+        if cutoff:
+            # La versión más reciente se conserva siempre
+            entries = [e for e in entries[:-1] if e["at"] >= cutoff] + entries[-1:]
+        index[key] = entries
+
+def _gc(index: dict) -> int:
+    keep = {e["sha256"] for entries in index.values() for e in entries}
+    return _blobs.gc(keep)
+
+def prune(keep: int = KEEP, max_age_days: int = MAX_AGE_DAYS) -> int:
+    """
+    Aplica la política de retención a todo el índice.
+    Devuelve los bytes liberados.
+    """
+    with _locked():
+        index = _load_index()
+        _evict(index, keep, max_age_days)
+        _save_index(index)
+        return _gc(index)
+
+# =============================================================================
+# LEGACY
+# =============================================================================
+
+def _adopt_legacy(index: dict, path: Path):
+    """
+    Absorbe los backups `<fichero>.backup.<ts>` junto al fichero original.
+    """
+    key = _key(path)
+    legacy = sorted(path.parent.glob(f"{path.name}.backup.*"))
+
+    for bkp in legacy:
+        ts = bkp.name.rsplit(".backup.", 1)[1]
+        try:
+            at = datetime.strptime(ts, LEGACY_TS_FORMAT).isoformat()
+        except ValueError:
+            continue
+        _record(index, key, bkp.read_bytes(), at)
+        bkp.unlink()
+
+    # Si ningún timestamp era válido no se registró nada
+    if key in index:
+        index[key].sort(key=lambda e: e["at"])
+
+# =============================================================================
+# API
+# =============================================================================
+
+def backup(path: Path):
+    """
+    Respalda `path` si existe. Devuelve el sha256 del contenido
+    (sin coste adicional si ya estaba respaldado) o None.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    with _locked():
+        index = _load_index()
+        _adopt_legacy(index, path)
+
+        sha = _record(index, _key(path), path.read_bytes(), datetime.now().isoformat())
+
+        _evict(index, KEEP, MAX_AGE_DAYS)
+        _save_index(index)
+        _gc(index)
+    return sha
+
+def history(path: Path):
+    return list(_load_index().get(_key(path), []))
+
+def restore(path: Path, sha: str = None) -> str:
+    """
+    Restaura `path` a la versión `sha` (hash completo o prefijo).
+    Sin `sha`, restaura la versión respaldada más reciente.
+    """
+    entries = history(path)
+    if not entries:
+        raise KeyError(f"Sin backups para {path}")
+
+    if sha:
+        matches = {e["sha256"] for e in entries if e["sha256"].startswith(sha)}
+        if len(matches) != 1:
+            raise KeyError(f"Hash ambiguo o inexistente para {path}: {sha}")
+        sha = matches.pop()
+    else:
+        sha = entries[-1]["sha256"]
+
+    path = Path(path)
+    data = _blobs.get(sha)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return sha
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    cmd = argv.pop(0) if argv else "list"
+
+    if cmd == "list":
+        for key, entries in sorted(_load_index().items()):
+            print(key)
+            for e in entries:
+                print(f"  {e['sha256'][:12]}  {e['at']}  {e['size']} B")
+    elif cmd == "restore" and argv:
+        sha = restore(Path(argv[0]), argv[1] if len(argv) > 1 else None)
+        print(f"✓ {argv[0]} restaurado a {sha[:12]}")
+    elif cmd == "prune":
+        print(f"✓ Liberados {prune()} bytes")
+    else:
+        sys.exit("Uso: backups.py list | restore <fichero> [sha] | prune")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+bench.py
+
+Utilidades comunes de los benchmarks (adapters/inesdata/benchmark/)
+
+Responsabilidades:
+- Generación de carga con hilos: concurrencia fija y tasa objetivo (req/s)
+- Estadística de latencias (percentiles, throughput, tasa de error)
+- Consumo de pods y nodos vía `kubectl top` (metrics-server), puntual o muestreado
+- Port-forward gestionado (reutiliza el puerto si ya está abierto)
+- Resultados en runtime/benchmarks/<benchmark>-<run_id>.{json,csv}
+
+Principios:
+- Solo biblioteca estándar: cada benchmark trae su cliente (requests, hvac...)
+- La tasa se reparte con un calendario global: los hilos no se sincronizan
+  entre sí salvo para tomar el siguiente turno
+"""
+
+import contextlib
+import csv
+import json
+import math
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from lib import aio, evidence
+from lib.kubectl import kubectl
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+RESULTS_DIR = ROOT / "runtime" / "benchmarks"
+
+PERCENTILES = (50, 90, 95, 99)
+
+# =============================================================================
+# ESTADÍSTICA
+# =============================================================================
+
+def percentile(sorted_values, p: float) -> float:
+    """
+    Percentil con interpolación lineal sobre valores ya ordenados.
+    """
+    if not sorted_values:
+        return float("nan")
+    k = (len(sorted_values) - 1) * p / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def latency_stats(latencies) -> dict:
+    """
+    Latencias en segundos → resumen en milisegundos.
+    """
+    values = sorted(latencies)
+    if not values:
+        return {}
+    stats = {f"p{p}": round(percentile(values, p) * 1000, 2) for p in PERCENTILES}
+    stats.update(
+        min=round(values[0] * 1000, 2),
+        max=round(values[-1] * 1000, 2),
+        mean=round(sum(values) / len(values) * 1000, 2),
+    )
+    return stats
+
+def summarize(samples, elapsed: float) -> dict:
+    """
+    samples: [{"i", "t", "latency", "ok", "error"}] de run_load.
+    """
+    ok = [s["latency"] for s in samples if s["ok"]]
+    errors = {}
+    for s in samples:
+        if not s["ok"]:
+            errors[s["error"]] = errors.get(s["error"], 0) + 1
+
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "error_rate": round((len(samples) - len(ok)) / len(samples), 4) if samples else 0,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0,
+        "latency_ms": latency_stats(ok),
+        "error_kinds": errors,
+    }
+
+# =============================================================================
+# CARGA
+# =============================================================================
+
+def picked(i: int, ratio: float) -> bool:
+    """
+    Mezcla de operaciones: True en una fracción `ratio` de los turnos,
+    repartidos de forma uniforme (ratio=0.1 → turnos 9, 19, 29...).
+    Cualquier tramo de turnos consecutivos respeta la proporción.
+    """
+    return math.floor((i + 1) * ratio) > math.floor(i * ratio)
+
+def run_load(call, rate: float = 0, concurrency: int = 4, duration: float = 30,
+             total: int = None):
+    """
+    Ejecuta `call(i)` desde `concurrency` hilos durante `duration` segundos
+    (o hasta `total` llamadas). Con `rate` > 0 el turno i no empieza antes
+    de start + i/rate. `call` lanza excepción o devuelve False si falla.
+
+    Devuelve (samples, elapsed).
+    """
+    lock = threading.Lock()
+    samples = []
+    counter = iter(range(total if total else 2**62))
+    start = time.monotonic()
+    deadline = start + duration
+
+    def next_turn():
+        with lock:
+            return next(counter, None)
+
+    def worker():
+        while True:
+            i = next_turn()
+            if i is None:
+                return
+            if rate:
+                due = start + i / rate
+                if due >= deadline:
+                    return
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            elif time.monotonic() >= deadline:
+                return
+
+            t0 = time.monotonic()
+            try:
+                ok = call(i) is not False
+                error = None if ok else "rejected"
+            except Exception as e:
+                ok, error = False, type(e).__name__
+            t1 = time.monotonic()
+
+            with lock:
+                samples.append({"i": i, "t": t0 - start, "latency": t1 - t0, "ok": ok, "error": error})
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    samples.sort(key=lambda s: s["t"])
+    return samples, time.monotonic() - start
+
+# =============================================================================
+# CONSUMO (kubectl top)
+# =============================================================================
+
+def parse_cpu(value: str) -> float:
+    """
+    "250m" / "1" / "1500000n" → milicores.
+    """
+    if value.endswith("n"):
+        return int(value[:-1]) / 1_000_000
+    if value.endswith("u"):
+        return int(value[:-1]) / 1000
+    if value.endswith("m"):
+        return float(value[:-1])
+    return float(value) * 1000
+
+_MEMORY_UNITS = {"Ki": 1 / 1024, "Mi": 1, "Gi": 1024, "Ti": 1024 * 1024,
+                 "K": 1000 / 1024**2, "M": 1000**2 / 1024**2, "G": 1000**3 / 1024**2}
+
+def parse_memory(value: str) -> float:
+    """
+    "512Mi" / "1Gi" / "1048576Ki" → MiB.
+    """
+    for unit in sorted(_MEMORY_UNITS, key=len, reverse=True):
+        if value.endswith(unit):
+            return float(value[: -len(unit)]) * _MEMORY_UNITS[unit]
+    return float(value) / 1024**2
+
+def top_pods(namespace: str = None) -> dict:
+    """
+    {(namespace, pod): {"cpu_m", "memory_mi"}}; vacío si metrics-server no responde.
+    """
+    args = ["top", "pods", "--no-headers"]
+    args += ["-n", namespace] if namespace else ["-A"]
+    result = kubectl(*args, check=False)
+    if result.returncode != 0:
+        return {}
+
+    usage = {}
+    for line in result.stdout.splitlines():
+        cols = line.split()
+        if namespace:
+            cols.insert(0, namespace)
+        if len(cols) < 4:
+            continue
+        ns, pod, cpu, memory = cols[:4]
+        usage[(ns, pod)] = {"cpu_m": parse_cpu(cpu), "memory_mi": round(parse_memory(memory), 1)}
+    return usage
+
+def top_nodes() -> dict:
+    """
+    {nodo: {"cpu_m", "cpu_pct", "memory_mi", "memory_pct"}}.
+    """
+    result = kubectl("top", "nodes", "--no-headers", check=False)
+    if result.returncode != 0:
+        return {}
+
+    usage = {}
+    for line in result.stdout.splitlines():
+        cols = line.split()
+        if len(cols) < 5 or "unknown" in cols[1:5]:
+            continue
+        name, cpu, cpu_pct, memory, memory_pct = cols[:5]
+        usage[name] = {
+            "cpu_m": parse_cpu(cpu),
+            "cpu_pct": float(cpu_pct.rstrip("%")),
+            "memory_mi": round(parse_memory(memory), 1),
+            "memory_pct": float(memory_pct.rstrip("%")),
+        }
+    return usage
+
+def ensure_metrics_server(timeout: float = 120):
+    """
+    Habilita el addon metrics-server si `kubectl top` no responde y espera
+    a que publique métricas.
+    """
+    if top_nodes():
+        return
+    print("📈 Habilitando addon metrics-server...")
+    subprocess.run(["minikube", "addons", "enable", "metrics-server"], check=True)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if top_nodes():
+            print("✓ metrics-server disponible")
+            return
+        time.sleep(5)
+    raise RuntimeError(f"❌ metrics-server sin métricas tras {timeout:.0f}s")
+
+@contextlib.contextmanager
+def sample_pods(namespace: str, prefix: str, interval: float = 5):
+    """
+    Muestrea `kubectl top` de los pods `prefix*` en segundo plano mientras
+    dura el bloque. Produce la lista de muestras [{"t", "pod", "cpu_m", "memory_mi"}].
+    """
+    samples = []
+    stop = threading.Event()
+    start = time.monotonic()
+
+    def loop():
+        while not stop.is_set():
+            for (_, pod), usage in top_pods(namespace).items():
+                if pod.startswith(prefix):
+                    samples.append({"t": round(time.monotonic() - start, 1), "pod": pod, **usage})
+            stop.wait(interval)
+
+    thread = threading.Thread(target=loop, daemon=True)
+    thread.start()
+    try:
+        yield samples
+    finally:
+        stop.set()
+        thread.join()
+
+def usage_stats(samples) -> dict:
+    """
+    Medias y picos de CPU / memoria de las muestras de sample_pods.
+    """
+    stats = {}
+    for field in ("cpu_m", "memory_mi"):
+        values = [s[field] for s in samples]
+        if values:
+            stats[field] = {"avg": round(sum(values) / len(values), 1), "max": max(values)}
+    return stats
+
+# =============================================================================
+# PORT-FORWARD
+# =============================================================================
+
+@contextlib.contextmanager
+def port_forward(target: str, namespace: str, local_port: int, remote_port: int,
+                 timeout: float = 20):
+    """
+    `kubectl port-forward <target> local:remote` mientras dura el bloque.
+    Si el puerto local ya está abierto (p. ej. túneles del nivel 4) se reutiliza.
+    """
+    if aio.run(aio.port_open(local_port)):
+        yield f"http://127.0.0.1:{local_port}"
+        return
+
+    proc = subprocess.Popen(
+        ["kubectl", "port-forward", "-n", namespace, target, f"{local_port}:{remote_port}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        aio.run(aio.wait_port(local_port, timeout=timeout, name=f"port-forward {target}"))
+        yield f"http://127.0.0.1:{local_port}"
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+# =============================================================================
+# RESULTADOS
+# =============================================================================
+
+def write_results(name: str, summary: dict, rows=None) -> Path:
+    """
+    runtime/benchmarks/<name>-<run_id>.json (+ .csv si hay filas).
+    Devuelve la ruta del JSON.
+    """
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    base = RESULTS_DIR / f"{name}-{evidence.current_run_id()}"
+
+    json_file = base.with_suffix(".json")
+    json_file.write_text(json.dumps(summary, indent=2, default=str))
+
+    if rows:
+        fields = list(dict.fromkeys(k for row in rows for k in row))
+        with open(base.with_suffix(".csv"), "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    return json_file
+
+def print_summary(title: str, summary: dict):
+    latency = summary.get("latency_ms", {})
+    print(f"\n📊 {title}")
+    print(f"   peticiones: {summary['requests']}  errores: {summary['errors']} "
+          f"({summary['error_rate'] * 100:.1f}%)  throughput: {summary['throughput_rps']} req/s")
+    if latency:
+        print("   latencia ms: " + "  ".join(f"{k}={latency[k]}" for k in
+                                           ("p50", "p90", "p95", "p99", "max")))
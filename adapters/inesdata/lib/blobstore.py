@@ -0,0 +1,115 @@
+"""
+blobstore.py
+
+Almacén de blobs direccionado por contenido (SHA-256) y comprimido.
+
+Principios:
+- Un contenido idéntico se almacena UNA sola vez
+- Compresión zstd si `zstandard` está disponible; gzip en caso contrario
+- Escritura atómica (fichero temporal + rename)
+- Sin índice propio: los consumidores (evidencias, backups) guardan los hashes
+"""
+
+import gzip
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depende del entorno
+    zstandard = None
+
+# =============================================================================
+# CODECS
+# =============================================================================
+
+CODEC = "zst" if zstandard else "gz"
+CODECS = ("zst", "gz")
+
+
+def compress(data: bytes, codec: str = CODEC) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("Blob zstd encontrado pero 'zstandard' no está instalado")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+# =============================================================================
+# ALMACÉN
+# =============================================================================
+
+class BlobStore:
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, sha: str, codec: str) -> Path:
+        return self.root / sha[:2] / f"{sha}.{codec}"
+
+    def find(self, sha: str):
+        for codec in CODECS:
+            path = self._path(sha, codec)
+            if path.exists():
+                return path
+        return None
+
+    def put(self, data: bytes):
+        """
+        Guarda `data` si no existe ya.
+        Devuelve (sha256, codec, tamaño_almacenado).
+        """
+        sha = digest(data)
+        existing = self.find(sha)
+        if existing:
+            return sha, existing.suffix[1:], existing.stat().st_size
+
+        path = self._path(sha, CODEC)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = compress(data)
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+        return sha, CODEC, len(payload)
+
+    def get(self, sha: str) -> bytes:
+        path = self.find(sha)
+        if path is None:
+            raise KeyError(f"Blob no encontrado: {sha}")
+        return decompress(path.read_bytes(), path.suffix[1:])
+
+    def gc(self, keep) -> int:
+        """
+        Elimina los blobs cuyo hash no está en `keep`.
+        Devuelve los bytes liberados.
+        """
+        freed = 0
+        if not self.root.exists():
+            return freed
+
+        for path in self.root.glob("*/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            if path.stem not in keep:
+                freed += path.stat().st_size
+                path.unlink()
+
+        return freed
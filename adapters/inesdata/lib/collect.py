@@ -0,0 +1,281 @@
+"""
+collect.py
+
+Paquete de diagnóstico: logs, eventos, Helm y estado de runtime/ en un tar.gz
+
+Responsabilidades:
+- Logs de todos los contenedores (anteriores incluidos si hubo reinicios)
+- Eventos y listado de recursos de todos los namespaces
+- `helm get values` / `helm get manifest` de cada release
+- Ficheros de estado de runtime/ (sin ficheros ocultos ni el repositorio clonado)
+- Redacción de secretos en helm values / manifest y pods.json
+- Un único runtime/collect/<run_id>-<fecha>.tar.gz con index.json
+
+Uso:
+- python deploy.py collect
+- python3 adapters/inesdata/lib/collect.py
+
+Principios:
+- Todas las consultas en paralelo (pool de hilos, PIONERA_COLLECT_WORKERS)
+- Solo el hilo principal escribe en el tar, a medida que llegan resultados
+- Un comando fallido queda en el índice con su error; no aborta la recogida
+- Redacción por nombre de clave: los logs NO se redactan y pueden contener
+  secretos; el paquete no debe compartirse sin revisarlo
+"""
+
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+if not __package__:
+    # Ejecución directa: python3 adapters/inesdata/lib/collect.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import evidence, helm, yaml_utils
+from lib.kubectl import get_json
+from lib.logs import logs_command, streams
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+RUNTIME_DIR = ROOT / "runtime"
+COLLECT_DIR = RUNTIME_DIR / "collect"
+
+WORKERS = int(os.environ.get("PIONERA_COLLECT_WORKERS", "16"))
+COMMAND_TIMEOUT = 120
+
+# Estado de runtime/ incluido en el paquete (relativo a runtime/)
+STATE_PATTERNS = (
+    "*.json",
+    "metrics/*.prom",
+    "samples/*-summary.json",
+    "evidences/runs/*/manifest.jsonl",
+)
+
+# Claves cuyo valor se sustituye por REDACTED (values, env, Secrets)
+SECRET_KEY = re.compile(
+    r"pass(word)?|secret|token|credential|private[-_]?key|api[-_]?key|unseal",
+    re.IGNORECASE,
+)
+REDACTED = "***REDACTED***"
+# Líneas clave=valor / clave: valor dentro de textos (properties en ConfigMaps)
+SECRET_LINE = re.compile(
+    r"^(\s*[\w.\-]*(?:pass(?:word)?|secret|token|credential)[\w.\-]*\s*[=:]\s*)\S.*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+LAST_APPLIED = "kubectl.kubernetes.io/last-applied-configuration"
+
+# =============================================================================
+# REDACCIÓN
+# =============================================================================
+
+def redact(node):
+    """
+    Copia de `node` sin valores sensibles:
+    - claves que casan con SECRET_KEY
+    - entradas env {name, value} cuyo nombre casa con SECRET_KEY
+    - data / stringData de los objetos Secret
+    - la anotación last-applied-configuration (copia completa del objeto)
+    - líneas clave=valor sensibles dentro de textos multilínea
+    """
+    if isinstance(node, list):
+        return [redact(item) for item in node]
+    if isinstance(node, str) and "\n" in node:
+        return SECRET_LINE.sub(lambda m: m.group(1) + REDACTED, node)
+    if not isinstance(node, dict):
+        return node
+
+    if node.get("kind") == "Secret":
+        node = {
+            **node,
+            **{k: {key: REDACTED for key in node[k] or {}}
+               for k in ("data", "stringData") if k in node},
+        }
+    if "value" in node and SECRET_KEY.search(str(node.get("name", ""))):
+        node = {**node, "value": REDACTED}
+
+    result = {}
+    for key, value in node.items():
+        if key == LAST_APPLIED or (
+            SECRET_KEY.search(str(key)) and not isinstance(value, (dict, list))
+        ):
+            result[key] = REDACTED
+        else:
+            result[key] = redact(value)
+    return result
+
+def redact_json(data: bytes) -> bytes:
+    return json.dumps(redact(json.loads(data)), indent=1).encode()
+
+def redact_yaml(data: bytes) -> bytes:
+    return yaml_utils.dumps(redact(yaml_utils.loads(data))).encode()
+
+def redact_yaml_all(data: bytes) -> bytes:
+    documents = [d for d in yaml_utils.loads_all(data) if d is not None]
+    return yaml_utils.dumps_all(redact(documents)).encode()
+
+# =============================================================================
+# TAREAS
+# =============================================================================
+
+def _command(name: str, cmd, transform=None):
+    """
+    Tarea: ejecuta `cmd` y devuelve (nombre en el tar, contenido, entrada del índice).
+    `transform` (redacción) se aplica en el propio hilo; si falla, el
+    contenido se descarta en lugar de guardarse sin redactar.
+    """
+    def task():
+        start = time.monotonic()
+        try:
+            r = subprocess.run(cmd, capture_output=True, timeout=COMMAND_TIMEOUT)
+            data = r.stdout
+            entry = {"returncode": r.returncode}
+            if r.returncode != 0:
+                entry["error"] = r.stderr.decode(errors="replace").strip()[-500:]
+        except (OSError, subprocess.TimeoutExpired) as e:
+            data, entry = b"", {"error": str(e)}
+
+        if transform and data:
+            try:
+                data = transform(data)
+                entry["redacted"] = True
+            except Exception as e:
+                data, entry["error"] = b"", f"redacción fallida, contenido descartado: {e}"
+
+        entry.update(command=" ".join(cmd), seconds=round(time.monotonic() - start, 2))
+        return name, data, entry
+    return task
+
+def _file(name: str, path: Path):
+    def task():
+        return name, path.read_bytes(), {"source": str(path.relative_to(ROOT))}
+    return task
+
+def cluster_tasks(pods):
+    yield _command("cluster/resources.txt", ["kubectl", "get", "all", "-A", "-o", "wide"])
+    yield _command("cluster/pods.json", ["kubectl", "get", "pods", "-A", "-o", "json"],
+                   transform=redact_json)
+    yield _command("cluster/events.txt", [
+        "kubectl", "get", "events", "-A", "--sort-by=.lastTimestamp", "-o", "wide",
+    ])
+    yield _command("cluster/nodes.txt", ["kubectl", "describe", "nodes"])
+
+    for namespace, pod, container, previous in streams(pods):
+        suffix = ".previous" if previous else ""
+        yield _command(
+            f"logs/{namespace}/{pod}/{container}{suffix}.log",
+            logs_command(namespace, pod, container, previous),
+        )
+
+def helm_tasks(releases):
+    for release in releases:
+        name, namespace = release["name"], release["namespace"]
+        yield _command(
+            f"helm/{namespace}/{name}/values.yaml",
+            ["helm", "get", "values", name, "-n", namespace, "-o", "yaml"],
+            transform=redact_yaml,
+        )
+        yield _command(
+            f"helm/{namespace}/{name}/manifest.yaml",
+            ["helm", "get", "manifest", name, "-n", namespace],
+            transform=redact_yaml_all,
+        )
+
+def state_tasks(root: Path = RUNTIME_DIR):
+    seen = set()
+    for pattern in STATE_PATTERNS:
+        for path in sorted(root.glob(pattern)):
+            # Ficheros ocultos (.auth_runtime.json...) contienen credenciales
+            if path in seen or path.name.startswith(".") or not path.is_file():
+                continue
+            seen.add(path)
+            yield _file(f"runtime/{path.relative_to(root)}", path)
+
+# =============================================================================
+# PAQUETE
+# =============================================================================
+
+def _add(tar: tarfile.TarFile, name: str, data: bytes, mtime: float):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = mtime
+    tar.addfile(info, io.BytesIO(data))
+
+def collect(output: Path = None, workers: int = WORKERS) -> Path:
+    """
+    Recoge todo en paralelo y lo escribe en un tar.gz. Devuelve su ruta.
+    """
+    start = time.monotonic()
+    run_id = evidence.current_run_id()
+    created = datetime.now()
+
+    if output is None:
+        COLLECT_DIR.mkdir(parents=True, exist_ok=True)
+        output = COLLECT_DIR / f"{run_id}-{created.strftime('%Y%m%d%H%M%S')}.tar.gz"
+
+    pods, releases = [], []
+    try:
+        pods = get_json("pods", all_namespaces=True)
+        releases = helm.list_releases()
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"⚠️ Clúster o Helm no disponibles: {e}")
+
+    tasks = [*cluster_tasks(pods), *helm_tasks(releases), *state_tasks()]
+    print(f"▶ {len(tasks)} elementos, {workers} en paralelo → {output}")
+
+    index = []
+    prefix = output.name.removesuffix(".tar.gz")
+    mtime = created.timestamp()
+    with tarfile.open(output, "w:gz", compresslevel=6) as tar, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(task) for task in tasks]
+        for future in as_completed(futures):
+            try:
+                name, data, entry = future.result()
+            except OSError as e:
+                index.append({"error": str(e)})
+                continue
+            _add(tar, f"{prefix}/{name}", data, mtime)
+            index.append({"name": name, "size": len(data), **entry})
+
+        index.sort(key=lambda e: e.get("name", ""))
+        failed = [e for e in index if "error" in e]
+        _add(tar, f"{prefix}/index.json", json.dumps({
+            "run_id": run_id,
+            "created": created.isoformat(timespec="seconds"),
+            "seconds": round(time.monotonic() - start, 2),
+            "pods": len(pods),
+            "entries": index,
+            "failed": len(failed),
+        }, indent=2).encode(), mtime)
+
+    print(
+        f"✓ {len(index)} elementos ({len(failed)} con error) en "
+        f"{time.monotonic() - start:.1f}s, {output.stat().st_size / 1024:.0f} KiB"
+    )
+    print("⚠️ Values, manifests y pods.json van redactados; los logs y el estado de "
+          "runtime/ no: revisa el paquete antes de compartirlo")
+    return output
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if len(argv) > 1:
+        sys.exit("Uso: collect.py [fichero.tar.gz]")
+    collect(Path(argv[0]) if argv else None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+deployer.py
+
+Invocación en proceso del deployer de inesdata-deployment (CLI click)
+
+Responsabilidades:
+- Importar runtime/workdir/inesdata-deployment/deployer.py una vez por
+  versión de deployer.config (se reimporta si el fichero cambia)
+- Ejecutar sus comandos (dataspace / connector create) sin intérprete nuevo
+- Modo batch: varios connectors en la misma sesión
+- Fallback a subproceso si el deployer no es importable en este intérprete
+
+Principios:
+- Mismo contrato que `python3 deployer.py ...` (cwd = WORKDIR, código de salida)
+- El estado que el deployer mantiene a nivel de módulo (configuración leída,
+  clientes Postgres / Keycloak / Vault) se reutiliza entre invocaciones
+  mientras deployer.config no cambie (p. ej. VT_TOKEN reescrito)
+"""
+
+import contextlib
+import importlib.util
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+WORKDIR = ROOT / "runtime" / "workdir" / "inesdata-deployment"
+DEPLOYER_FILE = WORKDIR / "deployer.py"
+CONFIG_FILE = WORKDIR / "deployer.config"
+
+_cli = None
+_loaded_version = None
+
+# =============================================================================
+# CARGA
+# =============================================================================
+
+@contextlib.contextmanager
+def _in_workdir():
+    """
+    El deployer resuelve deployer.config y las plantillas respecto al cwd.
+    """
+    previous = os.getcwd()
+    os.chdir(WORKDIR)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def _version():
+    """
+    mtime de deployer.py y deployer.config: si cambian, el módulo cargado
+    (y la configuración que leyó al importarse) está obsoleto.
+    """
+    return tuple(
+        path.stat().st_mtime_ns if path.exists() else None
+        for path in (DEPLOYER_FILE, CONFIG_FILE)
+    )
+
+def _load():
+    global _cli, _loaded_version
+    version = _version()
+    if _cli is not None and version == _loaded_version:
+        return _cli
+
+    import click
+
+    if str(WORKDIR) not in sys.path:
+        sys.path.insert(0, str(WORKDIR))
+
+    spec = importlib.util.spec_from_file_location("inesdata_deployer", DEPLOYER_FILE)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["inesdata_deployer"] = module
+    with _in_workdir():
+        spec.loader.exec_module(module)
+
+    groups = [obj for obj in vars(module).values() if isinstance(obj, click.Group)]
+    if not groups:
+        raise ImportError(f"Sin grupo click en {DEPLOYER_FILE}")
+
+    # El grupo raíz es el que no está registrado como subcomando de otro
+    nested = {id(cmd) for g in groups for cmd in g.commands.values()}
+    roots = [g for g in groups if id(g) not in nested]
+    _cli = (roots or groups)[0]
+    _loaded_version = version
+    return _cli
+
+# =============================================================================
+# INVOCACIÓN
+# =============================================================================
+
+def _subprocess(args) -> int:
+    return subprocess.run([sys.executable, "deployer.py", *args], cwd=WORKDIR).returncode
+
+def invoke(*args, check: bool = True) -> int:
+    """
+    Equivalente a `python3 deployer.py <args>` en WORKDIR.
+    Devuelve el código de salida; con `check`, lanza CalledProcessError si ≠ 0.
+    """
+    args = [str(a) for a in args]
+    print(f"\n▶ deployer.py {' '.join(args)}")
+
+    try:
+        cli = _load()
+    except ImportError as e:
+        print(f"↪ deployer en subproceso ({e})")
+        code = _subprocess(args)
+    else:
+        import click
+
+        code = 0
+        with _in_workdir():
+            try:
+                cli.main(args, prog_name="deployer.py", standalone_mode=False)
+            except click.exceptions.Exit as e:
+                code = e.exit_code
+            except click.ClickException as e:
+                e.show()
+                code = e.exit_code
+            except click.Abort:
+                code = 1
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+
+    if check and code:
+        raise subprocess.CalledProcessError(code, ["deployer.py", *args])
+    return code
+
+def create_dataspace(name: str, check: bool = True) -> int:
+    return invoke("dataspace", "create", name, check=check)
+
+def create_connector(name: str, dataspace: str, check: bool = True) -> int:
+    return invoke("connector", "create", name, dataspace, check=check)
+
+def create_connectors(names, dataspace: str, check: bool = True) -> dict:
+    """
+    Modo batch: todos los connectors en la misma sesión del deployer.
+    Devuelve {connector: código de salida}.
+    """
+    results = {}
+    for name in names:
+        results[name] = create_connector(name, dataspace, check=False)
+        if check and results[name]:
+            raise subprocess.CalledProcessError(
+                results[name], ["deployer.py", "connector", "create", name, dataspace]
+            )
+    return results
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+
+    if len(argv) >= 2 and argv[0] == "connectors":
+        results = create_connectors(argv[2:], argv[1], check=False)
+        for name, code in results.items():
+            print(f"{'✓' if code == 0 else '❌'} {name}")
+        sys.exit(1 if any(results.values()) else 0)
+    elif argv:
+        sys.exit(invoke(*argv, check=False))
+    else:
+        sys.exit("Uso: deployer.py <args deployer> | connectors <dataspace> <connector>...")
+
+if __name__ == "__main__":
+    main()
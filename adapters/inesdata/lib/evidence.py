@@ -0,0 +1,254 @@
+"""
+evidence.py
+
+Almacén de evidencias por ejecución (runtime/evidences/)
+
+Estructura:
+- blobs/<sha[:2]>/<sha>.<codec>   contenido deduplicado y comprimido
+- runs/<run_id>/manifest.jsonl    una línea por evidencia o medición
+
+Principios:
+- Un contenido repetido no ocupa disco adicional
+- Manifest append-only: varios scripts de la misma ejecución comparten run_id
+  (variable PIONERA_RUN_ID, fijada por deploy.py)
+- Retención por número de ejecuciones (PIONERA_EVIDENCE_KEEP_RUNS)
+- Archivado rápido: tar sin recomprimir (los blobs ya están comprimidos)
+"""
+
+import json
+import os
+import shutil
+import sys
+import tarfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+if not __package__:
+    # Ejecución directa: python3 adapters/inesdata/lib/evidence.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib.blobstore import BlobStore
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+EVIDENCE_DIR = ROOT / "runtime" / "evidences"
+
+KEEP_RUNS = int(os.environ.get("PIONERA_EVIDENCE_KEEP_RUNS", "20"))
+
+RUN_ID_ENV = "PIONERA_RUN_ID"
+
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+def new_run_id() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+def current_run_id() -> str:
+    """
+    run_id compartido por todos los scripts de una misma ejecución.
+    Si no existe, se fija en el entorno para que lo hereden los subprocesos.
+    """
+    return os.environ.setdefault(RUN_ID_ENV, new_run_id())
+
+def _to_bytes(content) -> bytes:
+    if isinstance(content, bytes):
+        return content
+    if isinstance(content, str):
+        return content.encode()
+    return json.dumps(content, indent=2, sort_keys=True, default=str).encode()
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class EvidenceStore:
+
+    def __init__(self, run_id=None, root: Path = EVIDENCE_DIR):
+        self.root = Path(root)
+        self.run_id = run_id or current_run_id()
+        self.blobs = BlobStore(self.root / "blobs")
+        self.run_dir = self.root / "runs" / self.run_id
+        self.manifest = self.run_dir / "manifest.jsonl"
+        self.started = time.monotonic()
+
+    # -------------------------------------------------------------------------
+    def _append(self, entry: dict):
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        entry["at"] = datetime.now().isoformat(timespec="milliseconds")
+        entry["elapsed_s"] = round(time.monotonic() - self.started, 3)
+        with open(self.manifest, "a") as f:
+            f.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    # -------------------------------------------------------------------------
+    def put(self, name: str, content) -> str:
+        """
+        Registra una evidencia. `content` puede ser bytes, str o un objeto
+        serializable a JSON. Devuelve el sha256 del contenido.
+        """
+        data = _to_bytes(content)
+        sha, codec, stored = self.blobs.put(data)
+        self._append({
+            "kind": "evidence",
+            "name": name,
+            "sha256": sha,
+            "size": len(data),
+            "stored": stored,
+            "codec": codec,
+        })
+        return sha
+
+    # -------------------------------------------------------------------------
+    @contextmanager
+    def timed(self, name: str, **labels):
+        """
+        Mide la duración del bloque y la registra en el manifest.
+        """
+        start = time.monotonic()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self._append({
+                "kind": "timing",
+                "name": name,
+                "duration_s": round(time.monotonic() - start, 3),
+                "status": status,
+                **labels,
+            })
+
+    # -------------------------------------------------------------------------
+    def fingerprint(self, **fields):
+        """
+        Registra parámetros que caracterizan la ejecución (perfil de recursos,
+        topología...). run_fingerprint() los combina.
+        """
+        self._append({"kind": "fingerprint", **fields})
+
+    def run_fingerprint(self) -> dict:
+        merged = {}
+        for entry in self.entries():
+            if entry.get("kind") == "fingerprint":
+                merged.update({
+                    k: v for k, v in entry.items()
+                    if k not in ("kind", "at", "elapsed_s")
+                })
+        return merged
+
+    # -------------------------------------------------------------------------
+    def entries(self):
+        if not self.manifest.exists():
+            return []
+        return [json.loads(line) for line in self.manifest.read_text().splitlines() if line]
+
+    def latest(self, name: str):
+        """
+        Contenido más reciente registrado con `name` en esta ejecución.
+        """
+        for entry in reversed(self.entries()):
+            if entry.get("kind") == "evidence" and entry["name"] == name:
+                return self.blobs.get(entry["sha256"])
+        return None
+
+    # -------------------------------------------------------------------------
+    def archive(self, dest: Path = None) -> Path:
+        """
+        Empaqueta manifest + blobs referenciados en un único .tar.
+        """
+        dest = Path(dest or self.root / f"evidences-{self.run_id}.tar")
+        entries = self.entries()
+        shas = {e["sha256"] for e in entries if e.get("kind") == "evidence"}
+
+        with tarfile.open(dest, "w") as tar:
+            tar.add(self.manifest, arcname=f"{self.run_id}/manifest.jsonl")
+            for sha in sorted(shas):
+                path = self.blobs.find(sha)
+                if path:
+                    tar.add(path, arcname=f"{self.run_id}/blobs/{path.name}")
+
+        return dest
+
+# =============================================================================
+# RETENCIÓN
+# =============================================================================
+
+def prune(keep_runs: int = KEEP_RUNS, root: Path = EVIDENCE_DIR) -> int:
+    """
+    Conserva las `keep_runs` ejecuciones más recientes y elimina los blobs
+    que ya no referencia ningún manifest. Devuelve los bytes liberados.
+    """
+    runs_dir = Path(root) / "runs"
+    if not runs_dir.exists():
+        return 0
+
+    runs = sorted(p for p in runs_dir.iterdir() if p.is_dir())
+    for old in runs[:-keep_runs] if keep_runs > 0 else runs:
+        shutil.rmtree(old)
+
+    keep = set()
+    for manifest in runs_dir.glob("*/manifest.jsonl"):
+        for line in manifest.read_text().splitlines():
+            if line:
+                sha = json.loads(line).get("sha256")
+                if sha:
+                    keep.add(sha)
+
+    return BlobStore(Path(root) / "blobs").gc(keep)
+
+# =============================================================================
+# STORE DE PROCESO
+# =============================================================================
+
+_store = None
+
+def get_store() -> EvidenceStore:
+    """
+    Store de la ejecución actual. La primera llamada del proceso aplica
+    la política de retención.
+    """
+    global _store
+    if _store is None or _store.run_id != current_run_id():
+        prune()
+        _store = EvidenceStore()
+    return _store
+
+def put(name: str, content) -> str:
+    return get_store().put(name, content)
+
+def fingerprint(**fields):
+    get_store().fingerprint(**fields)
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    cmd = argv.pop(0) if argv else "list"
+
+    if cmd == "list":
+        runs_dir = EVIDENCE_DIR / "runs"
+        for run in sorted(runs_dir.iterdir()) if runs_dir.exists() else []:
+            print(run.name)
+    elif cmd == "show" and len(argv) == 2:
+        data = EvidenceStore(run_id=argv[0]).latest(argv[1])
+        if data is None:
+            sys.exit(f"❌ Evidencia '{argv[1]}' no encontrada en {argv[0]}")
+        sys.stdout.buffer.write(data)
+    elif cmd == "archive" and len(argv) == 1:
+        print(f"✓ Archivo generado: {EvidenceStore(run_id=argv[0]).archive()}")
+    elif cmd == "prune":
+        print(f"✓ Liberados {prune()} bytes")
+    else:
+        sys.exit("Uso: evidence.py list | show <run_id> <nombre> | archive <run_id> | prune")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+helm.py
+
+Acceso común a Helm
+
+Responsabilidades:
+- Listado de releases en JSON (todas las namespaces en una llamada)
+- upgrade --install con hash de configuración en el pod template
+  (rollout solo si la configuración cambió)
+- Post-renderer común: hash, nodeSelector de la colocación multinodo, hostPort
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from lib import metrics, placement
+
+# =============================================================================
+# EJECUCIÓN
+# =============================================================================
+
+def helm(*args, check=True, cwd=None):
+    return subprocess.run(
+        ["helm", *[str(a) for a in args]],
+        check=check,
+        text=True,
+        capture_output=True,
+        cwd=cwd,
+    )
+
+def list_releases():
+    """
+    Releases de todas las namespaces: [{name, namespace, status, ...}]
+    """
+    result = helm("list", "-A", "-a", "-o", "json", check=False)
+    if result.returncode != 0:
+        return []
+    return json.loads(result.stdout or "[]")
+
+# =============================================================================
+# HASH DE CONFIGURACIÓN
+# =============================================================================
+
+POST_RENDERER = Path(__file__).resolve().with_name("post_render.py")
+
+def config_hash(*parts) -> str:
+    """
+    sha256 estable de las entradas de configuración de un workload.
+    Acepta Path (contenido del fichero), bytes, str o dict/list (JSON ordenado).
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, Path):
+            data = part.read_bytes()
+        elif isinstance(part, bytes):
+            data = part
+        elif isinstance(part, str):
+            data = part.encode()
+        else:
+            data = json.dumps(part, sort_keys=True).encode()
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()[:16]
+
+def post_renderer(config_hash=None, targets=(), component=None, strip_host_ports=False):
+    """
+    (args, env) para `helm upgrade` con lib/post_render.py.
+    Helm admite UN post-renderer: todas las transformaciones van en él.
+    Sin transformaciones que aplicar devuelve ([], None).
+    """
+    transforms = {}
+    if config_hash:
+        transforms["PIONERA_CONFIG_HASH"] = config_hash
+        transforms["PIONERA_CONFIG_HASH_TARGETS"] = ",".join(targets)
+    selector = placement.node_selector(component) if component else None
+    if selector:
+        transforms["PIONERA_NODE_SELECTOR"] = json.dumps(selector)
+    if strip_host_ports:
+        transforms["PIONERA_STRIP_HOST_PORTS"] = "1"
+
+    if not transforms:
+        return [], None
+    args = ["--post-renderer", sys.executable, "--post-renderer-args", str(POST_RENDERER)]
+    return args, {**os.environ, **transforms}
+
+def upgrade_install(release, namespace, values_file, cwd, config_hash=None, targets=(),
+                    extra=(), component=None, strip_host_ports=False):
+    """
+    `helm upgrade --install <release> .` con salida en consola.
+    Con `config_hash`, el post-renderer lo anota en el pod template de
+    `targets` (o de todos los workloads): un único rollout si cambió.
+    Con `component`, los pods se fijan a los nodos de su colocación.
+    """
+    render_args, env = post_renderer(config_hash, targets, component, strip_host_ports)
+    args = [
+        "upgrade", "--install", release,
+        "-n", namespace,
+        "--create-namespace",
+        "-f", str(values_file),
+        *extra,
+        *render_args,
+        ".",
+    ]
+
+    print(f"\n▶ helm {' '.join(args)}")
+    with metrics.track(
+        "pionera_helm_upgrade_duration_seconds", "pionera_helm_upgrades_total",
+        release=release, dataspace=namespace, component=component,
+    ):
+        subprocess.run(["helm", *args], cwd=cwd, env=env, check=True)
@@ -0,0 +1,326 @@
+"""
+kubectl.py
+
+Acceso común a kubectl
+
+Responsabilidades:
+- Ejecutar kubectl sin shell (argumentos en lista)
+- Listados masivos en JSON (varios tipos de recurso en una sola llamada)
+- Lectura de Secrets
+- Cache por ejecución de listados por namespace (list + watch, con TTL)
+- Manifests generados aplicados en UNA llamada server-side apply
+"""
+
+import atexit
+import base64
+import copy
+import json
+import os
+import subprocess
+import threading
+import time
+
+# =============================================================================
+# EJECUCIÓN
+# =============================================================================
+
+def kubectl(*args, check=True, input=None, timeout=None):
+    return subprocess.run(
+        ["kubectl", *[str(a) for a in args]],
+        check=check,
+        text=True,
+        capture_output=True,
+        input=input,
+        timeout=timeout,
+    )
+
+def get_json(resources, namespace=None, all_namespaces=False, selector=None):
+    """
+    `kubectl get <r1,r2,...> -o json` en UNA llamada.
+    Devuelve la lista de items.
+    """
+    if not isinstance(resources, str):
+        resources = ",".join(resources)
+
+    args = ["get", resources, "-o", "json"]
+    if all_namespaces:
+        args.append("-A")
+    elif namespace:
+        args += ["-n", namespace]
+    if selector:
+        args += ["-l", selector]
+
+    return json.loads(kubectl(*args).stdout).get("items", [])
+
+def cluster_reachable(timeout=10) -> bool:
+    try:
+        return kubectl("version", "-o", "json", check=False, timeout=timeout).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+# =============================================================================
+# SECRETS
+# =============================================================================
+
+def secret_value(name: str, namespace: str, key: str) -> str:
+    result = kubectl(
+        "get", "secret", name, "-n", namespace,
+        "-o", f"jsonpath={{.data.{key}}}"
+    )
+    return base64.b64decode(result.stdout.strip()).decode()
+
+# =============================================================================
+# HELPERS DE OBJETOS
+# =============================================================================
+
+def deployment_ready(item: dict) -> bool:
+    desired = item.get("spec", {}).get("replicas", 1)
+    ready = item.get("status", {}).get("readyReplicas", 0)
+    return ready >= desired
+
+def pod_status(pod: dict) -> str:
+    """
+    Aproximación a la columna STATUS de `kubectl get pods`.
+    """
+    if pod["metadata"].get("deletionTimestamp"):
+        return "Terminating"
+    for cs in pod.get("status", {}).get("containerStatuses", []):
+        state = cs.get("state", {})
+        for key in ("waiting", "terminated"):
+            reason = state.get(key, {}).get("reason")
+            if reason:
+                return reason
+    return pod.get("status", {}).get("phase", "Unknown")
+
+def pod_ready(pod: dict) -> bool:
+    conditions = pod.get("status", {}).get("conditions", [])
+    return any(c["type"] == "Ready" and c["status"] == "True" for c in conditions)
+
+# =============================================================================
+# MANIFESTS GENERADOS (SERVER-SIDE APPLY)
+# =============================================================================
+
+FIELD_MANAGER = "pionera"
+
+class Manifest:
+    """
+    Acumula los objetos generados de un nivel y los aplica juntos:
+    un único `kubectl apply --server-side` (v1 List) con field manager propio.
+    """
+
+    def __init__(self, field_manager: str = FIELD_MANAGER):
+        self.field_manager = field_manager
+        self.items = []
+
+    def add(self, obj: dict) -> "Manifest":
+        self.items.append(obj)
+        return self
+
+    def namespace(self, name: str) -> "Manifest":
+        return self.add({
+            "apiVersion": "v1", "kind": "Namespace",
+            "metadata": {"name": name},
+        })
+
+    def configmap(self, name: str, namespace: str, data: dict) -> "Manifest":
+        return self.add({
+            "apiVersion": "v1", "kind": "ConfigMap",
+            "metadata": {"name": name, "namespace": namespace},
+            "data": {k: str(v) for k, v in data.items()},
+        })
+
+    def secret(self, name: str, namespace: str, data: dict) -> "Manifest":
+        return self.add({
+            "apiVersion": "v1", "kind": "Secret", "type": "Opaque",
+            "metadata": {"name": name, "namespace": namespace},
+            "data": {
+                k: base64.b64encode(str(v).encode()).decode() for k, v in data.items()
+            },
+        })
+
+    def external_name_service(self, name: str, namespace: str, external_name: str) -> "Manifest":
+        return self.add({
+            "apiVersion": "v1", "kind": "Service",
+            "metadata": {"name": name, "namespace": namespace},
+            "spec": {"type": "ExternalName", "externalName": external_name},
+        })
+
+    def payload(self) -> str:
+        # Namespaces primero: el resto de objetos puede depender de ellos
+        items = sorted(self.items, key=lambda o: o["kind"] != "Namespace")
+        return json.dumps({"apiVersion": "v1", "kind": "List", "items": items})
+
+    def apply(self):
+        if not self.items:
+            return None
+        return kubectl(
+            "apply", "--server-side",
+            f"--field-manager={self.field_manager}", "--force-conflicts",
+            "-f", "-",
+            input=self.payload(),
+        )
+
+# =============================================================================
+# CACHE DE ESTADO (LIST + WATCH)
+# =============================================================================
+
+CACHE_TTL = float(os.environ.get("PIONERA_CACHE_TTL", "30"))
+
+class _Entry:
+
+    def __init__(self):
+        self.items = {}
+        self.fetched = 0.0
+        self.watch = None
+
+    def watching(self) -> bool:
+        return self.watch is not None and self.watch.poll() is None
+
+
+class ResourceCache:
+    """
+    Cache de lectura de recursos por (tipo, namespace).
+
+    - La primera lectura hace UN `kubectl get -o json` y arranca un
+      `kubectl get -w` que mantiene la cache al día en segundo plano.
+    - Mientras el watch esté vivo, las lecturas no lanzan procesos.
+    - Si el watch muere, los datos caducan tras `ttl` segundos.
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL, watch: bool = True):
+        self.ttl = ttl
+        self.watch = watch
+        self._entries = {}
+        self._lock = threading.Condition()
+
+    # -------------------------------------------------------------------------
+    def _fresh(self, entry: _Entry) -> bool:
+        if entry.watching():
+            return True
+        return time.monotonic() - entry.fetched < self.ttl
+
+    def _fill(self, resource: str, namespace: str, entry: _Entry):
+        items = get_json(resource, namespace=namespace)
+        with self._lock:
+            entry.items = {i["metadata"]["name"]: i for i in items}
+            entry.fetched = time.monotonic()
+            self._lock.notify_all()
+
+        if self.watch and not entry.watching():
+            self._start_watch(resource, namespace, entry)
+
+    def _start_watch(self, resource: str, namespace: str, entry: _Entry):
+        proc = subprocess.Popen(
+            ["kubectl", "get", resource, "-n", namespace,
+             "-w", "--output-watch-events", "-o", "json"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        entry.watch = proc
+        threading.Thread(
+            target=self._consume, args=(proc, entry), daemon=True
+        ).start()
+
+    def _consume(self, proc, entry: _Entry):
+        """
+        kubectl emite cada evento como JSON indentado (solo el cierre del
+        objeto de primer nivel empieza en la columna 0) o compacto en una
+        línea. Se decodifica una vez por evento: coste lineal, sin re-parsear
+        el buffer acumulado.
+        """
+        lines = []
+        for line in iter(lambda: proc.stdout.readline(), ""):
+            lines.append(line)
+            if not (line[:1] in ("}", "{") and line.rstrip().endswith("}")):
+                continue
+            try:
+                event = json.loads("".join(lines))
+            except ValueError:
+                # Cierre no final (p. ej. JSON compacto en varias líneas): seguir acumulando
+                continue
+            lines = []
+            self._apply(entry, event)
+
+    def _apply(self, entry: _Entry, event: dict):
+        obj = event.get("object", {})
+        name = obj.get("metadata", {}).get("name")
+        if not name:
+            return
+        with self._lock:
+            if event.get("type") == "DELETED":
+                entry.items.pop(name, None)
+            else:
+                entry.items[name] = obj
+            entry.fetched = time.monotonic()
+            self._lock.notify_all()
+
+    def _entry(self, resource: str, namespace: str) -> _Entry:
+        key = (resource, namespace)
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+        if not self._fresh(entry):
+            self._fill(resource, namespace, entry)
+        return entry
+
+    # -------------------------------------------------------------------------
+    def list(self, resource: str, namespace: str):
+        entry = self._entry(resource, namespace)
+        with self._lock:
+            return [copy.deepcopy(i) for i in entry.items.values()]
+
+    def names(self, resource: str, namespace: str):
+        entry = self._entry(resource, namespace)
+        with self._lock:
+            return sorted(entry.items)
+
+    def get(self, resource: str, namespace: str, name: str):
+        entry = self._entry(resource, namespace)
+        with self._lock:
+            item = entry.items.get(name)
+            return copy.deepcopy(item) if item else None
+
+    def wait_for(self, resource: str, namespace: str, predicate, timeout: float = 60):
+        """
+        Espera hasta que algún objeto cumpla `predicate`.
+        Con watch activo no hay sondeo: se despierta con cada evento.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = self._entry(resource, namespace)
+            with self._lock:
+                for item in entry.items.values():
+                    if predicate(item):
+                        return copy.deepcopy(item)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._lock.wait(timeout=min(remaining, 1 if entry.watching() else 3))
+
+    def invalidate(self, resource: str = None, namespace: str = None):
+        with self._lock:
+            for (res, ns), entry in self._entries.items():
+                if resource in (None, res) and namespace in (None, ns):
+                    entry.fetched = 0.0
+                    if entry.watching():
+                        entry.watch.terminate()
+
+    def close(self):
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.watching():
+                    entry.watch.terminate()
+            self._entries.clear()
+
+
+_cache = None
+
+def cache() -> ResourceCache:
+    """
+    Cache compartida por todas las comprobaciones del proceso.
+    """
+    global _cache
+    if _cache is None:
+        _cache = ResourceCache()
+        atexit.register(_cache.close)
+    return _cache
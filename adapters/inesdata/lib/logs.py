@@ -0,0 +1,323 @@
+"""
+logs.py
+
+Análisis concurrente de logs de los pods del despliegue
+
+Responsabilidades:
+- Un `kubectl logs --timestamps` por contenedor (y por contenedor anterior si
+  hubo reinicios), todos en paralelo y leídos línea a línea
+- Conjunto de reglas precompilado en UNA expresión regular (un solo
+  recorrido por línea)
+- Reinicios y terminaciones (OOMKilled, Error...) a partir del estado del pod
+- Lista estructurada de hallazgos ordenada por timestamp
+
+Hallazgo:
+    {"time", "namespace", "pod", "container", "previous",
+     "rule", "severity", "line"}
+
+Uso:
+- python3 adapters/inesdata/lib/logs.py [--pod=<subcadena>] [--since=1h]
+                                        [--follow=<segundos>] [namespace...]
+
+Principios:
+- Sin buffers completos: la salida de kubectl se consume en streaming
+- Un tope de hallazgos por contenedor y regla; el resto solo se cuenta
+- Los errores de lectura de un contenedor no detienen el análisis
+"""
+
+import re
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+if not __package__:
+    # Ejecución directa: python3 adapters/inesdata/lib/logs.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import evidence
+from lib.kubectl import get_json
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+NAMESPACES = ("demo", "common-srvs")
+
+# Hallazgos guardados por (contenedor, regla); el resto se cuenta en `suppressed`
+MAX_PER_RULE = 20
+MAX_LINE = 500
+
+# nombre → (severidad, patrón)
+RULES = {
+    "fatal": ("critical", r"\bFATAL\b"),
+    "out_of_memory": ("critical", r"OutOfMemory(?:Error)?"),
+    "null_pointer": ("critical", r"NullPointerException"),
+    "crash_loop": ("critical", r"CrashLoopBackOff"),
+    "bind_error": ("critical", r"BindException|Address already in use"),
+    "cannot_start": ("critical", r"Cannot start"),
+    "uncaught_exception": ("error", r"Exception in thread"),
+    "connection_refused": ("warning", r"Connection refused"),
+}
+
+# Una sola expresión con grupos nombrados: match.lastgroup identifica la regla
+PATTERN = re.compile("|".join(f"(?P<{name}>{pattern})" for name, (_, pattern) in RULES.items()))
+
+# =============================================================================
+# DESCUBRIMIENTO
+# =============================================================================
+
+def _statuses(pod: dict):
+    status = pod.get("status", {})
+    return status.get("initContainerStatuses", []) + status.get("containerStatuses", [])
+
+def streams(pods):
+    """
+    (namespace, pod, contenedor, previous) por cada log a leer.
+    """
+    for pod in pods:
+        meta = pod["metadata"]
+        for cs in _statuses(pod):
+            yield meta["namespace"], meta["name"], cs["name"], False
+            if cs.get("restartCount", 0) > 0:
+                yield meta["namespace"], meta["name"], cs["name"], True
+
+def state_findings(pods):
+    """
+    Reinicios y última terminación de cada contenedor (OOMKilled incluido).
+    """
+    findings = []
+    for pod in pods:
+        meta = pod["metadata"]
+        for cs in _statuses(pod):
+            restarts = cs.get("restartCount", 0)
+            last = cs.get("lastState", {}).get("terminated")
+            waiting = cs.get("state", {}).get("waiting", {}).get("reason")
+            base = {
+                "namespace": meta["namespace"],
+                "pod": meta["name"],
+                "container": cs["name"],
+                "previous": True,
+            }
+
+            if last:
+                reason = last.get("reason", "Terminated")
+                findings.append({
+                    **base,
+                    "time": last.get("finishedAt"),
+                    "rule": "oom_killed" if reason == "OOMKilled" else "terminated",
+                    "severity": "critical" if reason == "OOMKilled" else "error",
+                    "line": f"{reason} (exit {last.get('exitCode')}), {restarts} reinicios",
+                })
+            elif restarts:
+                findings.append({
+                    **base,
+                    "time": None,
+                    "rule": "restarted",
+                    "severity": "warning",
+                    "line": f"{restarts} reinicios",
+                })
+
+            if waiting == "CrashLoopBackOff":
+                findings.append({
+                    **base,
+                    "previous": False,
+                    "time": None,
+                    "rule": "crash_loop",
+                    "severity": "critical",
+                    "line": cs["state"]["waiting"].get("message", waiting)[:MAX_LINE],
+                })
+    return findings
+
+# =============================================================================
+# LECTURA Y REGLAS
+# =============================================================================
+
+def match_line(line: str):
+    """
+    (regla, timestamp, texto) o None. `line` viene con --timestamps.
+    """
+    match = PATTERN.search(line)
+    if not match:
+        return None
+    stamp, _, text = line.partition(" ")
+    return match.lastgroup, stamp, text.rstrip()[:MAX_LINE]
+
+def logs_command(namespace, pod, container, previous, since=None, follow=False):
+    cmd = ["kubectl", "logs", pod, "-c", container, "-n", namespace, "--timestamps"]
+    if previous:
+        cmd.append("--previous")
+    elif follow:
+        cmd.append("-f")
+    if since:
+        cmd.append(f"--since={since}")
+    return cmd
+
+class Analyzer:
+    """
+    Lanza todos los streams a la vez y acumula los hallazgos.
+    """
+
+    def __init__(self, since: str = None):
+        self.since = since
+        self.findings = []
+        self.suppressed = 0
+        self.lines = 0
+        self.failed = []
+        self._lock = threading.Lock()
+        self._procs = []
+
+    def _consume(self, namespace, pod, container, previous, follow):
+        try:
+            proc = subprocess.Popen(
+                logs_command(namespace, pod, container, previous, self.since, follow),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                errors="replace",
+            )
+        except OSError as e:
+            with self._lock:
+                self.failed.append(f"{namespace}/{pod}/{container}: {e}")
+            return
+
+        with self._lock:
+            self._procs.append(proc)
+
+        counts = {}
+        lines = 0
+        for line in proc.stdout:
+            lines += 1
+            hit = match_line(line)
+            if not hit:
+                continue
+            rule, stamp, text = hit
+            counts[rule] = counts.get(rule, 0) + 1
+            with self._lock:
+                if counts[rule] > MAX_PER_RULE:
+                    self.suppressed += 1
+                    continue
+                self.findings.append({
+                    "time": stamp,
+                    "namespace": namespace,
+                    "pod": pod,
+                    "container": container,
+                    "previous": previous,
+                    "rule": rule,
+                    "severity": RULES[rule][0],
+                    "line": text,
+                })
+
+        if proc.wait() != 0 and not follow:
+            with self._lock:
+                self.failed.append(f"{namespace}/{pod}/{container}{' (previous)' if previous else ''}")
+        with self._lock:
+            self.lines += lines
+
+    def run(self, targets, follow: float = 0):
+        """
+        Lee todos los streams en paralelo. Con `follow` > 0 sigue los
+        contenedores actuales durante ese número de segundos.
+        """
+        threads = [
+            threading.Thread(
+                target=self._consume,
+                args=(*target, bool(follow)),
+                name=f"logs-{target[1]}-{target[2]}",
+                daemon=True,
+            )
+            for target in targets
+        ]
+        for thread in threads:
+            thread.start()
+
+        if follow:
+            time.sleep(follow)
+            with self._lock:
+                for proc in self._procs:
+                    proc.terminate()
+
+        for thread in threads:
+            thread.join()
+        return self
+
+# =============================================================================
+# API
+# =============================================================================
+
+def analyze(namespaces=NAMESPACES, pod_filter: str = None, since: str = None,
+            follow: float = 0) -> dict:
+    """
+    Analiza los logs (actuales y anteriores) de los pods de `namespaces`.
+    Devuelve {"findings", "streams", "lines", "suppressed", "failed"}.
+    """
+    pods = [
+        pod
+        for namespace in namespaces
+        for pod in get_json("pods", namespace=namespace)
+        if not pod_filter or pod_filter in pod["metadata"]["name"]
+    ]
+    targets = list(streams(pods))
+    analyzer = Analyzer(since=since).run(targets, follow=follow)
+
+    findings = state_findings(pods) + analyzer.findings
+    findings.sort(key=lambda f: f["time"] or "")
+    return {
+        "findings": findings,
+        "streams": len(targets),
+        "lines": analyzer.lines,
+        "suppressed": analyzer.suppressed,
+        "failed": sorted(analyzer.failed),
+    }
+
+def critical(result: dict):
+    return [f for f in result["findings"] if f["severity"] == "critical"]
+
+def print_findings(result: dict, limit: int = 50):
+    findings = result["findings"]
+    print(
+        f"\n🔎 Logs: {result['streams']} streams, {result['lines']} líneas, "
+        f"{len(findings)} hallazgos"
+        + (f" (+{result['suppressed']} repetidos)" if result["suppressed"] else "")
+    )
+    icons = {"critical": "❌", "error": "⚠️", "warning": "•"}
+    for f in findings[:limit]:
+        previous = " (anterior)" if f["previous"] else ""
+        print(f"   {icons.get(f['severity'], '•')} {f['time'] or '-':<30} "
+              f"{f['namespace']}/{f['pod']}/{f['container']}{previous} [{f['rule']}]")
+        print(f"      {f['line']}")
+    if len(findings) > limit:
+        print(f"   ... {len(findings) - limit} hallazgos más")
+    for stream in result["failed"]:
+        print(f"   ⚠️ Sin logs: {stream}")
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    options = {}
+    namespaces = []
+    for arg in argv:
+        if arg.startswith("--") and "=" in arg:
+            key, _, value = arg[2:].partition("=")
+            options[key] = value
+        elif arg.startswith("-"):
+            sys.exit("Uso: logs.py [--pod=<subcadena>] [--since=1h] [--follow=<segundos>] [namespace...]")
+        else:
+            namespaces.append(arg)
+
+    result = analyze(
+        namespaces or NAMESPACES,
+        pod_filter=options.get("pod"),
+        since=options.get("since"),
+        follow=float(options.get("follow", 0)),
+    )
+    print_findings(result)
+    evidence.put("log_findings.json", result)
+    sys.exit(1 if critical(result) else 0)
+
+if __name__ == "__main__":
+    main()
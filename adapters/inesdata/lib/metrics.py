@@ -0,0 +1,230 @@
+"""
+metrics.py
+
+Exportador Prometheus de las mediciones del orquestador y las validaciones
+
+Responsabilidades:
+- Registro en memoria de contadores, gauges e histogramas con etiquetas
+- Formato de exposición Prometheus (text/plain 0.0.4)
+- Fichero textfile para node-exporter: runtime/metrics/<job>.prom
+- Endpoint /metrics opcional mientras dura la ejecución (PIONERA_METRICS_PORT)
+
+Métricas (etiquetas habituales: level, component, dataspace, connector):
+- pionera_level_duration_seconds / pionera_level_runs_total{outcome}
+- pionera_wait_seconds / pionera_wait_timeouts_total
+- pionera_retries_total
+- pionera_helm_upgrade_duration_seconds / pionera_helm_upgrades_total{outcome}
+- pionera_validation_check_duration_seconds / pionera_validation_checks_total{outcome}
+
+Principios:
+- Registrar nunca falla ni bloquea el despliegue
+- Sin start() las mediciones solo viven en memoria (librerías reutilizables)
+- El textfile se reescribe de forma atómica tras cada medición cerrada y al salir
+"""
+
+import atexit
+import contextlib
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+if not __package__:
+    # Ejecución directa: python3 adapters/inesdata/lib/metrics.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import evidence
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+METRICS_DIR = ROOT / "runtime" / "metrics"
+
+PORT_ENV = "PIONERA_METRICS_PORT"
+
+BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1200)
+
+# nombre → (tipo, ayuda)
+DEFINITIONS = {
+    "pionera_run_info": ("gauge", "Ejecución en curso (run_id)"),
+    "pionera_level_duration_seconds": ("gauge", "Duración de la última ejecución del nivel"),
+    "pionera_level_runs_total": ("counter", "Ejecuciones de nivel por resultado"),
+    "pionera_wait_seconds": ("histogram", "Tiempo hasta que una dependencia está disponible"),
+    "pionera_wait_timeouts_total": ("counter", "Esperas agotadas sin disponibilidad"),
+    "pionera_retries_total": ("counter", "Reintentos tras un intento fallido"),
+    "pionera_helm_upgrade_duration_seconds": ("histogram", "Duración de helm upgrade --install"),
+    "pionera_helm_upgrades_total": ("counter", "helm upgrade --install por resultado"),
+    "pionera_validation_check_duration_seconds": ("gauge", "Latencia de la última comprobación de validación"),
+    "pionera_validation_checks_total": ("counter", "Comprobaciones de validación por resultado"),
+}
+
+# =============================================================================
+# REGISTRO
+# =============================================================================
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()      # un único escritor del textfile (helm en hilos)
+_series = {}        # nombre → {etiquetas (tupla ordenada): valor | [buckets..., sum, count]}
+_job = None
+_server = None
+
+def _key(labels: dict):
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+def inc(name: str, amount: float = 1, **labels):
+    with _lock:
+        series = _series.setdefault(name, {})
+        key = _key(labels)
+        series[key] = series.get(key, 0) + amount
+
+def set_gauge(name: str, value: float, **labels):
+    with _lock:
+        _series.setdefault(name, {})[_key(labels)] = value
+
+def observe(name: str, value: float, **labels):
+    with _lock:
+        series = _series.setdefault(name, {})
+        state = series.setdefault(_key(labels), [0] * len(BUCKETS) + [0.0, 0])
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                state[i] += 1
+        state[-2] += value
+        state[-1] += 1
+
+def record(name: str, value: float, **labels):
+    """
+    Duración: histograma o gauge según la definición de la métrica.
+    """
+    if DEFINITIONS.get(name, ("gauge",))[0] == "histogram":
+        observe(name, value, **labels)
+    else:
+        set_gauge(name, value, **labels)
+
+@contextlib.contextmanager
+def track(duration_metric: str, count_metric: str, **labels):
+    """
+    Mide el bloque y cuenta su resultado (outcome=ok|error).
+    sys.exit(0) cuenta como ok; cualquier otra salida, como error.
+    """
+    start = time.monotonic()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except SystemExit as e:
+        if e.code in (None, 0):
+            outcome = "ok"
+        raise
+    finally:
+        record(duration_metric, time.monotonic() - start, **labels)
+        inc(count_metric, outcome=outcome, **labels)
+        flush()
+
+# =============================================================================
+# EXPOSICIÓN
+# =============================================================================
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(key, extra=()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def exposition() -> str:
+    lines = []
+    with _lock:
+        for name in sorted(_series):
+            kind, help_text = DEFINITIONS.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(_series[name].items()):
+                if kind != "histogram":
+                    lines.append(f"{name}{_labels(key)} {value:g}")
+                    continue
+                for bound, count in zip(BUCKETS, value):
+                    lines.append(f"{name}_bucket{_labels(key, [('le', f'{bound:g}')])} {count}")
+                lines.append(f"{name}_bucket{_labels(key, [('le', '+Inf')])} {value[-1]}")
+                lines.append(f"{name}_sum{_labels(key)} {value[-2]:g}")
+                lines.append(f"{name}_count{_labels(key)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+def flush():
+    """
+    Reescribe runtime/metrics/<job>.prom (solo tras start()).
+    """
+    if _job is None:
+        return
+    with _flush_lock:
+        try:
+            METRICS_DIR.mkdir(parents=True, exist_ok=True)
+            target = METRICS_DIR / f"{_job}.prom"
+            tmp = target.with_name(f".{target.name}.tmp")
+            tmp.write_text(exposition())
+            tmp.replace(target)
+        except OSError as e:
+            print(f"⚠️ Métricas no escritas: {e}")
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = exposition().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(port: int):
+    global _server
+    if _server is not None:
+        return _server
+    _server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    threading.Thread(target=_server.serve_forever, name="pionera-metrics", daemon=True).start()
+    print(f"📈 Métricas en http://127.0.0.1:{port}/metrics")
+    return _server
+
+def start(job: str):
+    """
+    Activa el textfile (runtime/metrics/<job>.prom) y, con PIONERA_METRICS_PORT,
+    el endpoint /metrics durante la ejecución.
+    """
+    global _job
+    if _job is not None:
+        return
+    _job = job
+    set_gauge("pionera_run_info", 1, job=job, run_id=evidence.current_run_id())
+    atexit.register(flush)
+
+    port = os.environ.get(PORT_ENV)
+    if port:
+        try:
+            serve(int(port))
+        except OSError as e:
+            print(f"⚠️ Endpoint de métricas no disponible en {port}: {e}")
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv:
+        sys.exit("Uso: metrics.py   (muestra los textfiles de runtime/metrics/)")
+    for path in sorted(METRICS_DIR.glob("*.prom")) if METRICS_DIR.exists() else []:
+        print(f"# ---- {path.name}")
+        print(path.read_text(), end="")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+"""
+minikube.py
+
+Gestión del clúster minikube (driver docker)
+
+- Perfiles de recursos para `minikube start` (lean / default / perf / auto)
+- Número de nodos (clústeres multinodo; colocación en lib/placement.py)
+- Checkpoint / restore del clúster completo
+
+Con --driver=docker el nodo es UN contenedor (<perfil>) más UN volumen
+(<perfil>, montado en /var) que contiene etcd, kubelet, imágenes y PVCs.
+
+Estructura (runtime/checkpoints/<tag>/):
+- manifest.json          tag, perfil origen, imagen, fecha
+- volume.tar             contenido del volumen /var del nodo
+- profile.json           config.json del perfil minikube
+- files/                 estado local ligado al clúster (claves Vault, OIDC, deployer, colocación)
+
+Imagen local: pionera-checkpoint:<tag>  (docker commit del contenedor nodo)
+
+Principios:
+- El checkpoint se toma con el nodo detenido (etcd y PVCs consistentes)
+- Se restaura sobre el mismo perfil del checkpoint (etcd, certificados y
+  nombre de nodo están ligados a él)
+- Tras restaurar, Vault se desella automáticamente
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+if not __package__:
+    # Ejecución directa: python3 adapters/inesdata/lib/minikube.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import placement, vault
+from lib.kubectl import cluster_reachable, kubectl
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+WORKDIR = ROOT / "runtime" / "workdir" / "inesdata-deployment"
+CHECKPOINT_DIR = ROOT / "runtime" / "checkpoints"
+
+PROFILE = os.environ.get("MINIKUBE_PROFILE", "minikube")
+IMAGE_REPO = "pionera-checkpoint"
+
+MINIKUBE_HOME = Path(os.environ.get("MINIKUBE_HOME", Path.home() / ".minikube"))
+
+# Estado local que debe viajar con el clúster
+RUNTIME_FILES = [
+    vault.INIT_KEYS_FILE,
+    WORKDIR / "deployer.config",
+    ROOT / "runtime" / ".auth_runtime.json",
+    placement.PLACEMENT_FILE,
+]
+
+# Perfiles de recursos (memoria en MB)
+RESOURCE_PROFILES = {
+    "lean": {"cpus": 2, "memory": 3072},
+    "default": {"cpus": 4, "memory": 4400},
+    "perf": {"cpus": 8, "memory": 12288},
+}
+RESOURCE_PROFILE_ENV = "PIONERA_RESOURCE_PROFILE"
+NODES_ENV = "PIONERA_NODES"
+
+# Margen que `auto` deja al host (SO, docker, navegador...)
+AUTO_RESERVED_CPUS = 1
+AUTO_RESERVED_MEMORY = 2048
+AUTO_MEMORY_SHARE = 0.75
+
+# =============================================================================
+# PERFILES DE RECURSOS
+# =============================================================================
+
+def host_resources():
+    """
+    (cpus, memoria MB) del host.
+    """
+    cpus = os.cpu_count() or 2
+    memory = None
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    memory = int(line.split()[1]) // 1024
+                    break
+    except OSError:
+        pass
+    if memory is None:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    return cpus, memory
+
+def auto_resources(host=None) -> dict:
+    """
+    Dimensiona el clúster según el host, sin bajar del perfil `lean`.
+    """
+    cpus, memory = host or host_resources()
+    lean = RESOURCE_PROFILES["lean"]
+    return {
+        "cpus": max(lean["cpus"], cpus - AUTO_RESERVED_CPUS),
+        "memory": max(
+            lean["memory"],
+            min(int(memory * AUTO_MEMORY_SHARE), memory - AUTO_RESERVED_MEMORY),
+        ),
+    }
+
+def resolve_nodes(nodes=None) -> int:
+    """
+    Nodos del clúster: argumento > PIONERA_NODES > 1.
+    """
+    count = int(nodes or os.environ.get(NODES_ENV) or 1)
+    if count < 1:
+        raise ValueError(f"Número de nodos inválido: {count}")
+    return count
+
+def resolve_resources(name: str = None, nodes: int = 1) -> dict:
+    """
+    Perfil efectivo: argumento > PIONERA_RESOURCE_PROFILE > "default".
+    CPUs y memoria son POR NODO (semántica de minikube con --nodes);
+    `auto` reparte el host entre los nodos.
+    """
+    name = name or os.environ.get(RESOURCE_PROFILE_ENV, "default")
+    host_cpus, host_memory = host_resources()
+
+    if name == "auto":
+        sizing = auto_resources((host_cpus // nodes, host_memory // nodes))
+    elif name in RESOURCE_PROFILES:
+        sizing = dict(RESOURCE_PROFILES[name])
+    else:
+        raise ValueError(
+            f"Perfil de recursos desconocido: {name} "
+            f"(disponibles: {', '.join([*RESOURCE_PROFILES, 'auto'])})"
+        )
+
+    if sizing["cpus"] * nodes > host_cpus or sizing["memory"] * nodes > host_memory:
+        print(f"⚠️ Perfil '{name}' x{nodes} excede el host ({host_cpus} CPUs, {host_memory} MB)")
+
+    return {
+        "profile": name, **sizing, "nodes": nodes,
+        "host_cpus": host_cpus, "host_memory": host_memory,
+    }
+
+def start_args(resources: dict):
+    args = [f"--cpus={resources['cpus']}", f"--memory={resources['memory']}"]
+    if resources.get("nodes", 1) > 1:
+        args.append(f"--nodes={resources['nodes']}")
+    return args
+
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+def _run(*cmd, check=True, capture=False):
+    return subprocess.run(
+        [str(c) for c in cmd], check=check, text=True, capture_output=capture
+    )
+
+def minikube(*args, profile=PROFILE, check=True):
+    return _run("minikube", "-p", profile, *args, check=check)
+
+def docker(*args, check=True, capture=False):
+    return _run("docker", *args, check=check, capture=capture)
+
+def image_name(tag: str) -> str:
+    return f"{IMAGE_REPO}:{tag}"
+
+def profile_config(profile: str = PROFILE) -> Path:
+    return MINIKUBE_HOME / "profiles" / profile / "config.json"
+
+def wait_api(timeout: int = 180):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cluster_reachable():
+            return
+        time.sleep(2)
+    raise RuntimeError("❌ API server no responde tras restaurar")
+
+def _volume_tar(volume: str, image: str, archive_dir: Path, mode: str):
+    """
+    Vuelca / carga el volumen con un contenedor auxiliar basado en la propia
+    imagen del checkpoint (trae tar y evita descargar imágenes externas).
+    """
+    if mode == "create":
+        mounts = ["-v", f"{volume}:/src:ro", "-v", f"{archive_dir}:/out"]
+        args = ["-C", "/src", "-cf", "/out/volume.tar", "."]
+    else:
+        mounts = ["-v", f"{volume}:/src", "-v", f"{archive_dir}:/out:ro"]
+        args = ["-C", "/src", "-xpf", "/out/volume.tar"]
+
+    docker("run", "--rm", "--entrypoint", "tar", *mounts, image, *args)
+
+# =============================================================================
+# CHECKPOINT
+# =============================================================================
+
+def checkpoint(tag: str, profile: str = PROFILE, resume: bool = True) -> dict:
+    """
+    Detiene el nodo, hace `docker commit` del contenedor, archiva el volumen
+    y, con `resume`, vuelve a arrancar el clúster (incluido el unseal).
+    """
+    # Un checkpoint = UN contenedor + UN volumen: solo clústeres de un nodo
+    nodes = json.loads(profile_config(profile).read_text()).get("Nodes") or []
+    if len(nodes) > 1:
+        raise RuntimeError(f"❌ Checkpoint no soportado en perfiles multinodo ({len(nodes)} nodos)")
+
+    dest = CHECKPOINT_DIR / tag
+    staging = CHECKPOINT_DIR / f".{tag}.partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    (staging / "files").mkdir(parents=True)
+
+    image = image_name(tag)
+
+    try:
+        print(f"⏸ Deteniendo perfil {profile}...")
+        minikube("stop", profile=profile)
+
+        print(f"📦 docker commit {profile} → {image}")
+        docker("commit", profile, image, capture=True)
+
+        print(f"📦 Archivando volumen {profile}...")
+        _volume_tar(profile, image, staging.resolve(), "create")
+
+        shutil.copy2(profile_config(profile), staging / "profile.json")
+        for path in RUNTIME_FILES:
+            if path.exists():
+                shutil.copy2(path, staging / "files" / path.name)
+
+        manifest = {
+            "tag": tag,
+            "profile": profile,
+            "image": image,
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }
+        (staging / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        if resume:
+            _start(profile)
+        raise
+
+    # El checkpoint ya está completo: se publica antes de reanudar el clúster
+    shutil.rmtree(dest, ignore_errors=True)
+    staging.rename(dest)
+
+    if resume:
+        _start(profile)
+    return manifest
+
+# =============================================================================
+# RESTORE
+# =============================================================================
+
+def _restore_files(src: Path):
+    for path in RUNTIME_FILES:
+        saved = src / "files" / path.name
+        if saved.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(saved, path)
+        elif path == placement.PLACEMENT_FILE:
+            # Checkpoint de un nodo: la colocación de otro clúster no aplica
+            placement.clear()
+
+def _write_profile(src: Path, profile: str, image: str):
+    config = json.loads((src / "profile.json").read_text())
+    config["Name"] = profile
+    config["KicBaseImage"] = image
+
+    target = profile_config(profile)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(config, indent=2))
+
+def _start(profile: str, image: str = None):
+    args = ["start", "--driver=docker"]
+    if image:
+        args.append(f"--base-image={image}")
+    minikube(*args, profile=profile)
+
+    wait_api()
+    _resume_vault()
+
+def _vault_pod_running(timeout: int = 300) -> bool:
+    """
+    Espera a que el contenedor de Vault arranque (no a Ready: sellado no lo está).
+    False si el pod no existe (checkpoint anterior al nivel 3).
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = kubectl(
+            "get", "pod", vault.VAULT_POD, "-n", vault.VAULT_NAMESPACE, "-o", "json",
+            check=False,
+        )
+        if result.returncode != 0:
+            if "NotFound" in result.stderr:
+                return False
+        else:
+            statuses = json.loads(result.stdout).get("status", {}).get("containerStatuses", [])
+            if any("running" in cs.get("state", {}) for cs in statuses):
+                return True
+        time.sleep(3)
+    raise RuntimeError(f"❌ {vault.VAULT_POD} no arrancó tras {timeout}s")
+
+def _resume_vault():
+    """
+    Unseal tras reanudar, solo si Vault existe, está inicializado y hay claves.
+    """
+    if not _vault_pod_running():
+        print("ℹ️ Vault no desplegado en este checkpoint: sin unseal")
+        return
+    if not vault.INIT_KEYS_FILE.exists():
+        print(f"ℹ️ Sin {vault.INIT_KEYS_FILE.name}: Vault no inicializado aún, sin unseal")
+        return
+    # El contenedor corre antes de que el servidor escuche
+    for attempt in range(20):
+        try:
+            state = vault.status()
+            break
+        except (RuntimeError, ValueError):
+            if attempt == 19:
+                raise
+            time.sleep(3)
+    if not state.get("initialized", False):
+        print("ℹ️ Vault no inicializado: sin unseal")
+        return
+    if vault.unseal():
+        print("🔓 Vault desellado")
+
+def restore(tag: str, profile: str = None) -> dict:
+    """
+    Recrea el perfil a partir del checkpoint: volumen restaurado + contenedor
+    desde la imagen commiteada. minikube detecta la configuración existente
+    en /var y reinicia el plano de control en lugar de ejecutar kubeadm init.
+    Solo sobre el perfil de origen: el nombre de nodo, los certificados y
+    etcd del volumen no se pueden trasladar a otro perfil.
+    """
+    src = CHECKPOINT_DIR / tag
+    manifest_file = src / "manifest.json"
+    if not manifest_file.exists():
+        raise FileNotFoundError(f"Checkpoint inexistente: {src}")
+    manifest = json.loads(manifest_file.read_text())
+    image = manifest["image"]
+
+    profile = profile or manifest["profile"]
+    if profile != manifest["profile"]:
+        raise RuntimeError(
+            f"❌ El checkpoint {tag} es del perfil {manifest['profile']}; "
+            f"no se puede restaurar en {profile}"
+        )
+
+    if docker("image", "inspect", image, check=False, capture=True).returncode != 0:
+        raise RuntimeError(f"❌ Imagen {image} no disponible en el daemon docker local")
+
+    print(f"🔥 Eliminando perfil {profile}...")
+    minikube("delete", profile=profile, check=False)
+
+    print(f"📦 Restaurando volumen {profile}...")
+    docker("volume", "create", "--label", "name.minikube.sigs.k8s.io=" + profile,
+           profile, capture=True)
+    _volume_tar(profile, image, src.resolve(), "extract")
+
+    _write_profile(src, profile, image)
+    _restore_files(src)
+
+    print(f"🚀 Arrancando perfil {profile} desde {image}...")
+    _start(profile, image)
+
+    # Solo se restaura el nodo principal: sin sus nodos la colocación no vale
+    if placement.discard_stale():
+        print("⚠️ Colocación multinodo descartada: el clúster restaurado no tiene esos nodos")
+    return manifest
+
+def available():
+    if not CHECKPOINT_DIR.exists():
+        return []
+    manifests = [
+        json.loads((d / "manifest.json").read_text())
+        for d in CHECKPOINT_DIR.iterdir()
+        if (d / "manifest.json").exists()
+    ]
+    return sorted(manifests, key=lambda m: m["created"])
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    cmd = argv.pop(0) if argv else "list"
+
+    if cmd == "list":
+        for m in available():
+            print(f"{m['tag']:<12} {m['created']}  {m['image']}  (perfil {m['profile']})")
+    elif cmd == "checkpoint" and argv:
+        checkpoint(argv[0], *argv[1:2])
+        print(f"✓ Checkpoint {argv[0]} generado")
+    elif cmd == "restore" and argv:
+        restore(argv[0], *argv[1:2])
+        print(f"✓ Checkpoint {argv[0]} restaurado")
+    else:
+        sys.exit("Uso: minikube.py list | checkpoint <tag> [perfil] | restore <tag> [perfil]")
+
+if __name__ == "__main__":
+    main()
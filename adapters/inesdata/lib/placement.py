@@ -0,0 +1,182 @@
+"""
+placement.py
+
+Colocación de componentes en clústeres minikube multinodo
+
+Responsabilidades:
+- Resolver qué nodos aloja cada componente (common / dataspace / portal / connector)
+- Etiquetar los nodos (pionera.io/<componente>=true)
+- Persistir la colocación en runtime/placement.json
+- Traducir la colocación a nodeSelector para el post-renderer de Helm
+
+Especificación (PIONERA_PLACEMENT o argumento), nodos numerados desde 1:
+    common=1;dataspace=2;portal=2;connector=2-4
+    connector=3,4            (los componentes omitidos usan la colocación por defecto)
+
+Principios:
+- Un solo nodo = sin colocación: no hay fichero ni nodeSelector
+- Las etiquetas se reescriben completas en cada nivel 1 (sin restos de ejecuciones previas)
+- Una colocación cuyos nodos no existen (checkpoint restaurado) se descarta
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+if not __package__:
+    # Ejecución directa: python3 adapters/inesdata/lib/placement.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib.kubectl import get_json, kubectl
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+PLACEMENT_FILE = ROOT / "runtime" / "placement.json"
+
+PLACEMENT_ENV = "PIONERA_PLACEMENT"
+LABEL_PREFIX = "pionera.io/"
+
+# common    → release common-srvs (PostgreSQL, Keycloak, Vault, MinIO)
+# dataspace → step-1 (registration-service)
+# portal    → step-2 (portal público)
+# connector → un release por connector
+COMPONENTS = ("common", "dataspace", "portal", "connector")
+
+# =============================================================================
+# RESOLUCIÓN
+# =============================================================================
+
+def node_names(count: int, profile: str):
+    """
+    Convención de minikube: <perfil>, <perfil>-m02, <perfil>-m03...
+    """
+    return [profile] + [f"{profile}-m{i:02d}" for i in range(2, count + 1)]
+
+def default_placement(count: int) -> dict:
+    """
+    Servicios comunes aislados en el nodo 1; dataspace y portal en el 2;
+    connectors en el resto (o en el 2 si solo hay dos nodos).
+    """
+    if count < 2:
+        return {}
+    connectors = list(range(3, count + 1)) or [2]
+    return {"common": [1], "dataspace": [2], "portal": [2], "connector": connectors}
+
+def _node_list(value: str, count: int):
+    nodes = []
+    for part in value.split(","):
+        start, _, end = part.strip().partition("-")
+        nodes.extend(range(int(start), int(end or start) + 1))
+
+    invalid = [n for n in nodes if not 1 <= n <= count]
+    if invalid:
+        raise ValueError(f"Nodos fuera de rango (1-{count}): {invalid}")
+    return sorted(set(nodes))
+
+def parse(spec: str, count: int) -> dict:
+    placement = default_placement(count)
+    for item in filter(None, (s.strip() for s in (spec or "").split(";"))):
+        component, _, value = item.partition("=")
+        component = component.strip()
+        if component not in COMPONENTS:
+            raise ValueError(
+                f"Componente desconocido: {component} (disponibles: {', '.join(COMPONENTS)})"
+            )
+        placement[component] = _node_list(value, count)
+    return placement
+
+# =============================================================================
+# APLICACIÓN
+# =============================================================================
+
+def label_nodes(names, placement: dict):
+    """
+    UN `kubectl label` por nodo: añade las etiquetas asignadas y retira el resto.
+    """
+    for index, name in enumerate(names, start=1):
+        labels = [
+            f"{LABEL_PREFIX}{c}=true" if index in placement.get(c, []) else f"{LABEL_PREFIX}{c}-"
+            for c in COMPONENTS
+        ]
+        kubectl("label", "node", name, "--overwrite", *labels)
+
+def apply(count: int, profile: str, spec: str = None) -> dict:
+    """
+    Etiqueta los nodos y persiste la colocación. Devuelve {componente: [nodos]}.
+    """
+    if count < 2:
+        clear()
+        return {}
+
+    names = node_names(count, profile)
+    placement = parse(spec if spec is not None else os.environ.get(PLACEMENT_ENV), count)
+    label_nodes(names, placement)
+
+    resolved = {c: [names[i - 1] for i in nodes] for c, nodes in placement.items()}
+    PLACEMENT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    PLACEMENT_FILE.write_text(
+        json.dumps({"profile": profile, "nodes": names, "components": resolved}, indent=2)
+    )
+    return resolved
+
+def clear():
+    PLACEMENT_FILE.unlink(missing_ok=True)
+
+def discard_stale() -> bool:
+    """
+    Borra runtime/placement.json si sus nodos no coinciden con los del
+    clúster actual o no llevan las etiquetas. Con nodeSelector sobre nodos
+    inexistentes los pods quedarían Pending. True si se descartó.
+    """
+    current = load()
+    if not current:
+        return False
+
+    labels = {
+        node["metadata"]["name"]: node["metadata"].get("labels", {})
+        for node in get_json("nodes")
+    }
+    stale = set(current["nodes"]) != set(labels) or any(
+        labels.get(name, {}).get(f"{LABEL_PREFIX}{component}") != "true"
+        for component, names in current["components"].items()
+        for name in names
+    )
+    if stale:
+        clear()
+    return stale
+
+def load() -> dict:
+    if not PLACEMENT_FILE.exists():
+        return {}
+    return json.loads(PLACEMENT_FILE.read_text())
+
+def node_selector(component: str):
+    """
+    nodeSelector del componente, o None si el clúster no tiene colocación.
+    """
+    if component in load().get("components", {}):
+        return {f"{LABEL_PREFIX}{component}": "true"}
+    return None
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv:
+        sys.exit("Uso: placement.py   (muestra la colocación actual)")
+
+    current = load()
+    if not current:
+        print("Clúster de un nodo: sin colocación")
+        return
+    for component, nodes in current["components"].items():
+        print(f"{component:<10} → {', '.join(nodes)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+plan.py
+
+Modo plan/diff del despliegue
+
+Responsabilidades:
+- Capturar el estado del clúster en pocas llamadas masivas:
+  1 kubectl get (namespaces, deployments, statefulsets, secrets, configmaps, services)
+  1 helm list -A
+  1 consulta al catálogo PostgreSQL
+- Derivar el estado deseado desde los values files generados
+- Calcular el conjunto mínimo de niveles a (re)ejecutar
+
+Principios:
+- Solo lectura: el plan nunca modifica el clúster
+- Determinista: mismo snapshot + mismos values → mismo plan
+"""
+
+from collections import namedtuple
+from pathlib import Path
+
+from lib import helm, kubectl, postgres, yaml_utils
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+WORKDIR = ROOT / "runtime" / "workdir" / "inesdata-deployment"
+
+DATASPACE = "demo"
+CONNECTOR = "conn-oeg-demo"
+COMMON_NS = "common-srvs"
+
+STEP1_VALUES = WORKDIR / "dataspace" / "step-1" / f"values-{DATASPACE}.yaml"
+STEP2_VALUES = WORKDIR / "dataspace" / "step-2" / f"values-{DATASPACE}.yaml"
+CONNECTOR_VALUES = WORKDIR / "connector" / f"values-{CONNECTOR}.yaml"
+
+LEVELS = [f"nivel_{i}" for i in range(1, 11)]
+
+# Niveles que invalidan a otros al re-ejecutarse
+DEPENDENTS = {
+    "nivel_1": LEVELS[1:],
+    "nivel_2": LEVELS[2:],
+    "nivel_6": ["nivel_7", "nivel_8"],   # reset DB registro → participantes perdidos
+    "nivel_7": ["nivel_8"],
+    "nivel_9": ["nivel_10"],
+}
+
+BULK_RESOURCES = "namespaces,deployments,statefulsets,secrets,configmaps,services"
+
+Action = namedtuple("Action", "level target reason")
+
+# =============================================================================
+# SNAPSHOT
+# =============================================================================
+
+def snapshot(edc_db: str = postgres.RS_DB) -> dict:
+    """
+    Estado observado del clúster en 3 llamadas.
+    """
+    snap = {
+        "reachable": kubectl.cluster_reachable(),
+        "objects": {},
+        "releases": {},
+        "pg": None,
+    }
+    if not snap["reachable"]:
+        return snap
+
+    for item in kubectl.get_json(BULK_RESOURCES, all_namespaces=True):
+        meta = item["metadata"]
+        snap["objects"][(item["kind"], meta.get("namespace"), meta["name"])] = item
+
+    for rel in helm.list_releases():
+        snap["releases"][(rel["namespace"], rel["name"])] = rel.get("status")
+
+    if ("StatefulSet", COMMON_NS, "common-srvs-postgresql") in snap["objects"]:
+        try:
+            snap["pg"] = postgres.catalog(edc_db)
+        except Exception as e:
+            print(f"⚠️ Catálogo PostgreSQL no disponible: {e}")
+
+    return snap
+
+# =============================================================================
+# ESTADO DESEADO
+# =============================================================================
+
+def _db(values_file: Path, key: str):
+    if not values_file.exists():
+        return None
+    db = yaml_utils.load(values_file)["services"]["db"][key]
+    return db["name"], db["user"]
+
+def desired() -> dict:
+    return {
+        "registration_db": _db(STEP1_VALUES, "registration"),
+        "portal_db": _db(STEP2_VALUES, "portal"),
+        "connector_db": CONNECTOR.replace("-", "_"),
+    }
+
+# =============================================================================
+# DIFF
+# =============================================================================
+
+def diff(snap: dict, want: dict):
+    actions = []
+
+    def need(level, target, reason):
+        actions.append(Action(level, target, reason))
+
+    if not snap["reachable"]:
+        need("nivel_1", "cluster", "API server no accesible")
+        return actions
+
+    objects = snap["objects"]
+    releases = snap["releases"]
+    pg = snap["pg"]
+
+    def missing(kind, ns, name):
+        return (kind, ns, name) not in objects
+
+    def not_ready(ns, name):
+        item = objects.get(("Deployment", ns, name))
+        return item is None or not kubectl.deployment_ready(item)
+
+    def release_ok(ns, name):
+        return releases.get((ns, name)) == "deployed"
+
+    databases = {d["name"] for d in pg["databases"]} if pg else set()
+    roles = set(pg["roles"]) if pg else set()
+
+    # ---------------------------------------------------------------- nivel 2
+    if not release_ok(COMMON_NS, "common-srvs"):
+        need("nivel_2", "helm/common-srvs", "release ausente o no 'deployed'")
+    for sts in ("common-srvs-postgresql", "common-srvs-vault", "common-srvs-keycloak"):
+        if missing("StatefulSet", COMMON_NS, sts):
+            need("nivel_2", f"statefulset/{sts}", "no existe")
+    if missing("Secret", COMMON_NS, "common-srvs-keycloak-db"):
+        need("nivel_2", "secret/common-srvs-keycloak-db", "no existe")
+
+    # ---------------------------------------------------------------- nivel 3
+    for path in (WORKDIR / "common" / "init-keys-vault.json", WORKDIR / "deployer.config"):
+        if not path.exists():
+            need("nivel_3", path.name, "fichero no generado")
+
+    # ---------------------------------------------------------------- nivel 4
+    if not (ROOT / "venv").exists():
+        need("nivel_4", "venv", "entorno Python del deployer ausente")
+
+    # ---------------------------------------------------------------- nivel 5
+    for path in (STEP1_VALUES, STEP2_VALUES):
+        if not path.exists():
+            need("nivel_5", str(path.relative_to(WORKDIR)), "values del dataspace no generado")
+
+    # ---------------------------------------------------------------- nivel 6
+    if missing("Namespace", None, DATASPACE):
+        need("nivel_6", f"namespace/{DATASPACE}", "no existe")
+    if not release_ok(DATASPACE, f"{DATASPACE}-dataspace-s1"):
+        need("nivel_6", f"helm/{DATASPACE}-dataspace-s1", "release ausente o no 'deployed'")
+    for kind, name in (("ConfigMap", "demo-registration-service-config"),
+                       ("Secret", "demo-registration-service-secret")):
+        if missing(kind, DATASPACE, name):
+            need("nivel_6", f"{kind.lower()}/{name}", "no existe")
+    if not_ready(DATASPACE, "demo-registration-service"):
+        need("nivel_6", "deployment/demo-registration-service", "ausente o no Ready")
+    if want["registration_db"]:
+        db_name, db_user = want["registration_db"]
+        if db_name not in databases or db_user not in roles:
+            need("nivel_6", f"db/{db_name}", "base o rol de registro ausente")
+
+    # ---------------------------------------------------------------- nivel 7
+    if not CONNECTOR_VALUES.exists():
+        need("nivel_7", CONNECTOR_VALUES.name, "values del connector no generado")
+    if want["connector_db"] not in databases:
+        need("nivel_7", f"db/{want['connector_db']}", "base del connector ausente")
+    if not (pg and pg["edc_schema"]):
+        need("nivel_7", "edc_participant", "esquema EDC no inicializado")
+
+    # ---------------------------------------------------------------- nivel 8
+    if not (ROOT / "runtime" / ".auth_runtime.json").exists():
+        need("nivel_8", ".auth_runtime.json", "bootstrap OIDC no ejecutado")
+    if not release_ok(DATASPACE, CONNECTOR):
+        need("nivel_8", f"helm/{CONNECTOR}", "release ausente o no 'deployed'")
+    if not_ready(DATASPACE, CONNECTOR):
+        need("nivel_8", f"deployment/{CONNECTOR}", "ausente o no Ready")
+
+    # ---------------------------------------------------------------- nivel 9
+    if not release_ok(DATASPACE, f"{DATASPACE}-dataspace-s2"):
+        need("nivel_9", f"helm/{DATASPACE}-dataspace-s2", "release ausente o no 'deployed'")
+    for deploy in ("demo-public-portal-backend", "demo-public-portal-frontend"):
+        if not_ready(DATASPACE, deploy):
+            need("nivel_9", f"deployment/{deploy}", "ausente o no Ready")
+    alias = objects.get(("Service", DATASPACE, "common-srvs-postgresql"))
+    if alias is None or alias["spec"].get("externalName") != "common-srvs-postgresql.common-srvs.svc":
+        need("nivel_9", "service/common-srvs-postgresql", "alias ExternalName ausente o incorrecto")
+    if want["portal_db"]:
+        db_name, db_user = want["portal_db"]
+        if db_name not in databases or db_user not in roles:
+            need("nivel_9", f"db/{db_name}", "base o rol del portal ausente")
+
+    return actions
+
+# =============================================================================
+# CONJUNTO MÍNIMO
+# =============================================================================
+
+def levels(actions):
+    """
+    Niveles a ejecutar, en orden, incluyendo los dependientes de cada nivel
+    afectado. Si hace falta cualquier nivel ≥5, se incluye nivel_4
+    (port-forwards requeridos).
+    """
+    selected = {a.level for a in actions}
+
+    changed = True
+    while changed:
+        changed = False
+        for level in list(selected):
+            for dep in DEPENDENTS.get(level, []):
+                if dep not in selected:
+                    selected.add(dep)
+                    changed = True
+
+    if any(LEVELS.index(lv) >= 4 for lv in selected):
+        selected.add("nivel_4")
+
+    return [lv for lv in LEVELS if lv in selected]
+
+def compute():
+    want = desired()
+    edc_db = want["registration_db"][0] if want["registration_db"] else postgres.RS_DB
+    return diff(snapshot(edc_db), want)
+
+def print_plan(actions):
+    if not actions:
+        print("✔ Sin cambios: el clúster coincide con el estado deseado")
+        return
+
+    for level in LEVELS:
+        items = [a for a in actions if a.level == level]
+        if items:
+            print(f"\n{level}")
+            for a in items:
+                print(f"  ~ {a.target}: {a.reason}")
+
+    print(f"\n➡ Niveles a ejecutar: {', '.join(levels(actions))}")
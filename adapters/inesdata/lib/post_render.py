@@ -0,0 +1,98 @@
+"""
+post_render.py
+
+Post-renderer Helm (stdin → stdout) para los despliegues PIONERA
+
+Uso (lo monta lib/helm.upgrade_install):
+    helm upgrade ... --post-renderer <python> --post-renderer-args <este fichero>
+
+Transformaciones (controladas por entorno):
+- PIONERA_CONFIG_HASH          anotación pionera.io/config-hash en el pod template
+- PIONERA_CONFIG_HASH_TARGETS  workloads afectados (nombres separados por comas;
+                               vacío = todos)
+- PIONERA_NODE_SELECTOR        nodeSelector (JSON) en todos los pods del release
+                               (colocación multinodo, lib/placement.py)
+- PIONERA_STRIP_HOST_PORTS     elimina hostPort de los contenedores (=1)
+
+Principios:
+- El hash viaja en el MISMO upgrade que el resto de cambios del chart:
+  como mucho UN rollout, y ninguno si nada cambió
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+if not __package__:
+    # Ejecución directa por Helm: python3 adapters/inesdata/lib/post_render.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import yaml_utils
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+CONFIG_HASH_ANNOTATION = "pionera.io/config-hash"
+WORKLOADS = ("Deployment", "StatefulSet", "DaemonSet")
+POD_OWNERS = WORKLOADS + ("Job",)
+
+# =============================================================================
+# TRANSFORMACIONES
+# =============================================================================
+
+def _targets(env_var: str):
+    return {t for t in os.environ.get(env_var, "").split(",") if t}
+
+def _workloads(documents, targets, kinds=WORKLOADS):
+    for doc in documents:
+        if not isinstance(doc, dict) or doc.get("kind") not in kinds:
+            continue
+        if targets and doc.get("metadata", {}).get("name") not in targets:
+            continue
+        yield doc
+
+def inject_config_hash(documents):
+    config_hash = os.environ.get("PIONERA_CONFIG_HASH")
+    if not config_hash:
+        return
+    for doc in _workloads(documents, _targets("PIONERA_CONFIG_HASH_TARGETS")):
+        template = doc.setdefault("spec", {}).setdefault("template", {})
+        annotations = template.setdefault("metadata", {}).setdefault("annotations", {}) or {}
+        annotations[CONFIG_HASH_ANNOTATION] = config_hash
+        template["metadata"]["annotations"] = annotations
+
+def _pod_spec(doc):
+    return doc.setdefault("spec", {}).setdefault("template", {}).setdefault("spec", {})
+
+def inject_node_selector(documents):
+    selector = os.environ.get("PIONERA_NODE_SELECTOR")
+    if not selector:
+        return
+    selector = json.loads(selector)
+    for doc in _workloads(documents, set(), POD_OWNERS):
+        pod_spec = _pod_spec(doc)
+        pod_spec["nodeSelector"] = {**(pod_spec.get("nodeSelector") or {}), **selector}
+
+def strip_host_ports(documents):
+    if os.environ.get("PIONERA_STRIP_HOST_PORTS") != "1":
+        return
+    for doc in _workloads(documents, set(), POD_OWNERS):
+        pod_spec = _pod_spec(doc)
+        for container in pod_spec.get("containers", []) + pod_spec.get("initContainers", []):
+            for port in container.get("ports") or []:
+                port.pop("hostPort", None)
+
+def render(text: str) -> str:
+    documents = [d for d in yaml_utils.loads_all(text) if d]
+    inject_config_hash(documents)
+    inject_node_selector(documents)
+    strip_host_ports(documents)
+    return yaml_utils.dumps_all(documents)
+
+def main():
+    sys.stdout.write(render(sys.stdin.read()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""
+postgres.py
+
+Acceso común a PostgreSQL (common-srvs-postgresql-0) vía kubectl exec
+
+Responsabilidades:
+- Password admin desde el Secret Kubernetes
+- Ejecución de SQL sin shell intermedio
+- Lectura del catálogo (bases, roles, esquema EDC) en UNA consulta
+- Reconciliación declarativa de bases / roles / owners / passwords
+- Bases plantilla (pg_dump → tpl_<base>, CREATE DATABASE … TEMPLATE …) para evitar migraciones
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+
+from lib.kubectl import kubectl, secret_value
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+PG_NAMESPACE = "common-srvs"
+PG_POD = "common-srvs-postgresql-0"
+PG_ADMIN_USER = "postgres"
+PG_SECRET = "common-srvs-postgresql"
+
+RS_DB = "demo_rs"
+
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+_admin_password = None
+
+def admin_password() -> str:
+    global _admin_password
+    if _admin_password is None:
+        _admin_password = secret_value(PG_SECRET, PG_NAMESPACE, "postgres-password")
+    return _admin_password
+
+def psql(sql, db: str = "postgres", tuples: bool = True, check: bool = True):
+    """
+    Ejecuta `sql` con el usuario admin. Devuelve stdout (sin espacios finales).
+
+    `sql` puede ser una lista: cada sentencia va en su propio `-c`
+    (fuera de bloque transaccional, necesario para CREATE/DROP DATABASE)
+    y todas se ejecutan en UN solo kubectl exec.
+    """
+    statements = [sql] if isinstance(sql, str) else list(sql)
+
+    args = [
+        "exec", "-n", PG_NAMESPACE, PG_POD, "--",
+        "env", f"PGPASSWORD={admin_password()}",
+        "psql", "-v", "ON_ERROR_STOP=1", "-U", PG_ADMIN_USER, "-d", db,
+    ]
+    if tuples:
+        args += ["-t", "-A"]
+    for stmt in statements:
+        args += ["-c", stmt]
+    return kubectl(*args, check=check).stdout.strip()
+
+def ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+# =============================================================================
+# CATÁLOGO
+# =============================================================================
+
+CATALOG_SQL = """
+SELECT json_build_object(
+  'databases', (
+    SELECT coalesce(json_agg(json_build_object(
+      'name', datname,
+      'owner', pg_get_userbyid(datdba),
+      'template', datistemplate
+    )), '[]') FROM pg_database
+  ),
+  'roles', (SELECT coalesce(json_agg(rolname), '[]') FROM pg_roles),
+  'edc_tables', (
+    SELECT coalesce(json_agg(table_name), '[]')
+    FROM information_schema.tables
+    WHERE table_schema = 'public' AND table_name = 'edc_participant'
+  ),
+  'current_database', current_database()
+);
+"""
+
+def catalog(edc_db: str = RS_DB) -> dict:
+    """
+    Estado del servidor en una sola ejecución: pg_database, pg_roles y
+    existencia de la tabla edc_participant en `edc_db`.
+    Si `edc_db` no existe, la consulta se resuelve contra `postgres`.
+    """
+    script = (
+        f'psql -t -A -U {PG_ADMIN_USER} -d {edc_db} -c "$SQL" 2>/dev/null '
+        f'|| psql -t -A -U {PG_ADMIN_USER} -d postgres -c "$SQL"'
+    )
+    out = kubectl(
+        "exec", "-n", PG_NAMESPACE, PG_POD, "--",
+        "env", f"PGPASSWORD={admin_password()}", f"SQL={CATALOG_SQL}",
+        "sh", "-c", script,
+    ).stdout.strip()
+
+    data = json.loads(out)
+    data["edc_schema"] = (
+        data["current_database"] == edc_db and "edc_participant" in data["edc_tables"]
+    )
+    return data
+
+def database_oid(name: str) -> str:
+    """
+    OID de la base ("" si no existe). Cambia con cada DROP + CREATE:
+    identifica una base recreada aunque su configuración sea la misma.
+    """
+    return psql(f"SELECT oid FROM pg_database WHERE datname = {literal(name)};")
+
+# =============================================================================
+# RECONCILIACIÓN DECLARATIVA
+# =============================================================================
+
+RESET_ENV = "PIONERA_DB_RESET"
+
+STATE_SQL = """
+SELECT json_build_object(
+  'databases', (
+    SELECT coalesce(json_object_agg(datname, pg_get_userbyid(datdba)), '{}')
+    FROM pg_database
+  ),
+  'roles', (
+    SELECT coalesce(json_object_agg(rolname, json_build_object(
+      'login', rolcanlogin,
+      'password', rolpassword
+    )), '{}') FROM pg_authid
+  )
+);
+"""
+
+def reset_requested() -> bool:
+    return os.environ.get(RESET_ENV, "").lower() in ("1", "true", "yes")
+
+def current_state() -> dict:
+    """
+    Bases (→ owner) y roles (→ login, verificador de password)
+    en una única consulta a pg_database / pg_authid.
+    """
+    return json.loads(psql(STATE_SQL))
+
+def password_matches(stored, user: str, password: str) -> bool:
+    """
+    Comprueba `password` contra el verificador almacenado (SCRAM-SHA-256 o md5)
+    sin necesidad de conocer el valor previo.
+    """
+    if not stored:
+        return False
+
+    if stored.startswith("SCRAM-SHA-256$"):
+        try:
+            params, keys = stored[len("SCRAM-SHA-256$"):].split("$")
+            iterations, salt = params.split(":")
+            stored_key, _ = keys.split(":")
+        except ValueError:
+            return False
+        salted = hashlib.pbkdf2_hmac(
+            "sha256", password.encode(), base64.b64decode(salt), int(iterations)
+        )
+        client_key = hmac.new(salted, b"Client Key", hashlib.sha256).digest()
+        return hmac.compare_digest(
+            base64.b64encode(hashlib.sha256(client_key).digest()).decode(),
+            stored_key,
+        )
+
+    if stored.startswith("md5"):
+        expected = "md5" + hashlib.md5((password + user).encode()).hexdigest()
+        return hmac.compare_digest(expected, stored)
+
+    return False
+
+def drop_statements(db_name: str, db_user: str = None):
+    """
+    Reset rápido: WITH (FORCE) termina las sesiones abiertas
+    (PostgreSQL ≥ 13) y evita bucles de reintento.
+    """
+    stmts = [f"DROP DATABASE IF EXISTS {ident(db_name)} WITH (FORCE);"]
+    if db_user:
+        stmts.append(f"DROP ROLE IF EXISTS {ident(db_user)};")
+    return stmts
+
+def plan_database(state: dict, name: str, owner: str, password: str,
+                  reset: bool = False, template: str = None):
+    """
+    Sentencias mínimas para llevar (name, owner, password) al estado deseado.
+    Si la base no existe y `template` está disponible, se clona de él.
+    """
+    databases = state["databases"]
+    roles = state["roles"]
+    stmts = []
+
+    if reset:
+        stmts += drop_statements(name, owner)
+        databases = {k: v for k, v in databases.items() if k != name}
+        roles = {k: v for k, v in roles.items() if k != owner}
+
+    role = roles.get(owner)
+    if role is None:
+        stmts.append(f"CREATE ROLE {ident(owner)} LOGIN PASSWORD {literal(password)};")
+    elif not role["login"] or not password_matches(role["password"], owner, password):
+        stmts.append(f"ALTER ROLE {ident(owner)} WITH LOGIN PASSWORD {literal(password)};")
+
+    if name not in databases:
+        if template and template in databases:
+            stmts.append(
+                f"CREATE DATABASE {ident(name)} TEMPLATE {ident(template)} OWNER {ident(owner)};"
+            )
+        else:
+            stmts.append(f"CREATE DATABASE {ident(name)} OWNER {ident(owner)};")
+    elif databases[name] != owner:
+        stmts.append(f"ALTER DATABASE {ident(name)} OWNER TO {ident(owner)};")
+
+    return stmts
+
+def reconcile(databases, reset: bool = None):
+    """
+    Reconcilia una lista de {"name", "owner", "password"}.
+    Lee el estado actual UNA vez y aplica solo las diferencias.
+    Con `reset` (o PIONERA_DB_RESET=1) fuerza drop + create.
+    Con PIONERA_DB_TEMPLATES activo, las bases nuevas se clonan de su plantilla.
+    Devuelve las sentencias ejecutadas.
+    """
+    if reset is None:
+        reset = reset_requested()
+
+    state = current_state()
+    stmts = []
+    cloned = []
+    for db in databases:
+        template = template_name(db["name"]) if templates_enabled() else None
+        db_stmts = plan_database(
+            state, db["name"], db["owner"], db["password"],
+            reset=reset, template=template
+        )
+        if any(" TEMPLATE " in stmt for stmt in db_stmts):
+            cloned.append(db)
+        stmts += db_stmts
+
+    if stmts:
+        psql(stmts)
+    for db in cloned:
+        adopt_template_objects(db["name"], db["owner"])
+    return stmts
+
+def describe(stmts) -> str:
+    """
+    Sentencias con las passwords ocultas (para logs).
+    """
+    return "\n".join(
+        stmt.split(" PASSWORD ")[0] + (" PASSWORD '***';" if " PASSWORD " in stmt else "")
+        for stmt in stmts
+    )
+
+# =============================================================================
+# BASES PLANTILLA
+# =============================================================================
+
+TEMPLATES_ENV = "PIONERA_DB_TEMPLATES"   # "1" = usar/crear, "refresh" = regenerar
+
+# Propietario estable de los objetos de las plantillas: el rol de la aplicación
+# puede borrarse (DROP ROLE) aunque exista tpl_<db>
+TEMPLATE_OWNER = "pionera_template"
+
+def templates_enabled() -> bool:
+    return os.environ.get(TEMPLATES_ENV, "").lower() in ("1", "true", "yes", "refresh")
+
+def templates_refresh() -> bool:
+    return os.environ.get(TEMPLATES_ENV, "").lower() == "refresh"
+
+def template_name(db_name: str) -> str:
+    return f"tpl_{db_name}"
+
+def has_template(db_name: str) -> bool:
+    return template_name(db_name) in current_state()["databases"]
+
+# Filas que no deben viajar en la plantilla (registros hechos tras el arranque)
+TEMPLATE_EXCLUDE_DATA = {
+    RS_DB: ["public.edc_participant"],
+}
+
+def _dump_into(source: str, target: str, exclude_data=()):
+    """
+    pg_dump de `source` restaurado en `target` como TEMPLATE_OWNER.
+    pg_dump lee una instantánea MVCC: no bloquea ni corta las sesiones
+    de la aplicación que está usando `source`.
+    """
+    excludes = " ".join(f"--exclude-table-data={t}" for t in exclude_data)
+    dump = f"/tmp/{target}.sql"
+    script = (
+        f"{{ echo 'SET ROLE {ident(TEMPLATE_OWNER)};'; "
+        f"pg_dump -U {PG_ADMIN_USER} --no-owner --no-privileges {excludes} \"$SRC\"; }} > {dump} && "
+        f"psql -q -v ON_ERROR_STOP=1 -U {PG_ADMIN_USER} -d \"$DST\" -f {dump} >/dev/null; "
+        f"rc=$?; rm -f {dump}; exit $rc"
+    )
+    kubectl(
+        "exec", "-n", PG_NAMESPACE, PG_POD, "--",
+        "env", f"PGPASSWORD={admin_password()}", f"SRC={source}", f"DST={target}",
+        "sh", "-c", script,
+    )
+
+def snapshot_template(db_name: str, exclude_data=None) -> bool:
+    """
+    Congela `db_name` (ya inicializada) como plantilla tpl_<db_name>.
+    Solo actúa con PIONERA_DB_TEMPLATES activo; no regenera una plantilla
+    existente salvo con PIONERA_DB_TEMPLATES=refresh.
+    Copia con pg_dump (la aplicación sigue conectada), sin los datos de
+    TEMPLATE_EXCLUDE_DATA, y con los objetos a nombre de TEMPLATE_OWNER
+    (el rol de la aplicación sigue pudiendo borrarse).
+    """
+    if not templates_enabled():
+        return False
+
+    tpl = template_name(db_name)
+    state = current_state()
+    databases = state["databases"]
+
+    if db_name not in databases:
+        return False
+    if tpl in databases and not templates_refresh():
+        return False
+    if exclude_data is None:
+        exclude_data = TEMPLATE_EXCLUDE_DATA.get(db_name, ())
+
+    stmts = []
+    if TEMPLATE_OWNER not in state["roles"]:
+        stmts.append(f"CREATE ROLE {ident(TEMPLATE_OWNER)} NOLOGIN;")
+    if tpl in databases:
+        stmts += [
+            f"ALTER DATABASE {ident(tpl)} IS_TEMPLATE false;",
+            f"DROP DATABASE {ident(tpl)} WITH (FORCE);",
+        ]
+    stmts.append(
+        f"CREATE DATABASE {ident(tpl)} TEMPLATE template0 OWNER {ident(TEMPLATE_OWNER)};"
+    )
+    psql(stmts)
+
+    try:
+        _dump_into(db_name, tpl, exclude_data)
+    except BaseException:
+        # Una plantilla a medias no debe usarse para clonar
+        psql(f"DROP DATABASE IF EXISTS {ident(tpl)} WITH (FORCE);", check=False)
+        raise
+
+    psql(f"ALTER DATABASE {ident(tpl)} IS_TEMPLATE true;")
+    return True
+
+def adopt_template_objects(db_name: str, owner: str):
+    """
+    En una base recién clonada, los objetos de TEMPLATE_OWNER pasan a `owner`.
+    """
+    if TEMPLATE_OWNER not in current_state()["roles"]:
+        return
+    psql(f"REASSIGN OWNED BY {ident(TEMPLATE_OWNER)} TO {ident(owner)};", db=db_name)
+
+def clone_from_template(db_name: str, owner: str) -> bool:
+    """
+    Sustituye `db_name` por una copia de su plantilla (si existe).
+    """
+    if not templates_enabled() or not has_template(db_name):
+        return False
+
+    psql([
+        f"DROP DATABASE IF EXISTS {ident(db_name)} WITH (FORCE);",
+        f"CREATE DATABASE {ident(db_name)} TEMPLATE {ident(template_name(db_name))} "
+        f"OWNER {ident(owner)};",
+    ])
+    adopt_template_objects(db_name, owner)
+    return True
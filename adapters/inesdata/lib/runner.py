@@ -0,0 +1,103 @@
+"""
+runner.py
+
+Ejecución de los scripts de nivel dentro del proceso del orquestador
+
+Responsabilidades:
+- Cargar cada script (nombres con guiones) como módulo vía importlib
+- Invocar su `main(config)` compartiendo imports, caches y conexiones
+- Traducir sys.exit(≠0) del script en CalledProcessError (como check=True)
+- Fallback a subproceso (venv) si el script no es importable en este intérprete
+
+Convención de `config`:
+- dict con las mismas claves que las variables de entorno que acepta el
+  script (KC_URL, PORTAL_BACKEND_URL, ...); en modo subproceso se pasan
+  como entorno, por lo que ambos caminos son equivalentes
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+VENV_PYTHON = ROOT / "venv" / "bin" / "python"
+
+_modules = {}
+
+# =============================================================================
+# CARGA
+# =============================================================================
+
+def _resolve(path) -> Path:
+    path = Path(path)
+    return path if path.is_absolute() else (ROOT / path).resolve()
+
+def load(path):
+    """
+    Importa el script una sola vez por proceso (cache por ruta).
+    """
+    path = _resolve(path)
+    if path in _modules:
+        return _modules[path]
+
+    name = "pionera_" + path.stem.replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(name, None)
+        raise
+
+    _modules[path] = module
+    return module
+
+def settings(config=None) -> dict:
+    """
+    Entorno efectivo de un script: os.environ sobrescrito por `config`.
+    """
+    return {**os.environ, **{k: str(v) for k, v in (config or {}).items()}}
+
+# =============================================================================
+# EJECUCIÓN
+# =============================================================================
+
+def _subprocess(path: Path, config, python):
+    python = python or (VENV_PYTHON if VENV_PYTHON.exists() else sys.executable)
+    subprocess.run(
+        [str(python), str(path)],
+        cwd=ROOT,
+        env=settings(config),
+        check=True
+    )
+
+def run_script(path, config=None, python=None):
+    """
+    Ejecuta `main(config)` del script en este proceso.
+    Si sus dependencias no están en este intérprete, usa un subproceso.
+    """
+    path = _resolve(path)
+
+    try:
+        module = load(path)
+    except ImportError as e:
+        print(f"↪ {path.name}: ejecución en subproceso ({e})")
+        return _subprocess(path, config, python)
+
+    try:
+        return module.main(config)
+    except SystemExit as e:
+        if e.code in (None, 0):
+            return None
+        if isinstance(e.code, str):
+            print(e.code, file=sys.stderr)
+        raise subprocess.CalledProcessError(
+            e.code if isinstance(e.code, int) else 1, [str(path)]
+        ) from None
@@ -0,0 +1,323 @@
+"""
+sampler.py
+
+Muestreo en segundo plano de CPU / memoria por pod (kubectl top)
+
+Responsabilidades:
+- Hilo de muestreo a intervalo fijo para common-srvs, demo e ingress-nginx
+- Habilitar el addon metrics-server si `kubectl top` no responde (de nuevo
+  si el clúster se recrea, p. ej. `minikube delete` del nivel 1)
+- Serie temporal columnar comprimida: runtime/samples/<run_id>.json.gz
+- Resumen de picos y medias por componente: runtime/samples/<run_id>-summary.json
+
+Formato columnar (gzip JSON):
+    {"run_id", "interval", "started", "namespaces",
+     "pods": ["ns/pod", ...],                      diccionario de pods
+     "components": ["ns/workload", ...],           componente de cada pod
+     "columns": {"t": [décimas de s], "pod": [índice en pods],
+                 "cpu_m": [...], "memory_mi": [...]}}
+
+Uso:
+- PIONERA_SAMPLER=1 python deploy.py [nivel]      (muestrea toda la ejecución)
+- python3 adapters/inesdata/lib/sampler.py run <comando...>   (p. ej. validaciones)
+- python3 adapters/inesdata/lib/sampler.py summary <fichero.json.gz>
+
+Principios:
+- Una sola llamada `kubectl top pods -A` por intervalo
+- Volcado periódico (escritura atómica): una ejecución abortada conserva sus muestras
+- Componente = workload propietario (ownerReferences); las réplicas se suman
+"""
+
+import atexit
+import gzip
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+if not __package__:
+    # Ejecución directa: python3 adapters/inesdata/lib/sampler.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import evidence
+from lib.bench import top_pods
+from lib.kubectl import cluster_reachable, get_json
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+SAMPLES_DIR = ROOT / "runtime" / "samples"
+
+SAMPLER_ENV = "PIONERA_SAMPLER"
+INTERVAL = float(os.environ.get("PIONERA_SAMPLER_INTERVAL", "10"))
+NAMESPACES = ("common-srvs", "demo", "ingress-nginx")
+
+# Segundos sin métricas antes de volver a habilitar metrics-server
+METRICS_RETRY = 120
+
+# Volcado a disco cada N muestreos
+FLUSH_EVERY = 6
+
+# =============================================================================
+# COMPONENTES Y RESUMEN
+# =============================================================================
+
+def component(pod: dict) -> str:
+    """
+    "ns/workload" a partir de ownerReferences: el ReplicaSet se reduce a su
+    Deployment quitando el pod-template-hash; StatefulSet, DaemonSet y Job
+    se usan tal cual. Un pod sin propietario es su propio componente.
+    """
+    meta = pod["metadata"]
+    owners = meta.get("ownerReferences") or []
+    if not owners:
+        return f"{meta['namespace']}/{meta['name']}"
+
+    owner = next((o for o in owners if o.get("controller")), owners[0])
+    name = owner["name"]
+    template_hash = meta.get("labels", {}).get("pod-template-hash")
+    if owner["kind"] == "ReplicaSet" and template_hash and name.endswith(f"-{template_hash}"):
+        name = name[: -len(template_hash) - 1]
+    return f"{meta['namespace']}/{name}"
+
+def summarize(data: dict) -> dict:
+    """
+    {componente: {"cpu_m": {avg, peak}, "memory_mi": {avg, peak}, "samples"}}
+    Por instante se suman las réplicas del componente.
+    """
+    columns = data["columns"]
+    # Series sin "components": cada pod es su propio componente
+    components = data.get("components") or data["pods"]
+
+    totals = {}
+    for t, pod, cpu, memory in zip(columns["t"], columns["pod"], columns["cpu_m"], columns["memory_mi"]):
+        point = totals.setdefault(components[pod], {}).setdefault(t, [0.0, 0.0])
+        point[0] += cpu
+        point[1] += memory
+
+    summary = {}
+    for name, points in sorted(totals.items()):
+        cpu = [p[0] for p in points.values()]
+        memory = [p[1] for p in points.values()]
+        summary[name] = {
+            "cpu_m": {"avg": round(sum(cpu) / len(cpu), 1), "peak": round(max(cpu), 1)},
+            "memory_mi": {"avg": round(sum(memory) / len(memory), 1), "peak": round(max(memory), 1)},
+            "samples": len(points),
+        }
+    return summary
+
+def print_summary(summary: dict):
+    print(f"\n📊 Consumo por componente ({len(summary)})")
+    print(f"   {'componente':<52} {'CPU m (media/pico)':>20} {'Mem Mi (media/pico)':>22}")
+    for name, stats in summary.items():
+        cpu, memory = stats["cpu_m"], stats["memory_mi"]
+        print(
+            f"   {name:<52} {cpu['avg']:>9} / {cpu['peak']:<8} "
+            f"{memory['avg']:>10} / {memory['peak']:<9}"
+        )
+
+def load(path: Path) -> dict:
+    with gzip.open(path, "rt") as f:
+        return json.load(f)
+
+# =============================================================================
+# MUESTREADOR
+# =============================================================================
+
+class Sampler:
+    """
+    Hilo daemon que acumula muestras en columnas y las vuelca a disco.
+    """
+
+    def __init__(self, run_id: str = None, interval: float = INTERVAL, namespaces=NAMESPACES):
+        self.run_id = run_id or evidence.current_run_id()
+        self.interval = interval
+        self.namespaces = set(namespaces)
+        self.path = SAMPLES_DIR / f"{self.run_id}.json.gz"
+
+        self.pods = []
+        self.components = []
+        self._pod_index = {}
+        self.columns = {"t": [], "pod": [], "cpu_m": [], "memory_mi": []}
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._metrics_retry_at = 0.0
+        self._started = None
+        self._t0 = None
+
+    # -------------------------------------------------------------------------
+
+    def _ensure_metrics(self):
+        """
+        Sin métricas y con clúster accesible: habilita metrics-server sin
+        esperar (las muestras llegan cuando empiece a publicar). Si pasados
+        METRICS_RETRY segundos sigue sin haber métricas (arranque aún en
+        curso o clúster recreado sin el addon) se vuelve a habilitar.
+        """
+        if time.monotonic() < self._metrics_retry_at or not cluster_reachable():
+            return
+        self._metrics_retry_at = time.monotonic() + METRICS_RETRY
+        print("📈 Sampler: habilitando addon metrics-server...")
+        subprocess.run(
+            ["minikube", "addons", "enable", "metrics-server"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    def _owners(self, keys) -> dict:
+        """
+        Componente de los pods nuevos: un listado por namespace afectado,
+        solo cuando aparecen pods que aún no están en el diccionario.
+        """
+        owners = {}
+        for namespace in sorted({key.partition("/")[0] for key in keys}):
+            for pod in get_json("pods", namespace=namespace):
+                owners[f"{namespace}/{pod['metadata']['name']}"] = component(pod)
+        return owners
+
+    def sample(self):
+        usage = top_pods()
+        if not usage:
+            self._ensure_metrics()
+            return
+
+        t = round((time.monotonic() - self._t0) * 10)
+        keys = [
+            f"{namespace}/{pod}" for namespace, pod in usage if namespace in self.namespaces
+        ]
+        new = [key for key in keys if key not in self._pod_index]
+        owners = self._owners(new) if new else {}
+
+        with self._lock:
+            for (namespace, pod), values in usage.items():
+                if namespace not in self.namespaces:
+                    continue
+                key = f"{namespace}/{pod}"
+                if key not in self._pod_index:
+                    self._pod_index[key] = len(self.pods)
+                    self.pods.append(key)
+                    # Pod ya borrado al listar: se queda como su propio componente
+                    self.components.append(owners.get(key, key))
+                self.columns["t"].append(t)
+                self.columns["pod"].append(self._pod_index[key])
+                self.columns["cpu_m"].append(round(values["cpu_m"], 1))
+                self.columns["memory_mi"].append(values["memory_mi"])
+
+    def data(self) -> dict:
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "interval": self.interval,
+                "started": self._started,
+                "namespaces": sorted(self.namespaces),
+                "pods": list(self.pods),
+                "components": list(self.components),
+                "columns": {k: list(v) for k, v in self.columns.items()},
+            }
+
+    def flush(self):
+        SAMPLES_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with gzip.open(tmp, "wt", compresslevel=6) as f:
+            json.dump(self.data(), f, separators=(",", ":"))
+        tmp.replace(self.path)
+
+    def _loop(self):
+        ticks = 0
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                # El muestreo nunca interrumpe el despliegue
+                print(f"⚠️ Sampler: {e}")
+            ticks += 1
+            if ticks % FLUSH_EVERY == 0:
+                self.flush()
+            self._stop.wait(self.interval)
+
+    # -------------------------------------------------------------------------
+
+    def start(self):
+        self._started = datetime.now().isoformat(timespec="seconds")
+        self._t0 = time.monotonic()
+        self._thread = threading.Thread(target=self._loop, name="pionera-sampler", daemon=True)
+        self._thread.start()
+        print(f"📈 Sampler activo cada {self.interval:.0f}s → {self.path.relative_to(ROOT)}")
+        return self
+
+    def stop(self) -> dict:
+        """
+        Detiene el hilo, vuelca la serie y escribe el resumen. Devuelve el resumen.
+        """
+        if self._thread is None:
+            return {}
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+        self.flush()
+        summary = summarize(self.data())
+        summary_file = SAMPLES_DIR / f"{self.run_id}-summary.json"
+        summary_file.write_text(json.dumps(summary, indent=2))
+        evidence.put("resource_summary.json", summary)
+        return summary
+
+# =============================================================================
+# SAMPLER DE PROCESO
+# =============================================================================
+
+_sampler = None
+
+def enabled() -> bool:
+    return os.environ.get(SAMPLER_ENV) == "1"
+
+def start(interval: float = INTERVAL) -> Sampler:
+    """
+    Arranca el sampler del proceso; se detiene y resume al salir.
+    """
+    global _sampler
+    if _sampler is None:
+        _sampler = Sampler(interval=interval).start()
+        atexit.register(stop)
+    return _sampler
+
+def stop():
+    global _sampler
+    if _sampler is None:
+        return
+    sampler, _sampler = _sampler, None
+    summary = sampler.stop()
+    if summary:
+        print_summary(summary)
+    print(f"✓ Serie de consumo en {sampler.path}")
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    cmd = argv.pop(0) if argv else ""
+
+    if cmd == "run" and argv:
+        # Muestrea mientras dura el comando (validaciones, benchmarks...)
+        start()
+        try:
+            code = subprocess.run(argv).returncode
+        finally:
+            stop()
+        sys.exit(code)
+    elif cmd == "summary" and len(argv) == 1:
+        print_summary(summarize(load(Path(argv[0]))))
+    else:
+        sys.exit("Uso: sampler.py run <comando...> | summary <fichero.json.gz>")
+
+if __name__ == "__main__":
+    main()
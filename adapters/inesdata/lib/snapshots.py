@@ -0,0 +1,266 @@
+"""
+snapshots.py
+
+Snapshots de PostgreSQL (common-srvs-postgresql-0) por nivel de despliegue
+
+Estructura (runtime/snapshots/<tag>/):
+- manifest.json       tag, fecha, bases (→ owner), jobs
+- roles.sql           pg_dumpall --roles-only (roles + passwords)
+- db/<base>/          pg_dump en formato directorio (-Fd)
+- files/              ficheros de runtime ligados al estado de las bases
+
+Principios:
+- Todas las bases de usuario (keycloak, demo_rs, connector, portal)
+- Paralelismo doble: una base por hilo y `-j` dentro de pg_dump / pg_restore
+- Transferencia en streaming (tar por stdin/stdout de kubectl exec)
+- Un snapshot incompleto nunca sustituye a uno válido
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+if not __package__:
+    # Ejecución directa: python3 adapters/inesdata/lib/snapshots.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import postgres
+from lib.kubectl import kubectl
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+SNAPSHOT_DIR = ROOT / "runtime" / "snapshots"
+
+JOBS = int(os.environ.get("PIONERA_PG_JOBS", str(min(4, os.cpu_count() or 1))))
+
+POD_TMP = "/tmp/pionera-snapshot"
+
+# Estado local que debe viajar con las bases (secretos OIDC emitidos por Keycloak)
+RUNTIME_FILES = [
+    ROOT / "runtime" / ".auth_runtime.json",
+]
+
+# Workloads que cachean estado de BD y deben reiniciarse tras restaurar
+RESTART_AFTER_RESTORE = [
+    ("common-srvs", "statefulset/common-srvs-keycloak"),
+    ("demo", "deployment"),
+]
+
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+def _exec_args(script: str, stdin: bool = False):
+    args = ["kubectl", "exec"]
+    if stdin:
+        args.append("-i")
+    return args + [
+        "-n", postgres.PG_NAMESPACE, postgres.PG_POD, "--",
+        "env", f"PGPASSWORD={postgres.admin_password()}",
+        "sh", "-c", script,
+    ]
+
+def _safe_extract(tar: tarfile.TarFile, dest: Path):
+    if hasattr(tarfile, "data_filter"):
+        tar.extractall(dest, filter="data")
+    else:
+        tar.extractall(dest)
+
+def user_databases() -> dict:
+    """
+    Bases de usuario → owner (excluye postgres, template0/1 y plantillas tpl_*).
+    """
+    return {
+        name: owner
+        for name, owner in postgres.current_state()["databases"].items()
+        if name not in ("postgres", "template0", "template1")
+        and not name.startswith("tpl_")
+    }
+
+def snapshot_path(tag: str) -> Path:
+    return SNAPSHOT_DIR / tag
+
+def available():
+    if not SNAPSHOT_DIR.exists():
+        return []
+    manifests = [
+        json.loads((d / "manifest.json").read_text())
+        for d in SNAPSHOT_DIR.iterdir()
+        if (d / "manifest.json").exists()
+    ]
+    return sorted(manifests, key=lambda m: m["created"])
+
+# =============================================================================
+# DUMP
+# =============================================================================
+
+def _dump_database(db: str, dest: Path, jobs: int):
+    """
+    pg_dump -Fd -j N dentro del pod y extracción en streaming a `dest/db`.
+    """
+    workdir = f"{POD_TMP}/{db}"
+    script = (
+        f"rm -rf {workdir} && mkdir -p {POD_TMP} && "
+        f"pg_dump -U {postgres.PG_ADMIN_USER} -Fd -j {jobs} -f {workdir} {db} >&2 && "
+        f"tar -C {POD_TMP} -cf - {db}; rc=$?; rm -rf {workdir}; exit $rc"
+    )
+    proc = subprocess.Popen(
+        _exec_args(script), stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    with tarfile.open(fileobj=proc.stdout, mode="r|") as tar:
+        _safe_extract(tar, dest)
+    stderr = proc.stderr.read().decode(errors="replace")
+    if proc.wait() != 0:
+        raise RuntimeError(f"pg_dump {db} falló: {stderr.strip()}")
+    return db
+
+def _dump_roles(dest: Path):
+    result = subprocess.run(
+        _exec_args(f"pg_dumpall -U {postgres.PG_ADMIN_USER} --roles-only"),
+        capture_output=True, check=True,
+    )
+    (dest / "roles.sql").write_bytes(result.stdout)
+
+def snapshot(tag: str, jobs: int = JOBS) -> dict:
+    """
+    Captura todas las bases de usuario bajo runtime/snapshots/<tag>/.
+    """
+    databases = user_databases()
+
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    staging = SNAPSHOT_DIR / f".{tag}.partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    (staging / "db").mkdir(parents=True)
+
+    try:
+        _dump_roles(staging)
+        with ThreadPoolExecutor(max_workers=max(1, len(databases))) as pool:
+            for db in pool.map(lambda d: _dump_database(d, staging / "db", jobs), databases):
+                print(f"  ✓ {db}")
+
+        files = staging / "files"
+        files.mkdir()
+        for path in RUNTIME_FILES:
+            if path.exists():
+                shutil.copy2(path, files / path.name)
+
+        manifest = {
+            "tag": tag,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "databases": databases,
+            "jobs": jobs,
+        }
+        (staging / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    target = snapshot_path(tag)
+    previous = SNAPSHOT_DIR / f".{tag}.old"
+    shutil.rmtree(previous, ignore_errors=True)
+    if target.exists():
+        target.rename(previous)
+    staging.rename(target)
+    shutil.rmtree(previous, ignore_errors=True)
+
+    return manifest
+
+# =============================================================================
+# RESTORE
+# =============================================================================
+
+def _restore_roles(src: Path):
+    # Los CREATE ROLE de roles existentes fallan; los ALTER ROLE posteriores
+    # alinean atributos y passwords (sin ON_ERROR_STOP a propósito)
+    subprocess.run(
+        _exec_args(f"psql -q -U {postgres.PG_ADMIN_USER} -d postgres -f - >/dev/null", stdin=True),
+        input=(src / "roles.sql").read_bytes(),
+        capture_output=True, check=True,
+    )
+
+def _restore_database(db: str, owner: str, src: Path, jobs: int):
+    postgres.psql(
+        postgres.drop_statements(db)
+        + [f"CREATE DATABASE {postgres.ident(db)} OWNER {postgres.ident(owner)};"]
+    )
+
+    workdir = f"{POD_TMP}/{db}"
+    script = (
+        f"rm -rf {workdir} && mkdir -p {POD_TMP} && tar -C {POD_TMP} -xf - && "
+        f"pg_restore -U {postgres.PG_ADMIN_USER} -j {jobs} -d {db} {workdir}; "
+        f"rc=$?; rm -rf {workdir}; exit $rc"
+    )
+    proc = subprocess.Popen(
+        _exec_args(script, stdin=True),
+        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    with tarfile.open(fileobj=proc.stdin, mode="w|") as tar:
+        tar.add(src / "db" / db, arcname=db)
+    proc.stdin.close()
+    stderr = proc.stderr.read().decode(errors="replace")
+    if proc.wait() != 0:
+        raise RuntimeError(f"pg_restore {db} falló: {stderr.strip()}")
+    return db
+
+def _restart_workloads():
+    for namespace, target in RESTART_AFTER_RESTORE:
+        kubectl("rollout", "restart", target, "-n", namespace, check=False)
+
+def restore(tag: str, jobs: int = JOBS) -> dict:
+    """
+    Rebobina PostgreSQL (y los ficheros de runtime asociados) al snapshot `tag`.
+    """
+    src = snapshot_path(tag)
+    manifest_file = src / "manifest.json"
+    if not manifest_file.exists():
+        raise FileNotFoundError(f"Snapshot inexistente: {src}")
+    manifest = json.loads(manifest_file.read_text())
+
+    _restore_roles(src)
+    with ThreadPoolExecutor(max_workers=max(1, len(manifest["databases"]))) as pool:
+        done = pool.map(
+            lambda item: _restore_database(item[0], item[1], src, jobs),
+            manifest["databases"].items(),
+        )
+        for db in done:
+            print(f"  ✓ {db}")
+
+    for path in RUNTIME_FILES:
+        saved = src / "files" / path.name
+        if saved.exists():
+            shutil.copy2(saved, path)
+
+    _restart_workloads()
+    return manifest
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    cmd = argv.pop(0) if argv else "list"
+
+    if cmd == "list":
+        for m in available():
+            print(f"{m['tag']:<12} {m['created']}  {', '.join(m['databases'])}")
+    elif cmd == "snapshot" and argv:
+        snapshot(argv[0])
+        print(f"✓ Snapshot {argv[0]} generado")
+    elif cmd == "restore" and argv:
+        restore(argv[0])
+        print(f"✓ Snapshot {argv[0]} restaurado")
+    else:
+        sys.exit("Uso: snapshots.py list | snapshot <tag> | restore <tag>")
+
+if __name__ == "__main__":
+    main()
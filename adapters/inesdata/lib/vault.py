@@ -0,0 +1,54 @@
+"""
+vault.py
+
+Operaciones comunes sobre Vault (common-srvs-vault-0) vía kubectl exec
+
+Responsabilidades:
+- Estado (initialized / sealed) en JSON
+- Unseal con la clave de init-keys-vault.json (sin jq)
+"""
+
+import json
+from pathlib import Path
+
+from lib.kubectl import kubectl
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+ROOT = Path(__file__).resolve().parents[3]
+INIT_KEYS_FILE = ROOT / "runtime" / "workdir" / "inesdata-deployment" / "common" / "init-keys-vault.json"
+
+VAULT_NAMESPACE = "common-srvs"
+VAULT_POD = "common-srvs-vault-0"
+
+# =============================================================================
+# OPERACIONES
+# =============================================================================
+
+def vault(*args, check=True):
+    return kubectl("exec", VAULT_POD, "-n", VAULT_NAMESPACE, "--", "vault", *args, check=check)
+
+def status() -> dict:
+    """
+    `vault status` devuelve 2 cuando está sellado: no es un error.
+    """
+    result = vault("status", "-format=json", check=False)
+    if result.returncode not in (0, 2):
+        raise RuntimeError("Vault no responde correctamente")
+    return json.loads(result.stdout)
+
+def unseal(init_file: Path = INIT_KEYS_FILE) -> bool:
+    """
+    Desella Vault si hace falta. Devuelve True si se ejecutó el unseal.
+    """
+    if not status().get("sealed", True):
+        return False
+
+    key = json.loads(Path(init_file).read_text())["unseal_keys_hex"][0]
+    vault("operator", "unseal", key)
+
+    if status().get("sealed", True):
+        raise RuntimeError("❌ Vault sigue sellado tras unseal")
+    return True
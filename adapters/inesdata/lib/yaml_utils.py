@@ -0,0 +1,132 @@
+"""
+yaml_utils.py
+
+Acceso único a ficheros YAML (values.yaml) del entorno
+
+Responsabilidades:
+- Usar CSafeLoader / CSafeDumper (libyaml) cuando estén disponibles
+- Cache por proceso de ficheros parseados, clave (ruta, mtime, tamaño)
+- Pipeline parse → transformación → escritura única (edit)
+
+Principios:
+- Solo carga segura (safe_load): NUNCA parsear templates Helm
+- Las lecturas devuelven copias: mutar el resultado no altera la cache
+- Escritura atómica y sin cambios si la transformación no modifica nada
+"""
+
+import copy
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import yaml
+
+# =============================================================================
+# LOADER / DUMPER
+# =============================================================================
+
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+ACCELERATED = Loader is not yaml.SafeLoader
+
+def loads(text):
+    return yaml.load(text, Loader=Loader)
+
+def loads_all(text):
+    return list(yaml.load_all(text, Loader=Loader))
+
+def dumps(data) -> str:
+    return yaml.dump(data, Dumper=Dumper, sort_keys=False)
+
+def dumps_all(documents) -> str:
+    return yaml.dump_all(documents, Dumper=Dumper, sort_keys=False)
+
+# =============================================================================
+# CACHE POR PROCESO
+# =============================================================================
+
+_cache = {}
+
+def _stat_key(path: Path):
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+def _cached(path: Path):
+    path = Path(path).resolve()
+    key = _stat_key(path)
+    hit = _cache.get(path)
+    if hit and hit[0] == key:
+        return hit[1]
+    data = loads(path.read_text())
+    _cache[path] = (key, data)
+    return data
+
+def load(path: Path):
+    """
+    Devuelve el contenido parseado de `path`. Solo parsea si el fichero
+    ha cambiado (mtime/tamaño) desde la última lectura en este proceso.
+    """
+    return copy.deepcopy(_cached(path))
+
+def invalidate(path: Path = None):
+    if path is None:
+        _cache.clear()
+    else:
+        _cache.pop(Path(path).resolve(), None)
+
+# =============================================================================
+# ESCRITURA
+# =============================================================================
+
+def dump(path: Path, data):
+    """
+    Escribe `data` de forma atómica y deja la cache actualizada
+    (la siguiente lectura no vuelve a parsear).
+    """
+    path = Path(path).resolve()
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(dumps(data))
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o777)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    _cache[path] = (_stat_key(path), copy.deepcopy(data))
+
+@contextmanager
+def edit(path: Path):
+    """
+    Pipeline parse → transformación → escritura única:
+
+        with yaml_utils.edit(VALUES_FILE) as data:
+            data["x"] = 1
+
+    Solo escribe si el contenido cambió.
+    """
+    original = _cached(path)
+    data = copy.deepcopy(original)
+    yield data
+    if data != original:
+        dump(path, data)
+
+# =============================================================================
+# TRANSFORMACIONES
+# =============================================================================
+
+def map_strings(node, fn, key=None):
+    """
+    Aplica fn(valor, clave) a todos los escalares str del árbol.
+    `clave` es la clave del mapping contenedor (None en listas).
+    """
+    if isinstance(node, dict):
+        return {k: map_strings(v, fn, k) for k, v in node.items()}
+    if isinstance(node, list):
+        return [map_strings(v, fn) for v in node]
+    if isinstance(node, str):
+        return fn(node, key)
+    return node
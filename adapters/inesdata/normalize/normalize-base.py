@@ -14,10 +14,13 @@ Responsabilidades:
 NO genera deployer.config (responsabilidad exclusiva del Nivel 3)
 """
 
-import yaml
+import sys
 import base64
 from pathlib import Path
-from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import backups, yaml_utils
 
 # =============================================================================
 # BASELINE REPRODUCIBLE DE DEPENDENCIAS PYTHON (A5.2)
@@ -81,12 +84,9 @@ def header(title: str):
     print("=" * 80)
 
 def backup(path: Path):
-    if not path.exists():
-        return
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    bkp = path.with_suffix(path.suffix + f".backup.{ts}")
-    bkp.write_text(path.read_text())
-    print(f"✓ Backup creado: {bkp}")
+    sha = backups.backup(path)
+    if sha:
+        print(f"✓ Backup registrado: {path.name} @ {sha[:12]}")
 
 def b64(val: str) -> str:
     return base64.b64encode(val.encode()).decode()
@@ -113,7 +113,16 @@ def normalize_common_values():
     header("NORMALIZACIÓN – common/values.yaml (CRÍTICA)")
 
     backup(VALUES_FILE)
-    data = yaml.safe_load(VALUES_FILE.read_text())
+
+    with yaml_utils.edit(VALUES_FILE) as data:
+        apply_baseline(data)
+
+    print("✓ values.yaml materializado y coherente")
+
+def apply_baseline(data):
+    """
+    Transformación in-place de common/values.yaml (sin E/S).
+    """
 
     # -------------------------------------------------------------------------
     # PostgreSQL
@@ -171,9 +180,6 @@ def normalize_common_values():
         kc_cli_img.update(BASELINE_IMAGES["keycloakConfigCli"])
         print("✓ Imagen keycloak-config-cli alineada con baseline reproducible")
 
-    VALUES_FILE.write_text(yaml.dump(data, sort_keys=False))
-    print("✓ values.yaml materializado y coherente")
-
 # =============================================================================
 # GENERACIÓN DEL SECRET DE DB EXTERNA PARA KEYCLOAK
 # =============================================================================
@@ -181,7 +187,7 @@ def normalize_common_values():
 def generate_keycloak_db_secret():
     header("NORMALIZACIÓN – Secret Keycloak external DB")
 
-    data = yaml.safe_load(VALUES_FILE.read_text())
+    data = yaml_utils.load(VALUES_FILE)
     pwd = data["postgresql"]["auth"]["password"]
 
     secret = {
@@ -192,14 +198,14 @@ def generate_keycloak_db_secret():
         "data": {"db-password": b64(pwd)},
     }
 
-    KC_SECRET_FILE.write_text(yaml.dump(secret, sort_keys=False))
+    yaml_utils.dump(KC_SECRET_FILE, secret)
     print(f"✓ Secret generado: {KC_SECRET_FILE}")
 
 # =============================================================================
 # MAIN
 # =============================================================================
 
-def main():
+def main(config=None):
     normalize_requirements()
     normalize_common_values()
     generate_keycloak_db_secret()
@@ -24,7 +24,10 @@ import time
 import os
 import base64
 from pathlib import Path
-from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import backups
 
 # =============================================================================
 # PATHS CANÓNICOS
@@ -72,14 +75,6 @@ def vault_env(token=None):
         env["VAULT_TOKEN"] = token
     return env
 
-def backup(path: Path):
-    if not path.exists():
-        return None
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    bkp = path.with_suffix(path.suffix + f".backup.{ts}")
-    bkp.write_text(path.read_text())
-    return bkp
-
 def get_secret(name: str, key: str) -> str:
     cmd = [
         "kubectl", "get", "secret", name,
@@ -174,9 +169,9 @@ def generate_deployer_config(root_token):
     pg_password = get_secret("common-srvs-postgresql", "postgres-password")
     kc_password = get_secret("common-srvs-keycloak", "admin-password")
 
-    backup_file = backup(DEPLOYER_CONFIG)
-    if backup_file:
-        print(f"✓ Backup creado: {backup_file}")
+    sha = backups.backup(DEPLOYER_CONFIG)
+    if sha:
+        print(f"✓ Backup registrado: {DEPLOYER_CONFIG.name} @ {sha[:12]}")
 
     DEPLOYER_CONFIG.write_text(f"""ENVIRONMENT=DEV
 PG_HOST=localhost
@@ -201,7 +196,7 @@ MINIO_HOSTNAME=minio.dev.ed.inesdata.upm
 # MAIN
 # =============================================================================
 
-def main():
+def main(config=None):
     check_preconditions()
 
     with open(VAULT_KEYS_FILE, "r") as f:
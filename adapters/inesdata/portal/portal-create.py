@@ -8,7 +8,7 @@ Responsabilidades:
 - Normalizar values-demo.yaml (idempotente real)
 - Corregir FQDN internos (PostgreSQL + Keycloak)
 - Garantizar alias DNS cross-namespace (ExternalName)
-- Provision determinista DB Portal (QA-safe)
+- Provision determinista DB Portal (reconciliación por diferencias)
 
 Principios:
 - NO interactivo
@@ -20,10 +20,12 @@ Principios:
 import subprocess
 import sys
 import re
-import yaml
-import base64
 from pathlib import Path
-from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import backups, postgres, yaml_utils
+from lib.kubectl import Manifest, cache as cluster_cache
 
 # =============================================================================
 # CONFIGURACIÓN
@@ -41,10 +43,7 @@ POSTGRES_FQDN = "common-srvs-postgresql.common-srvs.svc"
 KEYCLOAK_EXTERNAL = "keycloak.dev.ed.inesdata.upm"
 KEYCLOAK_INTERNAL = "common-srvs-keycloak.common-srvs.svc"
 
-PG_NAMESPACE = "common-srvs"
-PG_POD = "common-srvs-postgresql-0"
-PG_ADMIN_USER = "postgres"
-PG_SECRET = "common-srvs-postgresql"
+# PostgreSQL: ver lib/postgres.py
 
 # =============================================================================
 # UTILIDADES
@@ -58,23 +57,6 @@ def header(title):
 def run_output(cmd):
     return subprocess.check_output(cmd, text=True).strip()
 
-def backup(path: Path):
-    if not path.exists():
-        return None
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = path.with_suffix(path.suffix + f".backup.{ts}")
-    backup_path.write_text(path.read_text())
-    return backup_path
-
-def get_pg_admin_password():
-    cmd = [
-        "kubectl", "get", "secret", PG_SECRET,
-        "-n", PG_NAMESPACE,
-        "-o", "jsonpath={.data.postgres-password}"
-    ]
-    raw = subprocess.check_output(cmd).decode().strip()
-    return base64.b64decode(raw).decode()
-
 # =============================================================================
 # FASE 1 – PRECONDICIONES
 # =============================================================================
@@ -86,13 +68,9 @@ def check_preconditions():
         print("❌ values-demo.yaml no encontrado")
         sys.exit(1)
 
-    deployments = run_output([
-        "kubectl", "get", "deploy",
-        "-n", NAMESPACE,
-        "-o", "jsonpath={.items[*].metadata.name}"
-    ])
+    deployments = cluster_cache().names("deployments", NAMESPACE)
 
-    connectors = [d for d in deployments.split() if d.startswith("conn-")]
+    connectors = [d for d in deployments if d.startswith("conn-")]
 
     if not connectors:
         print("❌ No se detectó ningún connector en namespace demo")
@@ -109,47 +87,46 @@ def check_preconditions():
 def normalize(connector_name):
     header("NIVEL 9 – Normalización values-demo.yaml")
 
-    bkp = backup(VALUES_FILE)
-    if bkp:
-        print(f"✓ Backup creado: {bkp}")
+    sha = backups.backup(VALUES_FILE)
+    if sha:
+        print(f"✓ Backup registrado: {VALUES_FILE.name} @ {sha[:12]}")
 
-    content = VALUES_FILE.read_text()
+    def fix(value, _key):
+        value = re.sub(
+            r'(common-srvs-postgresql\.common-srvs\.svc)(\.common-srvs\.svc)+',
+            r'\1',
+            value
+        )
 
-    content = re.sub(
-        r'(common-srvs-postgresql\.common-srvs\.svc)(\.common-srvs\.svc)+',
-        r'\1',
-        content
-    )
+        value = re.sub(
+            r'(?<!\.)\bcommon-srvs-postgresql\b(?!\.common-srvs\.svc)',
+            POSTGRES_FQDN,
+            value
+        )
 
-    content = re.sub(
-        r'(?<!\.)\bcommon-srvs-postgresql\b(?!\.common-srvs\.svc)',
-        POSTGRES_FQDN,
-        content
-    )
+        value = value.replace(KEYCLOAK_EXTERNAL, KEYCLOAK_INTERNAL)
+        return value.replace("CHANGEME-conn-NAME-demo", connector_name)
 
-    content = content.replace(
-        KEYCLOAK_EXTERNAL,
-        KEYCLOAK_INTERNAL
-    )
+    # Un único parse → transformación → escritura (la cache evita re-parsear en FASE 4)
+    with yaml_utils.edit(VALUES_FILE) as values:
+        normalized = yaml_utils.map_strings(values, fix)
+        content = yaml_utils.dumps(normalized)
 
-    content = content.replace(
-        "CHANGEME-conn-NAME-demo",
-        connector_name
-    )
+        if "CHANGEME" in content:
+            print("❌ Persisten valores CHANGEME")
+            sys.exit(1)
 
-    if "CHANGEME" in content:
-        print("❌ Persisten valores CHANGEME")
-        sys.exit(1)
+        if POSTGRES_FQDN not in content:
+            print("❌ No se detecta FQDN interno de PostgreSQL")
+            sys.exit(1)
 
-    if POSTGRES_FQDN not in content:
-        print("❌ No se detecta FQDN interno de PostgreSQL")
-        sys.exit(1)
+        if KEYCLOAK_INTERNAL not in content:
+            print("❌ No se detecta URL interna de Keycloak")
+            sys.exit(1)
 
-    if KEYCLOAK_INTERNAL not in content:
-        print("❌ No se detecta URL interna de Keycloak")
-        sys.exit(1)
+        values.clear()
+        values.update(normalized)
 
-    VALUES_FILE.write_text(content)
     print("✓ values-demo.yaml normalizado correctamente")
 
 # =============================================================================
@@ -157,156 +134,60 @@ def normalize(connector_name):
 # =============================================================================
 
 def ensure_postgres_alias():
+    """
+    Alias declarativo (server-side apply): se crea o se corrige en una llamada.
+    """
     header("NIVEL 9 – Garantía alias DNS cross-namespace")
 
     try:
-        existing = run_output([
-            "kubectl", "get", "service",
-            POSTGRES_ALIAS,
-            "-n", NAMESPACE,
-            "-o", "jsonpath={.spec.externalName}"
-        ])
-
-        if existing == POSTGRES_FQDN:
-            print("✓ Alias DNS ya existe y es correcto")
-            return
-        else:
-            print("❌ Alias existe pero apunta a otro destino")
-            sys.exit(1)
-
-    except subprocess.CalledProcessError:
-        print("→ Alias no existe. Creando...")
-
-        yaml_content = f"""
-apiVersion: v1
-kind: Service
-metadata:
-  name: {POSTGRES_ALIAS}
-  namespace: {NAMESPACE}
-spec:
-  type: ExternalName
-  externalName: {POSTGRES_FQDN}
-"""
-
-        proc = subprocess.Popen(
-            ["kubectl", "apply", "-f", "-"],
-            stdin=subprocess.PIPE,
-            text=True
+        result = (
+            Manifest()
+            .external_name_service(POSTGRES_ALIAS, NAMESPACE, POSTGRES_FQDN)
+            .apply()
         )
-        proc.communicate(yaml_content)
+    except subprocess.CalledProcessError as e:
+        print(e.stderr)
+        print("❌ Error aplicando alias DNS")
+        sys.exit(1)
 
-        if proc.returncode != 0:
-            print("❌ Error creando alias DNS")
-            sys.exit(1)
+    print(result.stdout.strip())
 
-        print("✓ Alias DNS creado correctamente")
+    print("✓ Alias DNS garantizado correctamente")
 
 # =============================================================================
 # FASE 4 – PROVISION DETERMINISTA DB PORTAL
 # =============================================================================
 
 def provision_portal_db():
+    """
+    Reconciliación por diferencias (un cambio de password es un ALTER ROLE).
+    PIONERA_DB_RESET=1 fuerza drop + create.
+    """
     header("NIVEL 9 – Provision determinista DB Portal")
 
     # Leer values como fuente de verdad
-    values = yaml.safe_load(VALUES_FILE.read_text())
+    values = yaml_utils.load(VALUES_FILE)
 
     db_name = values["services"]["db"]["portal"]["name"]
     db_user = values["services"]["db"]["portal"]["user"]
     db_pass = values["services"]["db"]["portal"]["password"]
 
-    admin_pwd = get_pg_admin_password()
-
-    # ----------------------------------------------------------
-    # 1️⃣ Terminar sesiones activas contra la base
-    # ----------------------------------------------------------
-
-    terminate_sql = f"""
-    SELECT pg_terminate_backend(pid)
-    FROM pg_stat_activity
-    WHERE datname = '{db_name}'
-    AND pid <> pg_backend_pid();
-    """
+    stmts = postgres.reconcile([
+        {"name": db_name, "owner": db_user, "password": db_pass}
+    ])
 
-    subprocess.run([
-        "kubectl", "exec", "-n", PG_NAMESPACE, PG_POD,
-        "--",
-        "env",
-        f"PGPASSWORD={admin_pwd}",
-        "psql",
-        "-U", PG_ADMIN_USER,
-        "-d", "postgres",
-        "-c", terminate_sql
-    ], check=True)
-
-    # ----------------------------------------------------------
-    # 2️⃣ DROP DATABASE (idempotente)
-    # ----------------------------------------------------------
-
-    subprocess.run([
-        "kubectl", "exec", "-n", PG_NAMESPACE, PG_POD,
-        "--",
-        "env",
-        f"PGPASSWORD={admin_pwd}",
-        "psql",
-        "-U", PG_ADMIN_USER,
-        "-d", "postgres",
-        "-c", f"DROP DATABASE IF EXISTS {db_name};"
-    ], check=True)
-
-    # ----------------------------------------------------------
-    # 3️⃣ DROP ROLE (idempotente)
-    # ----------------------------------------------------------
-
-    subprocess.run([
-        "kubectl", "exec", "-n", PG_NAMESPACE, PG_POD,
-        "--",
-        "env",
-        f"PGPASSWORD={admin_pwd}",
-        "psql",
-        "-U", PG_ADMIN_USER,
-        "-d", "postgres",
-        "-c", f"DROP ROLE IF EXISTS {db_user};"
-    ], check=True)
-
-    # ----------------------------------------------------------
-    # 4️⃣ CREATE ROLE (sin sh -c, sin $$)
-    # ----------------------------------------------------------
-
-    subprocess.run([
-        "kubectl", "exec", "-n", PG_NAMESPACE, PG_POD,
-        "--",
-        "env",
-        f"PGPASSWORD={admin_pwd}",
-        "psql",
-        "-U", PG_ADMIN_USER,
-        "-d", "postgres",
-        "-c", f"CREATE ROLE {db_user} LOGIN PASSWORD '{db_pass}';"
-    ], check=True)
-
-    # ----------------------------------------------------------
-    # 5️⃣ CREATE DATABASE
-    # ----------------------------------------------------------
-
-    subprocess.run([
-        "kubectl", "exec", "-n", PG_NAMESPACE, PG_POD,
-        "--",
-        "env",
-        f"PGPASSWORD={admin_pwd}",
-        "psql",
-        "-U", PG_ADMIN_USER,
-        "-d", "postgres",
-        "-c", f"CREATE DATABASE {db_name} OWNER {db_user};"
-    ], check=True)
-
-    print("✓ DB Portal provisionada correctamente (determinista y QA-safe)")
+    if stmts:
+        print(postgres.describe(stmts))
+        print("✓ DB Portal alineada con values-demo.yaml")
+    else:
+        print("✓ DB Portal ya alineada (sin cambios)")
 
 
 # =============================================================================
 # MAIN
 # =============================================================================
 
-def main():
+def main(config=None):
     connector = check_preconditions()
     normalize(connector)
     ensure_postgres_alias()
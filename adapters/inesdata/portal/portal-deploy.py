@@ -5,7 +5,8 @@ NIVEL 9 – Portal Público (FASE DEPLOY)
 
 Responsabilidades:
 - Ejecutar Helm upgrade/install
-- Aplicar post-renderer automático (elimina hostPort)
+- Aplicar post-renderer común lib/post_render.py (elimina hostPort,
+  nodeSelector si el clúster es multinodo)
 - Esperar pods Running
 - Detectar CrashLoopBackOff
 - Timeout controlado
@@ -18,11 +19,16 @@ NO:
 - Modifica templates oficiales
 """
 
+import json
 import subprocess
 import sys
 import time
 from pathlib import Path
-from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import evidence, helm, postgres, yaml_utils
+from lib.kubectl import get_json, pod_status
 
 # =============================================================================
 # CONFIGURACIÓN
@@ -30,15 +36,12 @@ from datetime import datetime
 
 ROOT = Path(__file__).resolve().parents[3]
 STEP2_DIR = ROOT / "runtime/workdir/inesdata-deployment/dataspace/step-2"
-RUNTIME_DIR = ROOT / "venv"
 
 NAMESPACE = "demo"
 RELEASE = "demo-dataspace-s2"
 
 TIMEOUT = 180  # segundos
 
-POST_RENDERER_PATH = RUNTIME_DIR / "helm-post-renderer.sh"
-
 # =============================================================================
 # UTILIDADES
 # =============================================================================
@@ -56,47 +59,43 @@ def run_output(cmd):
     return subprocess.check_output(cmd, text=True).strip()
 
 def save_evidence(name, content):
-    evid_dir = RUNTIME_DIR / "evidences"
-    evid_dir.mkdir(exist_ok=True)
-    file = evid_dir / f"{name}.txt"
-    file.write_text(content)
+    # Store deduplicado de la ejecución (runtime/evidences/)
+    evidence.put(f"{name}.txt", content)
+
+def stable_pods_view(namespace=NAMESPACE):
+    """
+    Vista de pods sin campos dependientes del tiempo (AGE, "(5m ago)"):
+    snapshots idénticos comparten blob en el store de evidencias.
+    """
+    view = []
+    for pod in get_json("pods", namespace=namespace):
+        statuses = pod.get("status", {}).get("containerStatuses", [])
+        view.append({
+            "name": pod["metadata"]["name"],
+            "phase": pod.get("status", {}).get("phase"),
+            "status": pod_status(pod),
+            "ready": f"{sum(cs.get('ready', False) for cs in statuses)}/{len(statuses)}",
+            "restarts": sum(cs.get("restartCount", 0) for cs in statuses),
+        })
+    return json.dumps(sorted(view, key=lambda p: p["name"]), indent=2)
 
 # =============================================================================
-# FASE 1 – CREAR POST-RENDERER DINÁMICO
-# =============================================================================
-
-def create_post_renderer():
-    header("NIVEL 9 – Generación post-renderer dinámico")
-
-    content = """#!/bin/bash
-# Post-renderer automático para entorno single-node con Ingress
-# Elimina cualquier definición de hostPort para evitar conflictos
-sed '/hostPort:/d'
-"""
-
-    POST_RENDERER_PATH.write_text(content)
-    POST_RENDERER_PATH.chmod(0o755)
-
-    print(f"✓ Post-renderer generado en {POST_RENDERER_PATH}")
-
-# =============================================================================
-# FASE 2 – HELM DEPLOY
+# FASE 1 – HELM DEPLOY
 # =============================================================================
 
 def helm_deploy():
     header("NIVEL 9 – Helm upgrade/install con post-renderer")
 
-    run([
-        "helm", "upgrade", "--install",
-        RELEASE,
-        "-n", NAMESPACE,
-        "-f", "values-demo.yaml",
-        "--post-renderer", str(POST_RENDERER_PATH),
-        "."
-    ], cwd=STEP2_DIR)
+    # hostPort fuera (single-node con Ingress) y, en multinodo, pods
+    # fijados a los nodos del portal: un único post-renderer Python
+    helm.upgrade_install(
+        RELEASE, NAMESPACE, "values-demo.yaml", cwd=STEP2_DIR,
+        component="portal",
+        strip_host_ports=True,
+    )
 
 # =============================================================================
-# FASE 3 – ESPERA CONTROLADA
+# FASE 2 – ESPERA CONTROLADA
 # =============================================================================
 
 def wait_for_pods():
@@ -109,8 +108,7 @@ def wait_for_pods():
         pods = run_output(["kubectl", "get", "pods", "-n", NAMESPACE])
         print(pods)
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        save_evidence(f"portal_pods_snapshot_{timestamp}", pods)
+        save_evidence("portal_pods_snapshot", stable_pods_view())
 
         if "CrashLoopBackOff" in pods or "Error" in pods:
             print("❌ Detectado CrashLoopBackOff o Error")
@@ -130,14 +128,27 @@ def wait_for_pods():
     print("❌ Timeout esperando pods Running")
     sys.exit(1)
 
+# =============================================================================
+# FASE 3 – PLANTILLA DB
+# =============================================================================
+
+def snapshot_portal_db():
+    """
+    Backend operativo → migraciones de Strapi aplicadas.
+    Se congela la base como plantilla (solo con PIONERA_DB_TEMPLATES activo).
+    """
+    db_name = yaml_utils.load(STEP2_DIR / "values-demo.yaml")["services"]["db"]["portal"]["name"]
+    if postgres.snapshot_template(db_name):
+        print(f"✓ Plantilla {postgres.template_name(db_name)} generada")
+
 # =============================================================================
 # MAIN
 # =============================================================================
 
-def main():
-    create_post_renderer()
+def main(config=None):
     helm_deploy()
     wait_for_pods()
+    snapshot_portal_db()
 
     header("NIVEL 9 COMPLETADO")
     print("✔ Portal desplegado correctamente")
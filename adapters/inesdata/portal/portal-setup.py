@@ -4,7 +4,12 @@ import secrets
 import io
 from datetime import datetime
 from PIL import Image
-import os
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lib import runner
 
 class PortalSetup:
 
@@ -285,17 +290,16 @@ class PortalSetup:
 # EXECUTION
 # --------------------------------------------------
 
-import os
-
-if __name__ == "__main__":
+def main(config=None):
+    env = runner.settings(config)
 
     # Permite sobreescribir dinámicamente el backend desde Nivel 10
-    backend_url = os.environ.get(
+    backend_url = env.get(
         "PORTAL_BACKEND_URL",
         "http://backend-demo.dev.ds.inesdata.upm"
     )
 
-    config = {
+    setup_config = {
         "backend_url": backend_url,
         "admin_email": "admin@pionera.local",
         "admin_password": "Admin123!"
@@ -303,10 +307,13 @@ if __name__ == "__main__":
 
     print(f"🔗 Backend URL: {backend_url}")
 
-    setup = PortalSetup(config)
+    setup = PortalSetup(setup_config)
 
     try:
         setup.run()
     except Exception as e:
         print(f"❌ Portal bootstrap failed: {e}")
-        raise
\ No newline at end of file
+        raise
+
+if __name__ == "__main__":
+    main()